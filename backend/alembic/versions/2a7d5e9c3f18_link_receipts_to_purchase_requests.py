@@ -0,0 +1,46 @@
+"""link inventory receipts to purchase requests"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "2a7d5e9c3f18"
+down_revision = "8f3a6c1d2e94"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "inventory_transactions", sa.Column("purchase_request_id", sa.Integer(), nullable=True)
+    )
+    op.create_foreign_key(
+        "inventory_transactions_purchase_request_id_fkey",
+        "inventory_transactions",
+        "purchase_requests",
+        ["purchase_request_id"],
+        ["id"],
+    )
+    op.create_index(
+        op.f("ix_inventory_transactions_purchase_request_id"),
+        "inventory_transactions",
+        ["purchase_request_id"],
+        unique=False,
+    )
+    op.add_column(
+        "purchase_requests", sa.Column("received_at", sa.DateTime(timezone=True), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("purchase_requests", "received_at")
+    op.drop_index(
+        op.f("ix_inventory_transactions_purchase_request_id"),
+        table_name="inventory_transactions",
+    )
+    op.drop_constraint(
+        "inventory_transactions_purchase_request_id_fkey",
+        "inventory_transactions",
+        type_="foreignkey",
+    )
+    op.drop_column("inventory_transactions", "purchase_request_id")
@@ -0,0 +1,57 @@
+"""notify workers when user role or activity changes"""
+
+from alembic import op
+
+
+revision = "3b9e6d2f41a7"
+down_revision = "7c1b4c8a9f2e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_principal_change() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                PERFORM pg_notify('canteen_principals', OLD.id::text);
+                RETURN OLD;
+            END IF;
+            PERFORM pg_notify('canteen_principals', NEW.id::text);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER users_principal_update
+        AFTER UPDATE OF role, is_active ON users
+        FOR EACH ROW
+        WHEN (OLD.role IS DISTINCT FROM NEW.role OR OLD.is_active IS DISTINCT FROM NEW.is_active)
+        EXECUTE FUNCTION notify_principal_change()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER users_principal_delete
+        AFTER DELETE ON users
+        FOR EACH ROW
+        EXECUTE FUNCTION notify_principal_change()
+        """
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS users_principal_delete ON users")
+    op.execute("DROP TRIGGER IF EXISTS users_principal_update ON users")
+    op.execute("DROP FUNCTION IF EXISTS notify_principal_change()")
@@ -0,0 +1,96 @@
+"""add meal_coverage for subscription days"""
+
+from datetime import date, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "5e2a8c4d7b61"
+down_revision = "9d4f1e7a2c3b"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "meal_coverage",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("menu_date", sa.Date(), nullable=False),
+        sa.Column("payment_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["payment_id"], ["payments.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "menu_date"),
+    )
+    op.create_index(
+        op.f("ix_meal_coverage_payment_id"), "meal_coverage", ["payment_id"], unique=False
+    )
+    op.create_index(
+        "ix_payments_user_id_menu_id", "payments", ["user_id", "menu_id"], unique=False
+    )
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute(
+            """
+            INSERT INTO meal_coverage (user_id, menu_date, payment_id)
+            SELECT DISTINCT ON (p.user_id, d::date) p.user_id, d::date, p.id
+            FROM payments p
+            CROSS JOIN LATERAL generate_series(
+                p.period_start, p.period_end, interval '1 day'
+            ) AS d
+            WHERE p.payment_type = 'subscription'
+              AND p.status = 'paid'
+              AND p.period_start IS NOT NULL
+              AND p.period_end IS NOT NULL
+            ORDER BY p.user_id, d::date, p.id
+            """
+        )
+        return
+
+    payments = sa.table(
+        "payments",
+        sa.column("id", sa.Integer()),
+        sa.column("user_id", sa.Integer()),
+        sa.column("payment_type", sa.String()),
+        sa.column("status", sa.String()),
+        sa.column("period_start", sa.Date()),
+        sa.column("period_end", sa.Date()),
+    )
+    coverage = sa.table(
+        "meal_coverage",
+        sa.column("user_id", sa.Integer()),
+        sa.column("menu_date", sa.Date()),
+        sa.column("payment_id", sa.Integer()),
+    )
+    rows = bind.execute(
+        sa.select(
+            payments.c.id, payments.c.user_id, payments.c.period_start, payments.c.period_end
+        )
+        .where(
+            payments.c.payment_type == "subscription",
+            payments.c.status == "paid",
+            payments.c.period_start.is_not(None),
+            payments.c.period_end.is_not(None),
+        )
+        .order_by(payments.c.id)
+    )
+    covered: dict[tuple[int, date], int] = {}
+    for payment_id, user_id, period_start, period_end in rows:
+        day = period_start
+        while day <= period_end:
+            covered.setdefault((user_id, day), payment_id)
+            day += timedelta(days=1)
+    if covered:
+        op.bulk_insert(
+            coverage,
+            [
+                {"user_id": user_id, "menu_date": day, "payment_id": payment_id}
+                for (user_id, day), payment_id in covered.items()
+            ],
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_payments_user_id_menu_id", table_name="payments")
+    op.drop_index(op.f("ix_meal_coverage_payment_id"), table_name="meal_coverage")
+    op.drop_table("meal_coverage")
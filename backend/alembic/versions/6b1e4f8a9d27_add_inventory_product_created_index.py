@@ -0,0 +1,24 @@
+"""add product/created_at index for stock history"""
+
+from alembic import op
+
+
+revision = "6b1e4f8a9d27"
+down_revision = "2a7d5e9c3f18"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_inventory_transactions_product_id_created_at",
+        "inventory_transactions",
+        ["product_id", "created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_inventory_transactions_product_id_created_at", table_name="inventory_transactions"
+    )
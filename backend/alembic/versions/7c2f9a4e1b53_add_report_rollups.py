@@ -0,0 +1,81 @@
+"""add daily rollups for admin reports"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "7c2f9a4e1b53"
+down_revision = "d3b8e1f6a2c7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "attendance_daily_rollups",
+        sa.Column("menu_date", sa.Date(), nullable=False),
+        sa.Column(
+            "meal_type",
+            postgresql.ENUM("breakfast", "lunch", name="meal_type", create_type=False),
+            nullable=False,
+        ),
+        sa.Column(
+            "status",
+            postgresql.ENUM(
+                "issued", "served", "confirmed", name="meal_issue_status", create_type=False
+            ),
+            nullable=False,
+        ),
+        sa.Column("issue_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("menu_date", "meal_type", "status"),
+    )
+    op.create_table(
+        "payment_daily_rollups",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column(
+            "status",
+            postgresql.ENUM(
+                "pending", "paid", "failed", "refunded", name="payment_status", create_type=False
+            ),
+            nullable=False,
+        ),
+        sa.Column(
+            "payment_type",
+            postgresql.ENUM("one_time", "subscription", name="payment_type", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("payment_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("amount", sa.Numeric(12, 2), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("day", "status", "payment_type"),
+    )
+    op.create_table(
+        "report_rollup_dirty_days",
+        sa.Column("kind", sa.String(length=32), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.PrimaryKeyConstraint("kind", "day"),
+    )
+    op.execute(
+        """
+        INSERT INTO attendance_daily_rollups (menu_date, meal_type, status, issue_count)
+        SELECT m.menu_date, m.meal_type, i.status, COUNT(i.id)
+        FROM meal_issues i
+        JOIN menus m ON m.id = i.menu_id
+        GROUP BY m.menu_date, m.meal_type, i.status
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO payment_daily_rollups (day, status, payment_type, payment_count, amount)
+        SELECT CAST(timezone('UTC', created_at) AS date), status, payment_type,
+               COUNT(id), COALESCE(SUM(amount), 0)
+        FROM payments
+        GROUP BY CAST(timezone('UTC', created_at) AS date), status, payment_type
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("report_rollup_dirty_days")
+    op.drop_table("payment_daily_rollups")
+    op.drop_table("attendance_daily_rollups")
@@ -0,0 +1,36 @@
+"""add product_stock balances"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "8f3a6c1d2e94"
+down_revision = "c47d2b9e5a18"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "product_stock",
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Numeric(12, 3), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("product_id"),
+    )
+    op.execute(
+        """
+        INSERT INTO product_stock (product_id, quantity, updated_at)
+        SELECT p.id,
+               COALESCE(SUM(CASE WHEN t.direction = 'in' THEN t.quantity ELSE -t.quantity END), 0),
+               now()
+        FROM products p
+        LEFT JOIN inventory_transactions t ON t.product_id = p.id
+        GROUP BY p.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("product_stock")
@@ -0,0 +1,19 @@
+"""index menus by (menu_date, id) for staff meal issue pagination"""
+
+from alembic import op
+
+
+revision = "a8d4f2c6e913"
+down_revision = "e5a1c8f3d926"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_menus_menu_date_id", "menus", ["menu_date", "id"], unique=False)
+    op.drop_index("ix_menus_menu_date", table_name="menus")
+
+
+def downgrade() -> None:
+    op.create_index("ix_menus_menu_date", "menus", ["menu_date"], unique=False)
+    op.drop_index("ix_menus_menu_date_id", table_name="menus")
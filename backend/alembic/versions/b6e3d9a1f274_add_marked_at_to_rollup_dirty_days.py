@@ -0,0 +1,26 @@
+"""add marked_at to report_rollup_dirty_days"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "b6e3d9a1f274"
+down_revision = "a8d4f2c6e913"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "report_rollup_dirty_days",
+        sa.Column(
+            "marked_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("report_rollup_dirty_days", "marked_at")
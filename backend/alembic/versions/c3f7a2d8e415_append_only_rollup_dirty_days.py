@@ -0,0 +1,59 @@
+"""make report_rollup_dirty_days an append-only log"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "c3f7a2d8e415"
+down_revision = "b6e3d9a1f274"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.text("SELECT kind, day FROM report_rollup_dirty_days").columns(
+            kind=sa.String(), day=sa.Date()
+        )
+    ).all()
+    op.drop_table("report_rollup_dirty_days")
+    table = op.create_table(
+        "report_rollup_dirty_days",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=32), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_report_rollup_dirty_days_kind_day",
+        "report_rollup_dirty_days",
+        ["kind", "day"],
+    )
+    if rows:
+        op.bulk_insert(table, [{"kind": kind, "day": day} for kind, day in rows])
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.text("SELECT DISTINCT kind, day FROM report_rollup_dirty_days").columns(
+            kind=sa.String(), day=sa.Date()
+        )
+    ).all()
+    op.drop_index("ix_report_rollup_dirty_days_kind_day", table_name="report_rollup_dirty_days")
+    op.drop_table("report_rollup_dirty_days")
+    table = op.create_table(
+        "report_rollup_dirty_days",
+        sa.Column("kind", sa.String(length=32), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column(
+            "marked_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.PrimaryKeyConstraint("kind", "day"),
+    )
+    if rows:
+        op.bulk_insert(table, [{"kind": kind, "day": day} for kind, day in rows])
@@ -0,0 +1,28 @@
+"""add composite indexes for keyset pagination"""
+
+from alembic import op
+
+
+revision = "c47d2b9e5a18"
+down_revision = "5e2a8c4d7b61"
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ("ix_payments_user_id_created_at_id", "payments", ["user_id", "created_at", "id"]),
+    ("ix_meal_issues_user_id_created_at_id", "meal_issues", ["user_id", "created_at", "id"]),
+    ("ix_meal_issues_menu_id_created_at_id", "meal_issues", ["menu_id", "created_at", "id"]),
+    ("ix_reviews_created_at_id", "reviews", ["created_at", "id"]),
+    ("ix_inventory_transactions_created_at_id", "inventory_transactions", ["created_at", "id"]),
+    ("ix_purchase_requests_requested_at_id", "purchase_requests", ["requested_at", "id"]),
+)
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
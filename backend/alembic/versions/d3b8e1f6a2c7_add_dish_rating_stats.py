@@ -0,0 +1,78 @@
+"""add dish rating stats"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "d3b8e1f6a2c7"
+down_revision = "6b1e4f8a9d27"
+branch_labels = None
+depends_on = None
+
+
+def _stats_columns() -> list[sa.Column]:
+    return [
+        sa.Column("rating_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("rating_sum", sa.Integer(), nullable=False, server_default="0"),
+        *(
+            sa.Column(f"rating_{value}", sa.Integer(), nullable=False, server_default="0")
+            for value in range(1, 6)
+        ),
+        sa.Column("last_review_at", sa.DateTime(timezone=True), nullable=True),
+    ]
+
+
+STATS_SELECT = """
+    COUNT(id),
+    SUM(rating),
+    SUM(CASE WHEN rating = 1 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN rating = 2 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN rating = 3 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN rating = 4 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN rating = 5 THEN 1 ELSE 0 END),
+    MAX(created_at)
+"""
+STATS_FIELDS = (
+    "rating_count, rating_sum, rating_1, rating_2, rating_3, rating_4, rating_5, last_review_at"
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "dish_rating_stats",
+        sa.Column("dish_id", sa.Integer(), nullable=False),
+        *_stats_columns(),
+        sa.ForeignKeyConstraint(["dish_id"], ["dishes.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("dish_id"),
+    )
+    op.create_table(
+        "menu_dish_rating_stats",
+        sa.Column("menu_id", sa.Integer(), nullable=False),
+        sa.Column("dish_id", sa.Integer(), nullable=False),
+        *_stats_columns(),
+        sa.ForeignKeyConstraint(["menu_id"], ["menus.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["dish_id"], ["dishes.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("menu_id", "dish_id"),
+    )
+    op.execute(
+        f"""
+        INSERT INTO dish_rating_stats (dish_id, {STATS_FIELDS})
+        SELECT dish_id, {STATS_SELECT}
+        FROM reviews
+        GROUP BY dish_id
+        """
+    )
+    op.execute(
+        f"""
+        INSERT INTO menu_dish_rating_stats (menu_id, dish_id, {STATS_FIELDS})
+        SELECT menu_id, dish_id, {STATS_SELECT}
+        FROM reviews
+        WHERE menu_id IS NOT NULL
+        GROUP BY menu_id, dish_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("menu_dish_rating_stats")
+    op.drop_table("dish_rating_stats")
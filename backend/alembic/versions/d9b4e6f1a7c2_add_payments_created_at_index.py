@@ -0,0 +1,17 @@
+"""index payments by created_at for dirty-day report ranges"""
+
+from alembic import op
+
+
+revision = "d9b4e6f1a7c2"
+down_revision = "c3f7a2d8e415"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_payments_created_at", "payments", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_payments_created_at", table_name="payments")
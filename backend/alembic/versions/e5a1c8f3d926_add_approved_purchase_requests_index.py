@@ -0,0 +1,23 @@
+"""add partial decided_at index for approved purchase requests"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "e5a1c8f3d926"
+down_revision = "7c2f9a4e1b53"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_purchase_requests_approved_decided_at",
+        "purchase_requests",
+        ["decided_at"],
+        postgresql_where=sa.text("status = 'approved'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_purchase_requests_approved_decided_at", table_name="purchase_requests")
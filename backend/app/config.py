@@ -13,6 +13,25 @@ class Settings(BaseSettings):
     jwt_secret: str = Field(default="change-me", alias="JWT_SECRET")
     jwt_algorithm: str = Field(default="HS256", alias="JWT_ALGORITHM")
     access_token_exp_minutes: int = Field(default=60, alias="ACCESS_TOKEN_EXP_MINUTES")
+    refresh_token_exp_days: int = Field(default=30, alias="REFRESH_TOKEN_EXP_DAYS")
+    password_hash_workers: int = Field(default=4, alias="PASSWORD_HASH_WORKERS")
+    password_hash_max_pending: int = Field(default=64, alias="PASSWORD_HASH_MAX_PENDING")
+    principal_cache_ttl_seconds: float = Field(default=30, alias="PRINCIPAL_CACHE_TTL_SECONDS")
+    principal_cache_size: int = Field(default=10000, alias="PRINCIPAL_CACHE_SIZE")
+    eligibility_cache_ttl_seconds: float = Field(
+        default=60, alias="ELIGIBILITY_CACHE_TTL_SECONDS"
+    )
+    eligibility_cache_size: int = Field(default=64, alias="ELIGIBILITY_CACHE_SIZE")
+    menu_cache_max_bytes: int = Field(default=8 * 1024 * 1024, alias="MENU_CACHE_MAX_BYTES")
+    stock_history_cache_size: int = Field(default=256, alias="STOCK_HISTORY_CACHE_SIZE")
+    portion_block_size: int = Field(default=20, alias="PORTION_BLOCK_SIZE")
+    portion_sync_seconds: float = Field(default=10, alias="PORTION_SYNC_SECONDS")
+    portion_workers: int = Field(default=4, alias="PORTION_WORKERS")
+    portion_reclaim_seconds: float = Field(default=1, alias="PORTION_RECLAIM_SECONDS")
+    report_rollup_compact_seconds: float = Field(
+        default=60, alias="REPORT_ROLLUP_COMPACT_SECONDS"
+    )
+    pg_events_enabled: bool = Field(default=True, alias="PG_EVENTS_ENABLED")
 
     model_config = SettingsConfigDict(
         env_file=(".env", "../.env"),
@@ -28,6 +47,14 @@ class Settings(BaseSettings):
             f"@{self.db_host}:{self.db_port}/{self.db_name}"
         )
 
+    @computed_field
+    @property
+    def listen_database_url(self) -> str:
+        return (
+            f"postgresql://{self.db_user}:{self.db_password}"
+            f"@{self.db_host}:{self.db_port}/{self.db_name}"
+        )
+
     @computed_field
     @property
     def sync_database_url(self) -> str:
@@ -1,5 +1,9 @@
-﻿from fastapi import FastAPI
+﻿from contextlib import asynccontextmanager
 
+from fastapi import FastAPI
+
+from .config import settings
+from .db import engine
 from .docs import public_docs
 from .routers import (
     admin_reports_router,
@@ -7,6 +11,7 @@ from .routers import (
     allergies_router,
     auth_router,
     dishes_router,
+    events_router,
     inventory_transactions_router,
     meal_issues_router,
     menus_router,
@@ -18,6 +23,10 @@ from .routers import (
     notifications_router,
     users_router,
 )
+from .services.pg_events import pg_events
+from .services.portion_service import portion_counters
+from .services.report_rollup_service import report_rollup_compactor
+from .services.security import password_hash_pool
 
 APP_DESCRIPTION = """
 API системы управления школьной столовой.
@@ -36,6 +45,14 @@ API системы управления школьной столовой.
 - В описании каждого метода указан список ролей.
 - Администратор имеет доступ ко всем защищенным ресурсам.
 
+## Пагинация
+- Списки (`/menus/`, `/payments/me`, `/meal-issues/`, `/reviews/`, `/inventory-transactions/`,
+  `/purchase-requests/`) отдаются страницами: `limit` (по умолчанию 50, максимум 200).
+- В ответе `next_cursor`; чтобы получить следующую страницу, передайте его в `cursor`.
+  `null` — страниц больше нет.
+- Полные выгрузки без пагинации отдаются потоком: `/meal-issues/export`,
+  `/inventory-transactions/export`, `/payments/export` (`format=ndjson` или `format=csv`).
+
 ## Форматы дат
 - `date`: `YYYY-MM-DD`
 - `datetime`: ISO 8601, например `2026-02-03T10:30:00Z`
@@ -65,20 +82,39 @@ OPENAPI_TAGS = [
     {"name": "purchase-requests", "description": "Заявки на закупку и согласование"},
     {"name": "reviews", "description": "Отзывы и оценки блюд"},
     {"name": "notifications", "description": "Уведомления пользователей"},
+    {"name": "events", "description": "Поток событий пользователя (SSE)"},
     {"name": "users", "description": "Пользователи (для кухни/админа)"},
 ]
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    if settings.pg_events_enabled and engine.dialect.name == "postgresql":
+        await pg_events.start(settings.listen_database_url)
+    await portion_counters.start(engine, settings.portion_sync_seconds)
+    await report_rollup_compactor.start(engine, settings.report_rollup_compact_seconds)
+    try:
+        yield
+    finally:
+        await report_rollup_compactor.stop()
+        await portion_counters.stop()
+        await pg_events.stop()
+        password_hash_pool.shutdown()
+
+
 app = FastAPI(
     title="API школьной столовой",
     description=APP_DESCRIPTION,
     root_path="/api/v1",
     openapi_tags=OPENAPI_TAGS,
+    lifespan=lifespan,
 )
 app.include_router(admin_reports_router)
 app.include_router(admin_stats_router)
 app.include_router(auth_router)
 app.include_router(allergies_router)
 app.include_router(dishes_router)
+app.include_router(events_router)
 app.include_router(inventory_transactions_router)
 app.include_router(meal_issues_router)
 app.include_router(menus_router)
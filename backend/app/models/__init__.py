@@ -1,15 +1,20 @@
 from .associations import dish_allergies, user_allergies
 from .allergy import Allergy
+from .auth_session import AuthSession
 from .dish import Dish
+from .dish_rating_stats import DishRatingStats, MenuDishRatingStats
 from .inventory_transaction import InventoryDirection, InventoryTransaction
+from .meal_coverage import MealCoverage
 from .meal_issue import MealIssue, MealIssueStatus
 from .menu import MealType, Menu
 from .menu_item import MenuItem
 from .notification import Notification
 from .payment import Payment, PaymentStatus, PaymentType
 from .product import Product
+from .product_stock import ProductStock
 from .purchase_request import PurchaseRequest, PurchaseRequestStatus
 from .purchase_request_item import PurchaseRequestItem
+from .report_rollup import AttendanceDailyRollup, PaymentDailyRollup, ReportRollupDirtyDay
 from .review import Review
 from .user_notification import UserNotification
 from .user import User, UserRole
@@ -18,22 +23,30 @@ __all__ = [
     "dish_allergies",
     "user_allergies",
     "Allergy",
+    "AttendanceDailyRollup",
+    "AuthSession",
     "Dish",
+    "DishRatingStats",
     "InventoryTransaction",
     "InventoryDirection",
+    "MealCoverage",
     "MealIssue",
     "MealIssueStatus",
     "MealType",
     "Menu",
     "MenuItem",
+    "MenuDishRatingStats",
     "Notification",
     "Payment",
     "PaymentStatus",
     "PaymentType",
+    "PaymentDailyRollup",
     "Product",
+    "ProductStock",
     "PurchaseRequest",
     "PurchaseRequestStatus",
     "PurchaseRequestItem",
+    "ReportRollupDirtyDay",
     "Review",
     "UserNotification",
     "User",
@@ -10,6 +10,7 @@ from .associations import dish_allergies
 
 if TYPE_CHECKING:
     from .allergy import Allergy
+    from .dish_rating_stats import DishRatingStats
     from .menu_item import MenuItem
     from .review import Review
 
@@ -29,3 +30,6 @@ class Dish(Base):
     reviews: Mapped[list["Review"]] = relationship(
         back_populates="dish", cascade="all, delete-orphan"
     )
+    rating_stats: Mapped["DishRatingStats | None"] = relationship(
+        lazy="raise", viewonly=True
+    )
@@ -5,7 +5,7 @@ from typing import TYPE_CHECKING
 from decimal import Decimal
 from enum import Enum
 
-from sqlalchemy import DateTime, Enum as SAEnum, ForeignKey, Integer, Numeric, String
+from sqlalchemy import DateTime, Enum as SAEnum, ForeignKey, Index, Integer, Numeric, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ..db import Base
@@ -13,6 +13,7 @@ from .utils import utcnow
 
 if TYPE_CHECKING:
     from .product import Product
+    from .purchase_request import PurchaseRequest
     from .user import User
 
 
@@ -23,6 +24,10 @@ class InventoryDirection(str, Enum):
 
 class InventoryTransaction(Base):
     __tablename__ = "inventory_transactions"
+    __table_args__ = (
+        Index("ix_inventory_transactions_created_at_id", "created_at", "id"),
+        Index("ix_inventory_transactions_product_id_created_at", "product_id", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), nullable=False, index=True)
@@ -37,7 +42,13 @@ class InventoryTransaction(Base):
     )
     reason: Mapped[str | None] = mapped_column(String(255))
     created_by_id: Mapped[int | None] = mapped_column(ForeignKey("users.id"))
+    purchase_request_id: Mapped[int | None] = mapped_column(
+        ForeignKey("purchase_requests.id"), index=True
+    )
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
     product: Mapped["Product"] = relationship(back_populates="inventory_transactions")
     created_by: Mapped["User | None"] = relationship(back_populates="inventory_transactions")
+    purchase_request: Mapped["PurchaseRequest | None"] = relationship(
+        back_populates="inventory_transactions"
+    )
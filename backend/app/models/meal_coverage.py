@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import TYPE_CHECKING
+
+from sqlalchemy import Date, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from ..db import Base
+
+if TYPE_CHECKING:
+    from .payment import Payment
+
+
+class MealCoverage(Base):
+    __tablename__ = "meal_coverage"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    menu_date: Mapped[date] = mapped_column(Date, primary_key=True)
+    payment_id: Mapped[int] = mapped_column(
+        ForeignKey("payments.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+
+    payment: Mapped["Payment"] = relationship(back_populates="coverage")
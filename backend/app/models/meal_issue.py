@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import TYPE_CHECKING
 from enum import Enum
 
-from sqlalchemy import DateTime, Enum as SAEnum, ForeignKey, Integer, UniqueConstraint
+from sqlalchemy import DateTime, Enum as SAEnum, ForeignKey, Index, Integer, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ..db import Base
@@ -23,7 +23,11 @@ class MealIssueStatus(str, Enum):
 
 class MealIssue(Base):
     __tablename__ = "meal_issues"
-    __table_args__ = (UniqueConstraint("user_id", "menu_id", name="uq_meal_issue_user_menu"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "menu_id", name="uq_meal_issue_user_menu"),
+        Index("ix_meal_issues_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_meal_issues_menu_id_created_at_id", "menu_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
@@ -5,7 +5,16 @@ from enum import Enum
 from typing import TYPE_CHECKING
 from decimal import Decimal
 
-from sqlalchemy import Date, DateTime, Enum as SAEnum, Integer, Numeric, String, UniqueConstraint
+from sqlalchemy import (
+    Date,
+    DateTime,
+    Enum as SAEnum,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ..db import Base
@@ -25,10 +34,13 @@ class MealType(str, Enum):
 
 class Menu(Base):
     __tablename__ = "menus"
-    __table_args__ = (UniqueConstraint("menu_date", "meal_type", name="uq_menu_date_type"),)
+    __table_args__ = (
+        UniqueConstraint("menu_date", "meal_type", name="uq_menu_date_type"),
+        Index("ix_menus_menu_date_id", "menu_date", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    menu_date: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    menu_date: Mapped[date] = mapped_column(Date, nullable=False)
     meal_type: Mapped[MealType] = mapped_column(
         SAEnum(
             MealType,
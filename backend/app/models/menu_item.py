@@ -10,6 +10,7 @@ from ..db import Base
 
 if TYPE_CHECKING:
     from .dish import Dish
+    from .dish_rating_stats import MenuDishRatingStats
     from .menu import Menu
 
 
@@ -26,3 +27,11 @@ class MenuItem(Base):
 
     menu: Mapped["Menu"] = relationship(back_populates="menu_items")
     dish: Mapped["Dish"] = relationship(back_populates="menu_items")
+    rating_stats: Mapped["MenuDishRatingStats | None"] = relationship(
+        primaryjoin=(
+            "and_(MenuItem.menu_id == foreign(MenuDishRatingStats.menu_id), "
+            "MenuItem.dish_id == foreign(MenuDishRatingStats.dish_id))"
+        ),
+        lazy="raise",
+        viewonly=True,
+    )
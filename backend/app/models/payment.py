@@ -5,13 +5,14 @@ from typing import TYPE_CHECKING
 from decimal import Decimal
 from enum import Enum
 
-from sqlalchemy import Date, DateTime, Enum as SAEnum, ForeignKey, Integer, Numeric, String
+from sqlalchemy import Date, DateTime, Enum as SAEnum, ForeignKey, Index, Integer, Numeric, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ..db import Base
 from .utils import utcnow
 
 if TYPE_CHECKING:
+    from .meal_coverage import MealCoverage
     from .menu import Menu
     from .user import User
 
@@ -30,6 +31,11 @@ class PaymentStatus(str, Enum):
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        Index("ix_payments_user_id_menu_id", "user_id", "menu_id"),
+        Index("ix_payments_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_payments_created_at", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
@@ -60,3 +66,6 @@ class Payment(Base):
 
     user: Mapped["User"] = relationship(back_populates="payments")
     menu: Mapped["Menu | None"] = relationship(back_populates="payments")
+    coverage: Mapped[list["MealCoverage"]] = relationship(
+        back_populates="payment", passive_deletes=True
+    )
@@ -9,6 +9,7 @@ from ..db import Base
 
 if TYPE_CHECKING:
     from .inventory_transaction import InventoryTransaction
+    from .product_stock import ProductStock
     from .purchase_request_item import PurchaseRequestItem
 
 
@@ -27,3 +28,6 @@ class Product(Base):
     purchase_request_items: Mapped[list["PurchaseRequestItem"]] = relationship(
         back_populates="product"
     )
+    stock: Mapped["ProductStock | None"] = relationship(
+        back_populates="product", cascade="all, delete-orphan", passive_deletes=True
+    )
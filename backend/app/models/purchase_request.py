@@ -4,13 +4,14 @@ from datetime import datetime
 from typing import TYPE_CHECKING
 from enum import Enum
 
-from sqlalchemy import DateTime, Enum as SAEnum, ForeignKey, Integer, String
+from sqlalchemy import DateTime, Enum as SAEnum, ForeignKey, Index, Integer, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ..db import Base
 from .utils import utcnow
 
 if TYPE_CHECKING:
+    from .inventory_transaction import InventoryTransaction
     from .purchase_request_item import PurchaseRequestItem
     from .user import User
 
@@ -23,6 +24,15 @@ class PurchaseRequestStatus(str, Enum):
 
 class PurchaseRequest(Base):
     __tablename__ = "purchase_requests"
+    __table_args__ = (
+        Index("ix_purchase_requests_requested_at_id", "requested_at", "id"),
+        Index(
+            "ix_purchase_requests_approved_decided_at",
+            "decided_at",
+            postgresql_where=text("status = 'approved'"),
+            sqlite_where=text("status = 'approved'"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     requested_by_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -39,6 +49,7 @@ class PurchaseRequest(Base):
     note: Mapped[str | None] = mapped_column(String(255))
     requested_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
     decided_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    received_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
 
     requested_by: Mapped["User"] = relationship(
         foreign_keys=[requested_by_id], back_populates="purchase_requests"
@@ -49,3 +60,6 @@ class PurchaseRequest(Base):
     items: Mapped[list["PurchaseRequestItem"]] = relationship(
         back_populates="purchase_request", cascade="all, delete-orphan"
     )
+    inventory_transactions: Mapped[list["InventoryTransaction"]] = relationship(
+        back_populates="purchase_request"
+    )
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import Date, Enum as SAEnum, Index, Integer, Numeric, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..db import Base
+from .meal_issue import MealIssueStatus
+from .menu import MealType
+from .payment import PaymentStatus, PaymentType
+
+
+class AttendanceDailyRollup(Base):
+    __tablename__ = "attendance_daily_rollups"
+
+    menu_date: Mapped[date] = mapped_column(Date, primary_key=True)
+    meal_type: Mapped[MealType] = mapped_column(
+        SAEnum(
+            MealType,
+            name="meal_type",
+            values_callable=lambda enum_cls: [item.value for item in enum_cls],
+        ),
+        primary_key=True,
+    )
+    status: Mapped[MealIssueStatus] = mapped_column(
+        SAEnum(
+            MealIssueStatus,
+            name="meal_issue_status",
+            values_callable=lambda enum_cls: [item.value for item in enum_cls],
+        ),
+        primary_key=True,
+    )
+    issue_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class PaymentDailyRollup(Base):
+    __tablename__ = "payment_daily_rollups"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    status: Mapped[PaymentStatus] = mapped_column(
+        SAEnum(
+            PaymentStatus,
+            name="payment_status",
+            values_callable=lambda enum_cls: [item.value for item in enum_cls],
+        ),
+        primary_key=True,
+    )
+    payment_type: Mapped[PaymentType] = mapped_column(
+        SAEnum(
+            PaymentType,
+            name="payment_type",
+            values_callable=lambda enum_cls: [item.value for item in enum_cls],
+        ),
+        primary_key=True,
+    )
+    payment_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    amount: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False, default=0)
+
+
+class ReportRollupDirtyDay(Base):
+    __tablename__ = "report_rollup_dirty_days"
+    __table_args__ = (Index("ix_report_rollup_dirty_days_kind_day", "kind", "day"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    kind: Mapped[str] = mapped_column(String(32), nullable=False)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
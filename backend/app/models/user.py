@@ -13,6 +13,7 @@ from .utils import utcnow
 
 if TYPE_CHECKING:
     from .allergy import Allergy
+    from .auth_session import AuthSession
     from .inventory_transaction import InventoryTransaction
     from .meal_issue import MealIssue
     from .notification import Notification
@@ -75,3 +76,6 @@ class User(Base):
     notifications: Mapped[list["UserNotification"]] = relationship(
         back_populates="user", cascade="all, delete-orphan"
     )
+    auth_sessions: Mapped[list["AuthSession"]] = relationship(
+        back_populates="user", cascade="all, delete-orphan"
+    )
@@ -3,6 +3,7 @@ from .admin_reports import router as admin_reports_router
 from .admin_stats import router as admin_stats_router
 from .allergies import router as allergies_router
 from .dishes import router as dishes_router
+from .events import router as events_router
 from .inventory_transactions import router as inventory_transactions_router
 from .meal_issues import router as meal_issues_router
 from .menus import router as menus_router
@@ -20,6 +21,7 @@ __all__ = [
     "admin_stats_router",
     "allergies_router",
     "dishes_router",
+    "events_router",
     "inventory_transactions_router",
     "meal_issues_router",
     "menus_router",
@@ -9,6 +9,8 @@ from ..db import get_db
 from ..docs import roles_docs
 from ..models import MealIssueStatus, MealType, UserRole
 from ..schemas.admin_reports import (
+    ExpenseGroupBy,
+    ExpenseMonthItem,
     ExpenseReportItem,
     ExpenseReportResponse,
     NutritionReportItem,
@@ -79,7 +81,9 @@ async def get_nutrition_report_endpoint(
         "admin",
         notes=(
             "Отчет по затратам на закупку. "
-            "Учитываются только одобренные заявки, сумма считается как `quantity * unit_price`."
+            "Учитываются только одобренные заявки, сумма считается как `quantity * unit_price`. "
+            "Период фильтруется по дате решения `decided_at` (UTC), `date_to` включительно. "
+            "С `group_by=month` в `months` добавляются итоги по месяцам."
         ),
     ),
     summary="Отчет по затратам",
@@ -88,10 +92,11 @@ async def get_expense_report_endpoint(
     date_from: date | None = Query(default=None),
     date_to: date | None = Query(default=None),
     product_id: int | None = Query(default=None, gt=0),
+    group_by: ExpenseGroupBy | None = Query(default=None),
     db: AsyncSession = Depends(get_db),
 ) -> ExpenseReportResponse:
-    total_quantity, total_amount, rows = await get_expense_report(
-        db, date_from=date_from, date_to=date_to, product_id=product_id
+    report = await get_expense_report(
+        db, date_from=date_from, date_to=date_to, product_id=product_id, group_by=group_by
     )
     items = [
         ExpenseReportItem(
@@ -100,8 +105,15 @@ async def get_expense_report_endpoint(
             total_quantity=row[2],
             total_amount=row[3],
         )
-        for row in rows
+        for row in report.items
+    ]
+    months = [
+        ExpenseMonthItem(month=row[0], total_quantity=row[1], total_amount=row[2])
+        for row in report.months
     ]
     return ExpenseReportResponse(
-        total_quantity=total_quantity, total_amount=total_amount, items=items
+        total_quantity=report.total_quantity,
+        total_amount=report.total_amount,
+        items=items,
+        months=months,
     )
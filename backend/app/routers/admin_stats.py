@@ -11,12 +11,16 @@ from ..models import UserRole
 from ..schemas.admin_stats import (
     AttendanceStatsResponse,
     AttendanceStatusStat,
+    PasswordHashPoolStats,
+    PaymentPeriodStat,
     PaymentStatsResponse,
     PaymentStatusStat,
     PaymentTypeStat,
+    StatsGroupBy,
 )
 from ..services.admin_stats_service import get_attendance_stats, get_payment_stats
 from ..services.authorization import require_roles
+from ..services.security import password_hash_pool
 
 router = APIRouter(
     prefix="/admin/stats",
@@ -32,7 +36,8 @@ router = APIRouter(
         "admin",
         notes=(
             "Агрегация оплат по статусу и типу за период. "
-            "Фильтрация идет по `Payment.created_at`."
+            "Фильтрация идет по `Payment.created_at`. "
+            "С `group_by=day|week|month` в `series` добавляется ряд по периодам (UTC)."
         ),
     ),
     summary="Статистика оплат",
@@ -40,21 +45,24 @@ router = APIRouter(
 async def get_payment_stats_endpoint(
     date_from: datetime | None = Query(default=None),
     date_to: datetime | None = Query(default=None),
+    group_by: StatsGroupBy | None = Query(default=None),
     db: AsyncSession = Depends(get_db),
 ) -> PaymentStatsResponse:
-    total_count, total_amount, status_rows, type_rows = await get_payment_stats(
-        db, date_from=date_from, date_to=date_to
-    )
+    stats = await get_payment_stats(db, date_from=date_from, date_to=date_to, group_by=group_by)
     return PaymentStatsResponse(
-        total_count=total_count,
-        total_amount=total_amount,
+        total_count=stats.total_count,
+        total_amount=stats.total_amount,
         by_status=[
             PaymentStatusStat(status=row[0], count=row[1], amount=row[2])
-            for row in status_rows
+            for row in stats.by_status
         ],
         by_type=[
             PaymentTypeStat(payment_type=row[0], count=row[1], amount=row[2])
-            for row in type_rows
+            for row in stats.by_type
+        ],
+        series=[
+            PaymentPeriodStat(period_start=row[0], count=row[1], amount=row[2])
+            for row in stats.series
         ],
     )
 
@@ -83,3 +91,19 @@ async def get_attendance_stats_endpoint(
         total_count=total_count,
         by_status=[AttendanceStatusStat(status=row[0], count=row[1]) for row in status_rows],
     )
+
+
+@router.get(
+    "/password-hashing",
+    response_model=PasswordHashPoolStats,
+    **roles_docs(
+        "admin",
+        notes=(
+            "Состояние пула потоков для bcrypt: сколько хешей выполняется, сколько ждут "
+            "в очереди и сколько запросов отклонено с 503 из-за переполнения."
+        ),
+    ),
+    summary="Нагрузка на хеширование паролей",
+)
+async def get_password_hashing_stats_endpoint() -> PasswordHashPoolStats:
+    return PasswordHashPoolStats(**password_hash_pool.stats())
@@ -8,8 +8,21 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from ..db import get_db
 from ..docs import error_response, public_docs, roles_docs
 from ..models import User
-from ..schemas.auth import LoginRequest, RegisterRequest, TokenResponse, UserPublic
-from ..services.auth_service import get_current_user, login_user, register_student
+from ..schemas.auth import (
+    LoginRequest,
+    RefreshRequest,
+    RegisterRequest,
+    TokenRefreshResponse,
+    TokenResponse,
+    UserPublic,
+)
+from ..services.auth_service import (
+    get_current_user,
+    login_user,
+    refresh_auth_session,
+    register_student,
+    revoke_auth_session,
+)
 from ..services.errors import raise_http_401
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -24,6 +37,7 @@ bearer_scheme = HTTPBearer(auto_error=False)
         notes="Создает пользователя с ролью `student`.",
         extra_responses={
             400: error_response("Email уже зарегистрирован", "Bad request"),
+            503: error_response("Сервер перегружен, повторите попытку позже", "Сервер перегружен"),
         }
     ),
     summary="Регистрация ученика",
@@ -37,9 +51,14 @@ async def register(payload: RegisterRequest, db: AsyncSession = Depends(get_db))
     "/login",
     response_model=TokenResponse,
     **public_docs(
-        notes="Возвращает токен доступа и профиль пользователя.",
+        notes=(
+            "Возвращает токен доступа, токен обновления и профиль пользователя. "
+            "Когда токен доступа истекает, его можно обновить через `/auth/refresh` "
+            "без повторного ввода пароля."
+        ),
         extra_responses={
             401: error_response("Неверный логин или пароль", "Unauthorized"),
+            503: error_response("Сервер перегружен, повторите попытку позже", "Сервер перегружен"),
         }
     ),
     summary="Вход в систему",
@@ -53,15 +72,61 @@ async def login(
         payload = LoginRequest(email=str(username), password=password)
     except ValidationError as exc:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=exc.errors()) from exc
-    user, token, expires_in = await login_user(payload, db)
+    user, token, expires_in, refresh_token, refresh_expires_in = await login_user(payload, db)
     return TokenResponse(
         access_token=token,
         token_type="bearer",
         expires_in=expires_in,
+        refresh_token=refresh_token,
+        refresh_expires_in=refresh_expires_in,
         user=UserPublic.model_validate(user),
     )
 
 
+@router.post(
+    "/refresh",
+    response_model=TokenRefreshResponse,
+    **public_docs(
+        notes=(
+            "Выдает новый токен доступа по токену обновления. "
+            "Токен обновления одноразовый: в ответе приходит новый, старый перестает работать."
+        ),
+        extra_responses={
+            401: error_response("Недействительный токен обновления", "Unauthorized"),
+        },
+    ),
+    summary="Обновление токена",
+)
+async def refresh(
+    payload: RefreshRequest, db: AsyncSession = Depends(get_db)
+) -> TokenRefreshResponse:
+    token, expires_in, refresh_token, refresh_expires_in = await refresh_auth_session(
+        payload.refresh_token, db
+    )
+    return TokenRefreshResponse(
+        access_token=token,
+        token_type="bearer",
+        expires_in=expires_in,
+        refresh_token=refresh_token,
+        refresh_expires_in=refresh_expires_in,
+    )
+
+
+@router.post(
+    "/logout",
+    **public_docs(
+        notes="Отзывает сессию: токен обновления больше нельзя использовать.",
+        extra_responses={
+            401: error_response("Недействительный токен обновления", "Unauthorized"),
+        },
+    ),
+    summary="Выход из системы",
+)
+async def logout(payload: RefreshRequest, db: AsyncSession = Depends(get_db)) -> dict[str, str]:
+    await revoke_auth_session(payload.refresh_token, db)
+    return {"status": "ok"}
+
+
 @router.get(
     "/me",
     response_model=UserPublic,
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Header
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db import get_db
+from ..docs import roles_docs
+from ..schemas.meal_issue import MealIssuePublic
+from ..schemas.notification import UnreadCountEvent
+from ..services.authorization import require_principal
+from ..services.event_stream_service import EventCursor, StreamEvent, stream_user_events
+from ..services.principal_cache import Principal
+from .notifications import build_notification_item
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+RETRY_MILLISECONDS = 3000
+
+
+def _serialize(event: StreamEvent) -> str:
+    if event.name == "notification":
+        return build_notification_item(event.data).model_dump_json()
+    if event.name == "meal_issue":
+        return MealIssuePublic.model_validate(event.data).model_dump_json()
+    return UnreadCountEvent(**event.data).model_dump_json()
+
+
+def format_sse(event: StreamEvent | None) -> str:
+    if event is None:
+        return ": keepalive\n\n"
+    return f"id: {event.cursor.encode()}\nevent: {event.name}\ndata: {_serialize(event)}\n\n"
+
+
+@router.get(
+    "/stream",
+    **roles_docs(
+        notes=(
+            "Поток Server-Sent Events: `notification` (новое уведомление), "
+            "`meal_issue` (питание выдано) и `unread_count` (изменение числа непрочитанных). "
+            "При переподключении браузер передает `Last-Event-ID`, и пропущенные события "
+            "досылаются."
+        )
+    ),
+    summary="Поток событий пользователя",
+    response_class=StreamingResponse,
+)
+async def stream_events(
+    last_event_id: str | None = Header(default=None, alias="Last-Event-ID"),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(require_principal),
+) -> StreamingResponse:
+    user_id = current_user.id
+    cursor = EventCursor.decode(last_event_id)
+
+    async def body():
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+        async for event in stream_user_events(db, user_id, cursor):
+            yield format_sse(event)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -3,21 +3,29 @@ from __future__ import annotations
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db import get_db
 from ..docs import error_response, roles_docs
-from ..models import InventoryDirection, User, UserRole
+from ..models import InventoryDirection, UserRole
 from ..schemas.inventory_transaction import (
+    InventoryReceiptCreate,
+    InventoryReceiptResponse,
     InventoryTransactionCreate,
     InventoryTransactionListResponse,
     InventoryTransactionPublic,
 )
 from ..services.authorization import require_roles
+from ..services.export_service import ExportFormat, export_response
 from ..services.inventory_transaction_service import (
     create_inventory_transaction,
+    inventory_transaction_export_query,
     list_inventory_transactions,
+    receive_inventory,
 )
+from ..services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from ..services.principal_cache import Principal
 
 router = APIRouter(
     prefix="/inventory-transactions",
@@ -37,16 +45,52 @@ async def list_inventory_transactions_endpoint(
     direction: InventoryDirection | None = Query(default=None),
     date_from: datetime | None = Query(default=None),
     date_to: datetime | None = Query(default=None),
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: AsyncSession = Depends(get_db),
 ) -> InventoryTransactionListResponse:
-    transactions = await list_inventory_transactions(
-        db, product_id=product_id, direction=direction, date_from=date_from, date_to=date_to
+    page = await list_inventory_transactions(
+        db,
+        product_id=product_id,
+        direction=direction,
+        date_from=date_from,
+        date_to=date_to,
+        cursor=cursor,
+        limit=limit,
     )
     return InventoryTransactionListResponse(
-        items=[InventoryTransactionPublic.model_validate(item) for item in transactions]
+        items=[InventoryTransactionPublic.model_validate(item) for item in page.items],
+        next_cursor=page.next_cursor,
     )
 
 
+@router.get(
+    "/export",
+    **roles_docs(
+        "cook",
+        "admin",
+        notes=(
+            "Выгрузка движений склада целиком потоком: `format=ndjson` или `format=csv`. "
+            "Фильтры те же, что у списка."
+        ),
+    ),
+    summary="Экспорт движений склада",
+    response_class=StreamingResponse,
+)
+async def export_inventory_transactions_endpoint(
+    product_id: int | None = Query(default=None, gt=0),
+    direction: InventoryDirection | None = Query(default=None),
+    date_from: datetime | None = Query(default=None),
+    date_to: datetime | None = Query(default=None),
+    export_format: ExportFormat = Query(default=ExportFormat.NDJSON, alias="format"),
+    db: AsyncSession = Depends(get_db),
+) -> StreamingResponse:
+    stmt = inventory_transaction_export_query(
+        product_id=product_id, direction=direction, date_from=date_from, date_to=date_to
+    )
+    return export_response(db, stmt, export_format, "inventory-transactions")
+
+
 @router.post(
     "/",
     response_model=InventoryTransactionPublic,
@@ -68,7 +112,40 @@ async def list_inventory_transactions_endpoint(
 async def create_inventory_transaction_endpoint(
     payload: InventoryTransactionCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.COOK, UserRole.ADMIN)),
+    current_user: Principal = Depends(require_roles(UserRole.COOK, UserRole.ADMIN)),
 ) -> InventoryTransactionPublic:
     transaction = await create_inventory_transaction(payload, current_user.id, db)
     return InventoryTransactionPublic.model_validate(transaction)
+
+
+@router.post(
+    "/receipts",
+    response_model=InventoryReceiptResponse,
+    status_code=status.HTTP_201_CREATED,
+    **roles_docs(
+        "cook",
+        "admin",
+        notes=(
+            "Приход всей поставки одним запросом: все позиции записываются одной транзакцией. "
+            "С `purchase_request_id` поставка привязывается к согласованной заявке; "
+            "если `items` не переданы, приходуются еще не полученные позиции заявки. "
+            "Заявку можно оприходовать частями: `received_at` проставляется, когда получены "
+            "все ее позиции."
+        ),
+        extra_responses={
+            400: error_response("Поставка по заявке уже оприходована", "Bad request"),
+            404: error_response("Заявка на закупку не найдена", "Not found"),
+        },
+    ),
+    summary="Оприходовать поставку",
+)
+async def receive_inventory_endpoint(
+    payload: InventoryReceiptCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(require_roles(UserRole.COOK, UserRole.ADMIN)),
+) -> InventoryReceiptResponse:
+    transactions = await receive_inventory(payload, current_user.id, db)
+    return InventoryReceiptResponse(
+        purchase_request_id=payload.purchase_request_id,
+        items=[InventoryTransactionPublic.model_validate(item) for item in transactions],
+    )
@@ -2,29 +2,38 @@ from __future__ import annotations
 
 from datetime import date, datetime, timezone
 
-import asyncio
-
 from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db import get_db
 from ..docs import error_response, roles_docs
-from ..models import MealIssueStatus, User, UserRole
+from ..models import MealIssueStatus, UserRole
 from ..schemas.meal_issue import (
     MealIssueCreate,
     MealIssueListResponse,
     MealIssuePublic,
+    MealIssueServeBatchRequest,
+    MealIssueServeBatchResponse,
+    MealIssueServePublic,
     MealIssueServeRequest,
+    MealIssueServeResult,
 )
 from ..services.authorization import require_roles
+from ..services.export_service import ExportFormat, export_response
 from ..services.meal_issue_service import (
     confirm_meal,
     issue_meal,
     list_meal_issues,
     list_meal_issues_for_staff,
     list_served_meal_issues_since,
+    meal_issue_export_query,
     serve_meal,
+    serve_meals_batch,
 )
+from ..services.notification_bus import notification_bus, poll_until_items
+from ..services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from ..services.principal_cache import Principal
 
 router = APIRouter(prefix="/meal-issues", tags=["meal-issues"])
 
@@ -36,12 +45,15 @@ router = APIRouter(prefix="/meal-issues", tags=["meal-issues"])
     summary="Мои выдачи питания",
 )
 async def list_my_meal_issues(
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.STUDENT)),
+    current_user: Principal = Depends(require_roles(UserRole.STUDENT)),
 ) -> MealIssueListResponse:
-    issues = await list_meal_issues(current_user.id, db)
+    page = await list_meal_issues(current_user.id, db, cursor=cursor, limit=limit)
     return MealIssueListResponse(
-        items=[MealIssuePublic.model_validate(item) for item in issues]
+        items=[MealIssuePublic.model_validate(item) for item in page.items],
+        next_cursor=page.next_cursor,
     )
 
 
@@ -55,7 +67,7 @@ async def long_poll_my_meal_issues(
     since: datetime | None = Query(default=None),
     timeout: int = Query(default=25, ge=5, le=60),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.STUDENT)),
+    current_user: Principal = Depends(require_roles(UserRole.STUDENT)),
 ) -> MealIssueListResponse:
     since_value = since
     if since_value is None:
@@ -63,18 +75,18 @@ async def long_poll_my_meal_issues(
     elif since_value.tzinfo is None:
         since_value = since_value.replace(tzinfo=timezone.utc)
 
-    start = datetime.now(timezone.utc)
-    while True:
-        issues = await list_served_meal_issues_since(current_user.id, since_value, db)
-        if issues:
-            return MealIssueListResponse(
-                items=[MealIssuePublic.model_validate(item) for item in issues]
-            )
+    user_id = current_user.id
+    with notification_bus.subscribe(user_id) as wakeup:
+        issues = await poll_until_items(
+            wakeup,
+            timeout,
+            lambda: list_served_meal_issues_since(user_id, since_value, db),
+            db.close,
+        )
 
-        elapsed = (datetime.now(timezone.utc) - start).total_seconds()
-        if elapsed >= timeout:
-            return MealIssueListResponse(items=[])
-        await asyncio.sleep(1)
+    return MealIssueListResponse(
+        items=[MealIssuePublic.model_validate(item) for item in issues]
+    )
 
 
 @router.get(
@@ -93,20 +105,58 @@ async def list_meal_issues_for_staff_endpoint(
     user_id: int | None = Query(default=None, gt=0),
     date_from: date | None = Query(default=None),
     date_to: date | None = Query(default=None),
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: AsyncSession = Depends(get_db),
     _: object = Depends(require_roles(UserRole.COOK, UserRole.ADMIN)),
 ) -> MealIssueListResponse:
-    issues = await list_meal_issues_for_staff(
+    page = await list_meal_issues_for_staff(
         db,
         status=status,
         menu_id=menu_id,
         user_id=user_id,
         date_from=date_from,
         date_to=date_to,
+        cursor=cursor,
+        limit=limit,
     )
     return MealIssueListResponse(
-        items=[MealIssuePublic.model_validate(item) for item in issues]
+        items=[MealIssuePublic.model_validate(item) for item in page.items],
+        next_cursor=page.next_cursor,
+    )
+
+
+@router.get(
+    "/export",
+    **roles_docs(
+        "cook",
+        "admin",
+        notes=(
+            "Выгрузка выдач питания целиком потоком: `format=ndjson` (по строке JSON на выдачу) "
+            "или `format=csv`. Фильтры те же, что у списка."
+        ),
+    ),
+    summary="Экспорт выдач питания",
+    response_class=StreamingResponse,
+)
+async def export_meal_issues_endpoint(
+    status: MealIssueStatus | None = Query(default=None),
+    menu_id: int | None = Query(default=None, gt=0),
+    user_id: int | None = Query(default=None, gt=0),
+    date_from: date | None = Query(default=None),
+    date_to: date | None = Query(default=None),
+    export_format: ExportFormat = Query(default=ExportFormat.NDJSON, alias="format"),
+    db: AsyncSession = Depends(get_db),
+    _: object = Depends(require_roles(UserRole.COOK, UserRole.ADMIN)),
+) -> StreamingResponse:
+    stmt = meal_issue_export_query(
+        status=status,
+        menu_id=menu_id,
+        user_id=user_id,
+        date_from=date_from,
+        date_to=date_to,
     )
+    return export_response(db, stmt, export_format, "meal-issues")
 
 
 @router.post(
@@ -129,7 +179,7 @@ async def list_meal_issues_for_staff_endpoint(
 async def issue_my_meal(
     payload: MealIssueCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.STUDENT)),
+    current_user: Principal = Depends(require_roles(UserRole.STUDENT)),
 ) -> MealIssuePublic:
     issue = await issue_meal(current_user.id, payload.menu_id, db)
     return MealIssuePublic.model_validate(issue)
@@ -155,7 +205,7 @@ async def issue_my_meal(
 async def confirm_my_meal(
     payload: MealIssueCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.STUDENT)),
+    current_user: Principal = Depends(require_roles(UserRole.STUDENT)),
 ) -> MealIssuePublic:
     issue = await confirm_meal(current_user.id, payload.menu_id, db)
     return MealIssuePublic.model_validate(issue)
@@ -163,14 +213,15 @@ async def confirm_my_meal(
 
 @router.post(
     "/serve",
-    response_model=MealIssuePublic,
+    response_model=MealIssueServePublic,
     status_code=status.HTTP_201_CREATED,
     **roles_docs(
         "cook",
         "admin",
         notes=(
             "Отмечает, что питание выдано. "
-            "Если выдача еще не создана (например, по абонементу), она будет создана автоматически."
+            "Если выдача еще не создана (например, по абонементу), она будет создана автоматически. "
+            "В `allergy_warnings` перечислены аллергены ученика, которые есть в блюдах меню."
         ),
         extra_responses={
             400: error_response("Питание уже выдано", "Bad request"),
@@ -182,7 +233,51 @@ async def confirm_my_meal(
 async def serve_meal_to_student(
     payload: MealIssueServeRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.COOK)),
-) -> MealIssuePublic:
-    issue = await serve_meal(payload.user_id, payload.menu_id, current_user.id, db)
-    return MealIssuePublic.model_validate(issue)
+    current_user: Principal = Depends(require_roles(UserRole.COOK)),
+) -> MealIssueServePublic:
+    issue, warnings = await serve_meal(payload.user_id, payload.menu_id, current_user.id, db)
+    return MealIssueServePublic.model_validate(issue).model_copy(
+        update={"allergy_warnings": warnings}
+    )
+
+
+@router.post(
+    "/serve/batch",
+    response_model=MealIssueServeBatchResponse,
+    **roles_docs(
+        "cook",
+        "admin",
+        notes=(
+            "Выдает питание сразу нескольким ученикам (например, всему классу). "
+            "Для каждого ученика в ответе указан результат: выдано или причина отказа. "
+            "Отказ одному ученику не мешает выдаче остальным. "
+            "У выданных учеников в `allergy_warnings` перечислены их аллергены из блюд меню."
+        ),
+        extra_responses={
+            400: error_response("Недостаточно блюд в меню для выдачи", "Bad request"),
+            404: error_response("Меню не найдено", "Not found"),
+        },
+    ),
+    summary="Выдать питание группе учеников",
+)
+async def serve_meals_batch_endpoint(
+    payload: MealIssueServeBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(require_roles(UserRole.COOK)),
+) -> MealIssueServeBatchResponse:
+    results = await serve_meals_batch(payload.user_ids, payload.menu_id, current_user.id, db)
+    items = [
+        MealIssueServeResult(
+            user_id=user_id,
+            served=detail is None,
+            detail=detail,
+            issue=MealIssuePublic.model_validate(issue) if issue is not None else None,
+            allergy_warnings=warnings,
+        )
+        for user_id, issue, detail, warnings in results
+    ]
+    return MealIssueServeBatchResponse(
+        menu_id=payload.menu_id,
+        served_count=sum(1 for item in items if item.served),
+        items=items,
+    )
@@ -2,21 +2,40 @@ from __future__ import annotations
 
 from datetime import date
 
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db import get_db
 from ..docs import error_response, roles_docs
 from ..models import MealType, UserRole
-from ..schemas.menu import MenuCreate, MenuListResponse, MenuPublic, MenuUpdate
+from ..schemas.menu import (
+    MenuCreate,
+    MenuDishRatingItem,
+    MenuEligibilityItem,
+    MenuEligibilityResponse,
+    MenuListResponse,
+    MenuPortionItem,
+    MenuPortionsResponse,
+    MenuPublic,
+    MenuRatingsResponse,
+    MenuUpdate,
+    PersonalMenuListResponse,
+)
 from ..services.authorization import require_roles
+from ..services.eligibility_service import get_menu_eligibility
+from ..services.menu_cache import cached_menu_response
 from ..services.menu_service import (
     create_menu,
     delete_menu,
     get_menu,
+    get_menu_portions,
     list_menus,
+    list_personal_menus,
     update_menu,
 )
+from ..services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from ..services.principal_cache import Principal
+from ..services.review_service import get_menu_ratings
 
 router = APIRouter(
     prefix="/menus",
@@ -32,18 +51,79 @@ router = APIRouter(
         "student",
         "cook",
         "admin",
-        notes="Список меню с фильтрами по датам и типу приема пищи.",
+        notes=(
+            "Список меню с фильтрами по датам и типу приема пищи. "
+            "Ответ отдается с `ETag`; при совпадении `If-None-Match` возвращается 304."
+        ),
+        extra_responses={304: {"description": "Not modified"}},
     ),
     summary="Список меню",
 )
 async def list_menus_endpoint(
+    request: Request,
     date_from: date | None = Query(default=None),
     date_to: date | None = Query(default=None),
     meal_type: MealType | None = Query(default=None),
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: AsyncSession = Depends(get_db),
-) -> MenuListResponse:
-    menus = await list_menus(db, date_from=date_from, date_to=date_to, meal_type=meal_type)
-    return MenuListResponse(items=[MenuPublic.model_validate(menu) for menu in menus])
+) -> Response:
+    async def build() -> MenuListResponse:
+        page = await list_menus(
+            db,
+            date_from=date_from,
+            date_to=date_to,
+            meal_type=meal_type,
+            cursor=cursor,
+            limit=limit,
+        )
+        return MenuListResponse(
+            items=[MenuPublic.model_validate(menu) for menu in page.items],
+            next_cursor=page.next_cursor,
+        )
+
+    key = ("list", date_from, date_to, meal_type, cursor, limit)
+    return await cached_menu_response(request, key, build)
+
+
+@router.get(
+    "/me",
+    response_model=PersonalMenuListResponse,
+    **roles_docs(
+        "student",
+        "cook",
+        "admin",
+        notes=(
+            "Список меню с отметкой блюд, в которых есть аллергены текущего пользователя "
+            "(`allergy_conflict`, `conflicting_allergy_ids`). "
+            "С `exclude_conflicts=true` такие блюда не попадают в ответ. "
+            "Фильтры и пагинация те же, что у `/menus/`."
+        ),
+    ),
+    summary="Меню с учетом аллергий",
+)
+async def list_personal_menus_endpoint(
+    date_from: date | None = Query(default=None),
+    date_to: date | None = Query(default=None),
+    meal_type: MealType | None = Query(default=None),
+    exclude_conflicts: bool = Query(default=False),
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(
+        require_roles(UserRole.STUDENT, UserRole.COOK, UserRole.ADMIN)
+    ),
+) -> PersonalMenuListResponse:
+    return await list_personal_menus(
+        current_user.id,
+        db,
+        date_from=date_from,
+        date_to=date_to,
+        meal_type=meal_type,
+        cursor=cursor,
+        limit=limit,
+        exclude_conflicts=exclude_conflicts,
+    )
 
 
 @router.get(
@@ -53,14 +133,108 @@ async def list_menus_endpoint(
         "student",
         "cook",
         "admin",
-        notes="Возвращает меню по идентификатору.",
-        extra_responses={404: error_response("Меню не найдено", "Not found")},
+        notes=(
+            "Возвращает меню по идентификатору. "
+            "Ответ отдается с `ETag`; при совпадении `If-None-Match` возвращается 304."
+        ),
+        extra_responses={
+            304: {"description": "Not modified"},
+            404: error_response("Меню не найдено", "Not found"),
+        },
     ),
     summary="Меню по id",
 )
-async def get_menu_endpoint(menu_id: int, db: AsyncSession = Depends(get_db)) -> MenuPublic:
-    menu = await get_menu(menu_id, db)
-    return MenuPublic.model_validate(menu)
+async def get_menu_endpoint(
+    request: Request, menu_id: int, db: AsyncSession = Depends(get_db)
+) -> Response:
+    async def build() -> MenuPublic:
+        return MenuPublic.model_validate(await get_menu(menu_id, db))
+
+    return await cached_menu_response(request, ("menu", menu_id), build)
+
+
+@router.get(
+    "/{menu_id}/portions",
+    response_model=MenuPortionsResponse,
+    **roles_docs(
+        "cook",
+        "admin",
+        notes=(
+            "Сколько порций осталось по позициям меню. Для меню на сегодня воркер держит "
+            "счетчики в памяти и отвечает без запроса к БД (`live: true`): `remaining_qty` — "
+            "остаток в БД, `reserved_qty` — неизрасходованный блок только этого воркера, "
+            "поэтому сумма полей не равна общему остатку при нескольких воркерах."
+        ),
+        extra_responses={404: error_response("Меню не найдено", "Not found")},
+    ),
+    summary="Остаток порций меню",
+)
+async def get_menu_portions_endpoint(
+    menu_id: int,
+    db: AsyncSession = Depends(get_db),
+    _: object = Depends(require_roles(UserRole.COOK, UserRole.ADMIN)),
+) -> MenuPortionsResponse:
+    items, live = await get_menu_portions(menu_id, db)
+    return MenuPortionsResponse(
+        menu_id=menu_id,
+        live=live,
+        items=[MenuPortionItem(**item._asdict()) for item in items],
+    )
+
+
+@router.get(
+    "/{menu_id}/ratings",
+    response_model=MenuRatingsResponse,
+    **roles_docs(
+        "student",
+        "cook",
+        "admin",
+        notes=(
+            "Оценки блюд меню: сводка по этому меню и по блюду в целом. "
+            "Оценки не входят в кешируемый ответ `GET /menus/{id}`, чтобы каждый отзыв "
+            "не сбрасывал кеш меню."
+        ),
+        extra_responses={404: error_response("Меню не найдено", "Not found")},
+    ),
+    summary="Оценки блюд меню",
+)
+async def get_menu_ratings_endpoint(
+    menu_id: int, db: AsyncSession = Depends(get_db)
+) -> MenuRatingsResponse:
+    items = await get_menu_ratings(menu_id, db)
+    return MenuRatingsResponse(
+        menu_id=menu_id,
+        items=[MenuDishRatingItem.model_validate(item._asdict()) for item in items],
+    )
+
+
+@router.get(
+    "/{menu_id}/eligibility",
+    response_model=MenuEligibilityResponse,
+    **roles_docs(
+        "cook",
+        "admin",
+        notes=(
+            "Кто может получить питание по меню: ученики с разовой оплатой этого меню, "
+            "с абонементом на дату меню или с уже созданной выдачей. "
+            "Терминал выдачи загружает список заранее и отвечает по нему без запросов. "
+            "Ответ кешируется на воркере и сбрасывается при оплатах, возвратах и выдачах."
+        ),
+        extra_responses={404: error_response("Меню не найдено", "Not found")},
+    ),
+    summary="Список допущенных к питанию",
+)
+async def get_menu_eligibility_endpoint(
+    menu_id: int,
+    db: AsyncSession = Depends(get_db),
+    _: object = Depends(require_roles(UserRole.COOK, UserRole.ADMIN)),
+) -> MenuEligibilityResponse:
+    eligibility = await get_menu_eligibility(menu_id, db)
+    return MenuEligibilityResponse(
+        menu_id=eligibility.menu_id,
+        menu_date=eligibility.menu_date,
+        items=[MenuEligibilityItem(**item._asdict()) for item in eligibility.items],
+    )
 
 
 @router.post(
@@ -2,15 +2,15 @@
 
 from datetime import datetime, timezone
 
-import asyncio
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db import get_db
 from ..docs import error_response, roles_docs
-from ..models import User, UserNotification
+from ..models import UserNotification
 from ..schemas.notification import NotificationItem, NotificationListResponse
-from ..services.authorization import require_user
+from ..services.authorization import require_principal
+from ..services.notification_bus import notification_bus, poll_until_items
 from ..services.notification_service import (
     count_unread_notifications,
     get_user_notification,
@@ -19,6 +19,7 @@ from ..services.notification_service import (
     mark_all_notifications_read,
     mark_notification_read,
 )
+from ..services.principal_cache import Principal
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
@@ -47,7 +48,7 @@ async def list_notifications_endpoint(
     limit: int = Query(default=30, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_user),
+    current_user: Principal = Depends(require_principal),
 ) -> NotificationListResponse:
     notifications = await list_user_notifications(
         db,
@@ -73,7 +74,7 @@ async def long_poll_notifications(
     since: datetime | None = Query(default=None),
     timeout: int = Query(default=25, ge=5, le=60),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_user),
+    current_user: Principal = Depends(require_principal),
 ) -> NotificationListResponse:
     since_value = since
     if since_value is None:
@@ -81,26 +82,25 @@ async def long_poll_notifications(
     elif since_value.tzinfo is None:
         since_value = since_value.replace(tzinfo=timezone.utc)
 
-    start = datetime.now(timezone.utc)
-    while True:
-        items = await list_user_notifications_since(
-            db,
-            user_id=current_user.id,
-            since=since_value,
-            limit=30,
+    user_id = current_user.id
+    with notification_bus.subscribe(user_id) as wakeup:
+        items = await poll_until_items(
+            wakeup,
+            timeout,
+            lambda: list_user_notifications_since(
+                db,
+                user_id=user_id,
+                since=since_value,
+                limit=30,
+            ),
+            db.close,
         )
-        if items:
-            unread_count = await count_unread_notifications(db, current_user.id)
-            return NotificationListResponse(
-                items=[build_notification_item(item) for item in items],
-                unread_count=unread_count,
-            )
 
-        elapsed = (datetime.now(timezone.utc) - start).total_seconds()
-        if elapsed >= timeout:
-            unread_count = await count_unread_notifications(db, current_user.id)
-            return NotificationListResponse(items=[], unread_count=unread_count)
-        await asyncio.sleep(1)
+    unread_count = await count_unread_notifications(db, user_id)
+    return NotificationListResponse(
+        items=[build_notification_item(item) for item in items],
+        unread_count=unread_count,
+    )
 
 
 @router.post(
@@ -116,7 +116,7 @@ async def long_poll_notifications(
 async def mark_notification_read_endpoint(
     user_notification_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_user),
+    current_user: Principal = Depends(require_principal),
 ) -> NotificationItem:
     user_notification = await get_user_notification(user_notification_id, current_user.id, db)
     user_notification = await mark_notification_read(user_notification, db)
@@ -130,7 +130,7 @@ async def mark_notification_read_endpoint(
 )
 async def mark_all_notifications_read_endpoint(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_user),
+    current_user: Principal = Depends(require_principal),
 ) -> dict[str, str]:
     await mark_all_notifications_read(db, current_user.id)
     return {"status": "ok"}
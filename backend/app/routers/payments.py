@@ -1,11 +1,14 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, status
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db import get_db
 from ..docs import error_response, roles_docs
-from ..models import User, UserRole
+from ..models import PaymentStatus, PaymentType, UserRole
 from ..schemas.payment import (
     PaymentCreateOneTime,
     PaymentCreateSubscription,
@@ -14,12 +17,17 @@ from ..schemas.payment import (
 )
 from ..services.authorization import require_roles
 from ..services.errors import raise_http_404
+from ..services.export_service import ExportFormat, export_response
 from ..services.payment_service import (
     create_one_time_payment,
     create_subscription_payment,
     get_active_subscription,
     list_my_payments,
+    payment_export_query,
+    refund_payment,
 )
+from ..services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from ..services.principal_cache import Principal
 from ..models.utils import utcnow
 
 router = APIRouter(prefix="/payments", tags=["payments"])
@@ -32,13 +40,48 @@ router = APIRouter(prefix="/payments", tags=["payments"])
     summary="Мои оплаты",
 )
 async def list_my_payments_endpoint(
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.STUDENT, UserRole.ADMIN)),
+    current_user: Principal = Depends(require_roles(UserRole.STUDENT, UserRole.ADMIN)),
 ) -> PaymentListResponse:
-    payments = await list_my_payments(current_user.id, db)
+    page = await list_my_payments(current_user.id, db, cursor=cursor, limit=limit)
     return PaymentListResponse(
-        items=[PaymentPublic.model_validate(payment) for payment in payments]
+        items=[PaymentPublic.model_validate(payment) for payment in page.items],
+        next_cursor=page.next_cursor,
+    )
+
+
+@router.get(
+    "/export",
+    **roles_docs(
+        "admin",
+        notes=(
+            "Выгрузка всех оплат потоком: `format=ndjson` или `format=csv`. "
+            "Фильтры по ученику, статусу, типу и дате создания."
+        ),
+    ),
+    summary="Экспорт оплат",
+    response_class=StreamingResponse,
+    dependencies=[Depends(require_roles(UserRole.ADMIN))],
+)
+async def export_payments_endpoint(
+    user_id: int | None = Query(default=None, gt=0),
+    status: PaymentStatus | None = Query(default=None),
+    payment_type: PaymentType | None = Query(default=None),
+    date_from: datetime | None = Query(default=None),
+    date_to: datetime | None = Query(default=None),
+    export_format: ExportFormat = Query(default=ExportFormat.NDJSON, alias="format"),
+    db: AsyncSession = Depends(get_db),
+) -> StreamingResponse:
+    stmt = payment_export_query(
+        user_id=user_id,
+        status=status,
+        payment_type=payment_type,
+        date_from=date_from,
+        date_to=date_to,
     )
+    return export_response(db, stmt, export_format, "payments")
 
 
 @router.post(
@@ -64,7 +107,7 @@ async def list_my_payments_endpoint(
 async def create_one_time_payment_endpoint(
     payload: PaymentCreateOneTime,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.STUDENT, UserRole.ADMIN)),
+    current_user: Principal = Depends(require_roles(UserRole.STUDENT, UserRole.ADMIN)),
 ) -> PaymentPublic:
     payment = await create_one_time_payment(
         current_user.id,
@@ -96,7 +139,7 @@ async def create_one_time_payment_endpoint(
 async def create_subscription_payment_endpoint(
     payload: PaymentCreateSubscription,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.STUDENT, UserRole.ADMIN)),
+    current_user: Principal = Depends(require_roles(UserRole.STUDENT, UserRole.ADMIN)),
 ) -> PaymentPublic:
     payment = await create_subscription_payment(
         current_user.id, payload.period_start, payload.period_end, db
@@ -117,10 +160,37 @@ async def create_subscription_payment_endpoint(
 )
 async def get_active_subscription_endpoint(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.STUDENT, UserRole.ADMIN)),
+    current_user: Principal = Depends(require_roles(UserRole.STUDENT, UserRole.ADMIN)),
 ) -> PaymentPublic:
     today = utcnow().date()
     payment = await get_active_subscription(current_user.id, today, db)
     if not payment:
         raise_http_404("Активный абонемент не найден")
     return PaymentPublic.model_validate(payment)
+
+
+@router.post(
+    "/{payment_id}/refund",
+    response_model=PaymentPublic,
+    **roles_docs(
+        "admin",
+        notes=(
+            "Возвращает оплаченный платеж: статус становится `refunded`. "
+            "Абонемент перестает покрывать дни периода. "
+            "Для разового платежа ожидающая выдача удаляется, порция возвращается в меню; "
+            "если питание уже выдано, возврат отклоняется."
+        ),
+        extra_responses={
+            400: error_response("Питание уже выдано", "Bad request"),
+            404: error_response("Платеж не найден", "Not found"),
+        },
+    ),
+    summary="Возврат платежа",
+    dependencies=[Depends(require_roles(UserRole.ADMIN))],
+)
+async def refund_payment_endpoint(
+    payment_id: int,
+    db: AsyncSession = Depends(get_db),
+) -> PaymentPublic:
+    payment = await refund_payment(payment_id, db)
+    return PaymentPublic.model_validate(payment)
@@ -5,13 +5,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db import get_db
 from ..docs import error_response, roles_docs
-from ..models import User, UserRole
+from ..models import UserRole
 from ..schemas.preferences import PreferencesResponse, PreferencesUpdateRequest
-from ..services.authorization import require_roles, require_user
+from ..services.authorization import require_principal, require_roles
 from ..services.preferences_service import (
     get_preferences as service_get_preferences,
     update_preferences as service_update_preferences,
 )
+from ..services.principal_cache import Principal
 
 router = APIRouter(
     prefix="/preferences",
@@ -27,7 +28,7 @@ router = APIRouter(
 )
 async def get_preferences(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_user),
+    current_user: Principal = Depends(require_principal),
     _: object = Depends(require_roles(UserRole.STUDENT, UserRole.ADMIN)),
 ) -> PreferencesResponse:
     return await service_get_preferences(current_user.id, db)
@@ -49,7 +50,7 @@ async def get_preferences(
 async def update_preferences(
     payload: PreferencesUpdateRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_user),
+    current_user: Principal = Depends(require_principal),
     _: object = Depends(require_roles(UserRole.STUDENT, UserRole.ADMIN)),
 ) -> PreferencesResponse:
     return await service_update_preferences(current_user.id, payload, db)
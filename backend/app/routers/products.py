@@ -10,9 +10,11 @@ from ..schemas.product import (
     ProductCreate,
     ProductListResponse,
     ProductPublic,
+    ProductStockHistoryResponse,
     ProductStockListResponse,
     ProductStockPublic,
     ProductUpdate,
+    StockHistoryBucket,
 )
 from ..services.authorization import require_roles
 from ..services.product_service import (
@@ -23,6 +25,7 @@ from ..services.product_service import (
     list_products_with_stock,
     update_product,
 )
+from ..services.stock_history_service import get_stock_history
 
 router = APIRouter(
     prefix="/products",
@@ -92,6 +95,35 @@ async def get_product_endpoint(
     return ProductPublic.model_validate(product)
 
 
+@router.get(
+    "/{product_id}/stock-history",
+    response_model=ProductStockHistoryResponse,
+    **roles_docs(
+        "cook",
+        "admin",
+        notes=(
+            "Остаток продукта на конец каждого дня (`bucket=day`) или недели (`bucket=week`), "
+            "в которых было движение. Ответ колоночный: `timestamps[i]` соответствует `balances[i]`."
+        ),
+        extra_responses={404: error_response("Продукт не найден", "Not found")},
+    ),
+    summary="История остатка продукта",
+)
+async def get_product_stock_history_endpoint(
+    product_id: int,
+    bucket: StockHistoryBucket = Query(default=StockHistoryBucket.DAY),
+    db: AsyncSession = Depends(get_db),
+) -> ProductStockHistoryResponse:
+    await get_product(product_id, db)
+    history = await get_stock_history(product_id, bucket, db)
+    return ProductStockHistoryResponse(
+        product_id=product_id,
+        bucket=bucket,
+        timestamps=history.timestamps,
+        balances=history.balances,
+    )
+
+
 @router.post(
     "/",
     response_model=ProductPublic,
@@ -7,7 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db import get_db
 from ..docs import error_response, roles_docs
-from ..models import PurchaseRequestStatus, User, UserRole
+from ..models import PurchaseRequestStatus, UserRole
 from ..schemas.purchase_request import (
     PurchaseRequestCreate,
     PurchaseRequestDecision,
@@ -16,6 +16,8 @@ from ..schemas.purchase_request import (
 )
 from ..services.authorization import require_roles
 from ..services.errors import raise_http_403
+from ..services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from ..services.principal_cache import Principal
 from ..services.purchase_request_service import (
     create_purchase_request,
     decide_purchase_request,
@@ -41,20 +43,25 @@ async def list_purchase_requests_endpoint(
     requested_by_id: int | None = Query(default=None, gt=0),
     date_from: datetime | None = Query(default=None),
     date_to: datetime | None = Query(default=None),
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.COOK, UserRole.ADMIN)),
+    current_user: Principal = Depends(require_roles(UserRole.COOK, UserRole.ADMIN)),
 ) -> PurchaseRequestListResponse:
     if current_user.role != UserRole.ADMIN:
         requested_by_id = current_user.id
-    purchase_requests = await list_purchase_requests(
+    page = await list_purchase_requests(
         db,
         requested_by_id=requested_by_id,
         status=status,
         date_from=date_from,
         date_to=date_to,
+        cursor=cursor,
+        limit=limit,
     )
     return PurchaseRequestListResponse(
-        items=[PurchaseRequestPublic.model_validate(item) for item in purchase_requests]
+        items=[PurchaseRequestPublic.model_validate(item) for item in page.items],
+        next_cursor=page.next_cursor,
     )
 
 
@@ -72,7 +79,7 @@ async def list_purchase_requests_endpoint(
 async def get_purchase_request_endpoint(
     request_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.COOK, UserRole.ADMIN)),
+    current_user: Principal = Depends(require_roles(UserRole.COOK, UserRole.ADMIN)),
 ) -> PurchaseRequestPublic:
     purchase_request = await get_purchase_request(request_id, db)
     if current_user.role != UserRole.ADMIN and purchase_request.requested_by_id != current_user.id:
@@ -100,7 +107,7 @@ async def get_purchase_request_endpoint(
 async def create_purchase_request_endpoint(
     payload: PurchaseRequestCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.COOK, UserRole.ADMIN)),
+    current_user: Principal = Depends(require_roles(UserRole.COOK, UserRole.ADMIN)),
 ) -> PurchaseRequestPublic:
     purchase_request = await create_purchase_request(payload, current_user.id, db)
     return PurchaseRequestPublic.model_validate(purchase_request)
@@ -126,7 +133,7 @@ async def decide_purchase_request_endpoint(
     request_id: int,
     payload: PurchaseRequestDecision,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.ADMIN)),
+    current_user: Principal = Depends(require_roles(UserRole.ADMIN)),
 ) -> PurchaseRequestPublic:
     purchase_request = await get_purchase_request(request_id, db)
     purchase_request = await decide_purchase_request(
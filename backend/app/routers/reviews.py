@@ -7,9 +7,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db import get_db
 from ..docs import error_response, roles_docs
-from ..models import User, UserRole
+from ..models import UserRole
 from ..schemas.review import ReviewCreate, ReviewListResponse, ReviewPublic
 from ..services.authorization import require_roles
+from ..services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from ..services.principal_cache import Principal
 from ..services.review_service import create_review, list_reviews
 
 router = APIRouter(
@@ -31,12 +33,24 @@ async def list_reviews_endpoint(
     user_id: int | None = Query(default=None, gt=0),
     date_from: datetime | None = Query(default=None),
     date_to: datetime | None = Query(default=None),
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: AsyncSession = Depends(get_db),
 ) -> ReviewListResponse:
-    reviews = await list_reviews(
-        db, dish_id=dish_id, menu_id=menu_id, user_id=user_id, date_from=date_from, date_to=date_to
+    page = await list_reviews(
+        db,
+        dish_id=dish_id,
+        menu_id=menu_id,
+        user_id=user_id,
+        date_from=date_from,
+        date_to=date_to,
+        cursor=cursor,
+        limit=limit,
+    )
+    return ReviewListResponse(
+        items=[ReviewPublic.model_validate(item) for item in page.items],
+        next_cursor=page.next_cursor,
     )
-    return ReviewListResponse(items=[ReviewPublic.model_validate(item) for item in reviews])
 
 
 @router.post(
@@ -60,7 +74,7 @@ async def list_reviews_endpoint(
 async def create_review_endpoint(
     payload: ReviewCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_roles(UserRole.STUDENT)),
+    current_user: Principal = Depends(require_roles(UserRole.STUDENT)),
 ) -> ReviewPublic:
     review = await create_review(payload, current_user.id, db)
     return ReviewPublic.model_validate(review)
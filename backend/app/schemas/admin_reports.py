@@ -2,8 +2,9 @@ from __future__ import annotations
 
 from datetime import date
 from decimal import Decimal
+from enum import Enum
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from ..models import MealType
 
@@ -28,7 +29,20 @@ class ExpenseReportItem(BaseModel):
     total_amount: Decimal
 
 
+class ExpenseGroupBy(str, Enum):
+    MONTH = "month"
+
+
+class ExpenseMonthItem(BaseModel):
+    month: date = Field(description="Первый день месяца (UTC)")
+    total_quantity: Decimal
+    total_amount: Decimal
+
+
 class ExpenseReportResponse(BaseModel):
     total_quantity: Decimal
     total_amount: Decimal
     items: list[ExpenseReportItem]
+    months: list[ExpenseMonthItem] = Field(
+        default_factory=list, description="Заполняется, если передан `group_by=month`"
+    )
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+from datetime import date
 from decimal import Decimal
+from enum import Enum
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -19,6 +21,18 @@ class PaymentTypeStat(BaseModel):
     amount: Decimal
 
 
+class StatsGroupBy(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+class PaymentPeriodStat(BaseModel):
+    period_start: date = Field(description="Начало дня, недели или месяца (UTC)")
+    count: int
+    amount: Decimal
+
+
 class PaymentStatsResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -26,6 +40,9 @@ class PaymentStatsResponse(BaseModel):
     total_amount: Decimal
     by_status: list[PaymentStatusStat]
     by_type: list[PaymentTypeStat]
+    series: list[PaymentPeriodStat] = Field(
+        default_factory=list, description="Заполняется, если передан `group_by`"
+    )
 
 
 class AttendanceStatusStat(BaseModel):
@@ -36,3 +53,14 @@ class AttendanceStatusStat(BaseModel):
 class AttendanceStatsResponse(BaseModel):
     total_count: int
     by_status: list[AttendanceStatusStat]
+
+
+class PasswordHashPoolStats(BaseModel):
+    max_workers: int
+    max_pending: int
+    pending: int
+    running: int
+    queued: int
+    completed: int
+    rejected: int
+    avg_wait_ms: float
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict, Field, computed_field, field_validator
 
 from .allergy import AllergyPublic
 
@@ -78,7 +80,27 @@ class DishUpdate(BaseModel):
         return value
 
 
-class DishPublic(BaseModel):
+class DishRatingStatsPublic(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    rating_count: int
+    rating_sum: int
+    rating_1: int
+    rating_2: int
+    rating_3: int
+    rating_4: int
+    rating_5: int
+    last_review_at: datetime | None
+
+    @computed_field
+    @property
+    def average_rating(self) -> float | None:
+        if not self.rating_count:
+            return None
+        return round(self.rating_sum / self.rating_count, 2)
+
+
+class DishInfoPublic(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
     id: int
@@ -88,5 +110,11 @@ class DishPublic(BaseModel):
     allergies: list[AllergyPublic]
 
 
+class DishPublic(DishInfoPublic):
+    rating_stats: DishRatingStatsPublic | None = Field(
+        default=None, description="Сводка оценок блюда, null — отзывов еще нет"
+    )
+
+
 class DishListResponse(BaseModel):
     items: list[DishPublic]
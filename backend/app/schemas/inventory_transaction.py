@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from decimal import Decimal
 
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
 from ..models import InventoryDirection
 
@@ -23,6 +23,43 @@ class InventoryTransactionCreate(BaseModel):
         return trimmed or None
 
 
+class InventoryReceiptItem(BaseModel):
+    product_id: int = Field(gt=0)
+    quantity: Decimal = Field(gt=0)
+
+
+class InventoryReceiptCreate(BaseModel):
+    purchase_request_id: int | None = Field(
+        default=None,
+        gt=0,
+        description="Согласованная заявка; без items приходуются еще не полученные позиции",
+    )
+    reason: str | None = Field(default=None, max_length=255)
+    items: list[InventoryReceiptItem] = Field(default_factory=list)
+
+    @field_validator("reason")
+    @classmethod
+    def _normalize_reason(cls, value: str | None) -> str | None:
+        if value is None:
+            return None
+        trimmed = value.strip()
+        return trimmed or None
+
+    @field_validator("items")
+    @classmethod
+    def _unique_items(cls, value: list[InventoryReceiptItem]) -> list[InventoryReceiptItem]:
+        product_ids = [item.product_id for item in value]
+        if len(set(product_ids)) != len(product_ids):
+            raise ValueError("items должны иметь уникальные product_id")
+        return value
+
+    @model_validator(mode="after")
+    def _validate_source(self) -> "InventoryReceiptCreate":
+        if not self.items and self.purchase_request_id is None:
+            raise ValueError("Укажите items или purchase_request_id")
+        return self
+
+
 class InventoryTransactionPublic(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -32,8 +69,17 @@ class InventoryTransactionPublic(BaseModel):
     direction: InventoryDirection
     reason: str | None
     created_by_id: int | None
+    purchase_request_id: int | None = None
     created_at: datetime
 
 
 class InventoryTransactionListResponse(BaseModel):
     items: list[InventoryTransactionPublic]
+    next_cursor: str | None = Field(
+        default=None, description="Курсор следующей страницы, null — страниц больше нет"
+    )
+
+
+class InventoryReceiptResponse(BaseModel):
+    purchase_request_id: int | None
+    items: list[InventoryTransactionPublic]
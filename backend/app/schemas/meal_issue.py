@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 from ..models import MealIssueStatus
 
@@ -16,6 +16,18 @@ class MealIssueServeRequest(BaseModel):
     menu_id: int = Field(gt=0)
 
 
+class MealIssueServeBatchRequest(BaseModel):
+    menu_id: int = Field(gt=0)
+    user_ids: list[int] = Field(min_length=1, max_length=200)
+
+    @field_validator("user_ids")
+    @classmethod
+    def _unique_user_ids(cls, value: list[int]) -> list[int]:
+        if any(user_id <= 0 for user_id in value):
+            raise ValueError("Идентификаторы учеников должны быть положительными")
+        return list(dict.fromkeys(value))
+
+
 class MealIssuePublic(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -29,5 +41,30 @@ class MealIssuePublic(BaseModel):
     created_at: datetime
 
 
+class MealIssueServePublic(MealIssuePublic):
+    allergy_warnings: list[str] = Field(
+        default_factory=list, description="Аллергены ученика, которые есть в блюдах меню"
+    )
+
+
 class MealIssueListResponse(BaseModel):
     items: list[MealIssuePublic]
+    next_cursor: str | None = Field(
+        default=None, description="Курсор следующей страницы, null — страниц больше нет"
+    )
+
+
+class MealIssueServeResult(BaseModel):
+    user_id: int
+    served: bool
+    detail: str | None = None
+    issue: MealIssuePublic | None = None
+    allergy_warnings: list[str] = Field(
+        default_factory=list, description="Аллергены ученика, которые есть в блюдах меню"
+    )
+
+
+class MealIssueServeBatchResponse(BaseModel):
+    menu_id: int
+    served_count: int
+    items: list[MealIssueServeResult]
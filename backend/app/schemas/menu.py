@@ -5,8 +5,8 @@ from decimal import Decimal
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
-from ..models import MealType
-from .dish import DishPublic
+from ..models import MealIssueStatus, MealType, PaymentType
+from .dish import DishInfoPublic, DishPublic, DishRatingStatsPublic
 
 MAX_MENU_PRICE = Decimal("99999999.99")
 
@@ -100,7 +100,7 @@ class MenuItemPublic(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
     id: int
-    dish: DishPublic
+    dish: DishInfoPublic
     portion_size: Decimal | None
     planned_qty: int | None
     remaining_qty: int | None
@@ -118,5 +118,77 @@ class MenuPublic(BaseModel):
     menu_items: list[MenuItemPublic]
 
 
+class PersonalMenuItemPublic(MenuItemPublic):
+    dish: DishPublic
+    rating_stats: DishRatingStatsPublic | None = Field(
+        default=None, description="Сводка оценок блюда в этом меню, null — отзывов еще нет"
+    )
+    allergy_conflict: bool = Field(description="Блюдо содержит аллерген пользователя")
+    conflicting_allergy_ids: list[int]
+
+
+class PersonalMenuPublic(MenuPublic):
+    menu_items: list[PersonalMenuItemPublic]
+
+
+class PersonalMenuListResponse(BaseModel):
+    items: list[PersonalMenuPublic]
+    next_cursor: str | None = Field(
+        default=None, description="Курсор следующей страницы, null — страниц больше нет"
+    )
+
+
 class MenuListResponse(BaseModel):
     items: list[MenuPublic]
+    next_cursor: str | None = Field(
+        default=None, description="Курсор следующей страницы, null — страниц больше нет"
+    )
+
+
+class MenuPortionItem(BaseModel):
+    menu_item_id: int
+    dish_id: int
+    remaining_qty: int | None = Field(
+        description="Остаток в БД без блоков, зарезервированных воркерами"
+    )
+    reserved_qty: int = Field(
+        description="Порции из блока, зарезервированного воркером, который ответил на запрос; "
+        "блоки других воркеров сюда не входят"
+    )
+
+
+class MenuPortionsResponse(BaseModel):
+    menu_id: int
+    live: bool = Field(description="true — счетчики из памяти воркера, false — прочитано из БД")
+    items: list[MenuPortionItem]
+
+
+class MenuDishRatingItem(BaseModel):
+    dish_id: int
+    rating_stats: DishRatingStatsPublic | None = Field(
+        default=None, description="Сводка оценок блюда в этом меню, null — отзывов еще нет"
+    )
+    dish_rating_stats: DishRatingStatsPublic | None = Field(
+        default=None, description="Сводка оценок блюда по всем меню"
+    )
+
+
+class MenuRatingsResponse(BaseModel):
+    menu_id: int
+    items: list[MenuDishRatingItem]
+
+
+class MenuEligibilityItem(BaseModel):
+    user_id: int
+    payment_type: PaymentType | None = Field(
+        description="one_time | subscription, null — оплаты нет, но выдача уже создана",
+    )
+    issue_status: MealIssueStatus | None = Field(
+        description="issued | served | confirmed, null — выдачи еще нет",
+    )
+
+
+class MenuEligibilityResponse(BaseModel):
+    menu_id: int
+    menu_date: date
+    items: list[MenuEligibilityItem]
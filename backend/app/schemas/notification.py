@@ -18,3 +18,8 @@ class NotificationItem(BaseModel):
 class NotificationListResponse(BaseModel):
     items: list[NotificationItem]
     unread_count: int
+
+
+class UnreadCountEvent(BaseModel):
+    unread_count: int
+    delta: int
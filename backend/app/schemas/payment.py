@@ -45,3 +45,6 @@ class PaymentPublic(BaseModel):
 
 class PaymentListResponse(BaseModel):
     items: list[PaymentPublic]
+    next_cursor: str | None = Field(
+        default=None, description="Курсор следующей страницы, null — страниц больше нет"
+    )
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+from datetime import date
 from decimal import Decimal
 
+from enum import Enum
+
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
@@ -88,6 +91,18 @@ class ProductStockPublic(ProductPublic):
     stock: Decimal
 
 
+class StockHistoryBucket(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+
+
+class ProductStockHistoryResponse(BaseModel):
+    product_id: int
+    bucket: StockHistoryBucket
+    timestamps: list[date] = Field(description="Начало дня или недели (UTC), по возрастанию")
+    balances: list[Decimal] = Field(description="Остаток на конец периода, параллельно timestamps")
+
+
 class ProductListResponse(BaseModel):
     items: list[ProductPublic]
 
@@ -67,8 +67,14 @@ class PurchaseRequestPublic(BaseModel):
     note: str | None
     requested_at: datetime
     decided_at: datetime | None
+    received_at: datetime | None = Field(
+        default=None, description="Когда поставка по заявке оприходована на склад"
+    )
     items: list[PurchaseRequestItemPublic]
 
 
 class PurchaseRequestListResponse(BaseModel):
     items: list[PurchaseRequestPublic]
+    next_cursor: str | None = Field(
+        default=None, description="Курсор следующей страницы, null — страниц больше нет"
+    )
@@ -34,3 +34,6 @@ class ReviewPublic(BaseModel):
 
 class ReviewListResponse(BaseModel):
     items: list[ReviewPublic]
+    next_cursor: str | None = Field(
+        default=None, description="Курсор следующей страницы, null — страниц больше нет"
+    )
@@ -1,13 +1,86 @@
 from __future__ import annotations
 
-from datetime import date
+from datetime import date, timedelta
 from decimal import Decimal
+from typing import NamedTuple
 
-from sqlalchemy import func, select
+from sqlalchemy import case, func, literal, literal_column, or_, select, tuple_, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..models import MealIssue, MealType, Menu, Product
-from ..models import PurchaseRequest, PurchaseRequestItem, PurchaseRequestStatus
+from ..models import MealType, Product
+from ..models import PurchaseRequest, PurchaseRequestItem
+from ..models.utils import utcnow
+from ..schemas.admin_reports import ExpenseGroupBy
+from .pg_events import pg_events, pg_notify
+from .report_rollup_service import attendance_daily_rows
+from .time_buckets import (
+    MONTH,
+    bucket_start,
+    day_start,
+    next_bucket_start,
+    truncate_date,
+    utc_timestamp,
+)
+
+EXPENSES_CHANNEL = "canteen_expenses"
+TOTAL_SET = "total"
+PRODUCT_SET = "product"
+MONTH_SET = "month"
+
+
+class ExpenseRow(NamedTuple):
+    month: date
+    product_id: int
+    product_name: str
+    quantity: Decimal
+    amount: Decimal
+
+
+class ClosedExpenses(NamedTuple):
+    open_start: date
+    rows: list[ExpenseRow]
+
+
+class ExpenseReport(NamedTuple):
+    total_quantity: Decimal
+    total_amount: Decimal
+    items: list[tuple]
+    months: list[tuple]
+
+
+class ClosedExpenseCache:
+    def __init__(self) -> None:
+        self._closed: ClosedExpenses | None = None
+
+    def get(self, open_start: date) -> ClosedExpenses | None:
+        closed = self._closed
+        if closed is None or closed.open_start != open_start:
+            return None
+        return closed
+
+    def put(self, closed: ClosedExpenses) -> None:
+        self._closed = closed
+
+    def clear(self) -> None:
+        self._closed = None
+
+
+closed_expense_cache = ClosedExpenseCache()
+
+
+def _on_expenses_event(_payload: str) -> None:
+    closed_expense_cache.clear()
+
+
+pg_events.subscribe(EXPENSES_CHANNEL, _on_expenses_event, on_resync=closed_expense_cache.clear)
+
+
+async def notify_expenses_changed(db: AsyncSession) -> None:
+    await pg_notify(db, EXPENSES_CHANNEL, "*")
+
+
+def invalidate_local_expenses() -> None:
+    closed_expense_cache.clear()
 
 
 async def get_nutrition_report(
@@ -16,24 +89,112 @@ async def get_nutrition_report(
     date_to: date | None = None,
     meal_type: MealType | None = None,
 ) -> tuple[int, list[tuple]]:
-    stmt = (
-        select(Menu.menu_date, Menu.meal_type, MealIssue.status, func.count(MealIssue.id))
-        .join(Menu, MealIssue.menu_id == Menu.id)
+    rows = attendance_daily_rows(date_from=date_from, date_to=date_to, meal_type=meal_type)
+    result = await db.execute(
+        select(rows.c.menu_date, rows.c.meal_type, rows.c.status, rows.c.issue_count).order_by(
+            rows.c.menu_date, rows.c.meal_type
+        )
     )
-    if date_from is not None:
-        stmt = stmt.where(Menu.menu_date >= date_from)
-    if date_to is not None:
-        stmt = stmt.where(Menu.menu_date <= date_to)
-    if meal_type is not None:
-        stmt = stmt.where(Menu.meal_type == meal_type)
-
-    stmt = stmt.group_by(Menu.menu_date, Menu.meal_type, MealIssue.status).order_by(
-        Menu.menu_date, Menu.meal_type
+    report_rows = list(result.all())
+    total_count = sum(row[3] for row in report_rows)
+    return total_count, report_rows
+
+
+def _approved_filters():
+    return [
+        PurchaseRequest.status == literal_column("'approved'"),
+        PurchaseRequest.decided_at.is_not(None),
+    ]
+
+
+def _expense_columns(dialect_name: str):
+    unit_price = func.coalesce(PurchaseRequestItem.unit_price, 0)
+    month = truncate_date(
+        utc_timestamp(PurchaseRequest.decided_at, dialect_name), MONTH, dialect_name
+    )
+    return (
+        month,
+        func.coalesce(func.sum(PurchaseRequestItem.quantity), 0),
+        func.coalesce(func.sum(PurchaseRequestItem.quantity * unit_price), 0),
     )
-    result = await db.execute(stmt)
-    rows = list(result.all())
-    total_count = sum(row[3] for row in rows)
-    return total_count, rows
+
+
+def _expense_source(stmt, *filters):
+    return (
+        stmt.select_from(PurchaseRequestItem)
+        .join(PurchaseRequest, PurchaseRequestItem.purchase_request_id == PurchaseRequest.id)
+        .join(Product, PurchaseRequestItem.product_id == Product.id)
+        .where(*_approved_filters(), *filters)
+    )
+
+
+async def _load_closed_expenses(open_start: date, db: AsyncSession) -> ClosedExpenses:
+    month, quantity, amount = _expense_columns(db.bind.dialect.name)
+    result = await db.execute(
+        _expense_source(
+            select(month, Product.id, Product.name, quantity, amount),
+            PurchaseRequest.decided_at < day_start(open_start),
+        ).group_by(month, Product.id, Product.name)
+    )
+    return ClosedExpenses(open_start, [ExpenseRow(*row) for row in result.all()])
+
+
+def _live_expenses_query(dialect_name: str, filters: list, by_month: bool):
+    month, quantity, amount = _expense_columns(dialect_name)
+    if dialect_name == "postgresql":
+        dimensions = [tuple_(Product.id, Product.name)]
+        if by_month:
+            dimensions.append(tuple_(month))
+        set_name = case(
+            (func.grouping(Product.id) == 0, PRODUCT_SET),
+            *([(func.grouping(month) == 0, MONTH_SET)] if by_month else []),
+            else_=TOTAL_SET,
+        )
+        return _expense_source(
+            select(
+                set_name,
+                Product.id,
+                Product.name,
+                month if by_month else literal(None),
+                quantity,
+                amount,
+            ),
+            *filters,
+        ).group_by(func.grouping_sets(tuple_(), *dimensions))
+
+    rows = _expense_source(
+        select(
+            Product.id.label("product_id"),
+            Product.name.label("product_name"),
+            month.label("month"),
+            quantity.label("quantity"),
+            amount.label("amount"),
+        ),
+        *filters,
+    ).group_by(Product.id, Product.name, month).cte("expense_rows")
+    no_product = literal(None, rows.c.product_id.type)
+    no_name = literal(None, rows.c.product_name.type)
+    no_month = literal(None, rows.c.month.type)
+    total_quantity = func.sum(rows.c.quantity)
+    total_amount = func.sum(rows.c.amount)
+    parts = [
+        select(literal(TOTAL_SET), no_product, no_name, no_month, total_quantity, total_amount),
+        select(
+            literal(PRODUCT_SET),
+            rows.c.product_id,
+            rows.c.product_name,
+            no_month,
+            total_quantity,
+            total_amount,
+        ).group_by(rows.c.product_id, rows.c.product_name),
+    ]
+    if by_month:
+        parts.append(
+            select(
+                literal(MONTH_SET), no_product, no_name, rows.c.month, total_quantity, total_amount
+            ).group_by(rows.c.month)
+        )
+    return union_all(*parts)
 
 
 async def get_expense_report(
@@ -41,51 +202,85 @@ async def get_expense_report(
     date_from: date | None = None,
     date_to: date | None = None,
     product_id: int | None = None,
-) -> tuple[Decimal, Decimal, list[tuple]]:
-    unit_price = func.coalesce(PurchaseRequestItem.unit_price, 0)
-    amount_expr = PurchaseRequestItem.quantity * unit_price
-
-    base_filters = [
-        PurchaseRequest.status == PurchaseRequestStatus.APPROVED,
-        PurchaseRequest.decided_at.is_not(None),
-    ]
+    group_by: ExpenseGroupBy | None = None,
+) -> ExpenseReport:
+    open_start = bucket_start(utcnow().date(), MONTH)
+    end = date_to + timedelta(days=1) if date_to is not None else None
+    closed_from = None
     if date_from is not None:
-        base_filters.append(func.date(PurchaseRequest.decided_at) >= date_from)
-    if date_to is not None:
-        base_filters.append(func.date(PurchaseRequest.decided_at) <= date_to)
+        closed_from = (
+            date_from
+            if bucket_start(date_from, MONTH) == date_from
+            else next_bucket_start(date_from, MONTH)
+        )
+    closed_to = open_start if end is None else min(open_start, bucket_start(end, MONTH))
+    use_closed = closed_from is None or closed_from < closed_to
+
+    filters = []
     if product_id is not None:
-        base_filters.append(PurchaseRequestItem.product_id == product_id)
+        filters.append(PurchaseRequestItem.product_id == product_id)
+    if date_from is not None:
+        filters.append(PurchaseRequest.decided_at >= day_start(date_from))
+    if end is not None:
+        filters.append(PurchaseRequest.decided_at < day_start(end))
 
-    total_stmt = (
-        select(
-            func.coalesce(func.sum(PurchaseRequestItem.quantity), 0),
-            func.coalesce(func.sum(amount_expr), 0),
-        )
-        .select_from(PurchaseRequestItem)
-        .join(PurchaseRequest, PurchaseRequestItem.purchase_request_id == PurchaseRequest.id)
-        .where(*base_filters)
-    )
-    total_result = await db.execute(total_stmt)
-    total_quantity, total_amount = total_result.one()
+    closed_rows: list[ExpenseRow] = []
+    if use_closed:
+        outside_closed = [PurchaseRequest.decided_at >= day_start(closed_to)]
+        if closed_from is not None:
+            outside_closed.append(PurchaseRequest.decided_at < day_start(closed_from))
+        filters.append(or_(*outside_closed))
 
-    stmt = (
-        select(
-            Product.id,
-            Product.name,
-            func.coalesce(func.sum(PurchaseRequestItem.quantity), 0),
-            func.coalesce(func.sum(amount_expr), 0),
-        )
-        .select_from(Product)
-        .join(PurchaseRequestItem, PurchaseRequestItem.product_id == Product.id)
-        .join(PurchaseRequest, PurchaseRequestItem.purchase_request_id == PurchaseRequest.id)
-        .where(*base_filters)
-        .group_by(Product.id, Product.name)
-        .order_by(func.coalesce(func.sum(amount_expr), 0).desc(), Product.name)
+        closed = closed_expense_cache.get(open_start)
+        if closed is None:
+            closed = await _load_closed_expenses(open_start, db)
+            closed_expense_cache.put(closed)
+        closed_rows = [
+            row
+            for row in closed.rows
+            if (closed_from is None or row.month >= closed_from)
+            and row.month < closed_to
+            and (product_id is None or row.product_id == product_id)
+        ]
+
+    result = await db.execute(
+        _live_expenses_query(db.bind.dialect.name, filters, group_by is not None)
     )
-    result = await db.execute(stmt)
 
-    return (
-        total_quantity or Decimal("0"),
-        total_amount or Decimal("0"),
-        list(result.all()),
+    total_quantity = Decimal("0")
+    total_amount = Decimal("0")
+    items: dict[int, list] = {}
+    months: dict[date, list] = {}
+    for row in closed_rows:
+        total_quantity += row.quantity
+        total_amount += row.amount
+        item = items.setdefault(row.product_id, [row.product_name, Decimal("0"), Decimal("0")])
+        item[1] += row.quantity
+        item[2] += row.amount
+        month = months.setdefault(row.month, [Decimal("0"), Decimal("0")])
+        month[0] += row.quantity
+        month[1] += row.amount
+    for set_name, row_product_id, product_name, month_start, quantity, amount in result.all():
+        quantity, amount = Decimal(quantity or 0), Decimal(amount or 0)
+        if set_name == TOTAL_SET:
+            total_quantity += quantity
+            total_amount += amount
+        elif set_name == PRODUCT_SET:
+            item = items.setdefault(row_product_id, [product_name, Decimal("0"), Decimal("0")])
+            item[0] = product_name
+            item[1] += quantity
+            item[2] += amount
+        else:
+            month = months.setdefault(month_start, [Decimal("0"), Decimal("0")])
+            month[0] += quantity
+            month[1] += amount
+
+    return ExpenseReport(
+        total_quantity,
+        total_amount,
+        sorted(
+            ((item_id, *values) for item_id, values in items.items()),
+            key=lambda row: (-row[3], row[1]),
+        ),
+        sorted((month, *values) for month, values in months.items()) if group_by else [],
     )
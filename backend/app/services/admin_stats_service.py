@@ -2,59 +2,104 @@ from __future__ import annotations
 
 from datetime import date, datetime
 from decimal import Decimal
+from typing import NamedTuple
 
-from sqlalchemy import func, select
+from sqlalchemy import case, func, literal, select, tuple_, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..models import MealIssue, Menu, Payment
+from ..schemas.admin_stats import StatsGroupBy
+from .report_rollup_service import attendance_daily_rows, payment_daily_rows
+from .time_buckets import truncate_date
 
+TOTAL_SET = "total"
+STATUS_SET = "status"
+TYPE_SET = "payment_type"
+PERIOD_SET = "period"
 
-async def get_payment_stats(
-    db: AsyncSession,
-    date_from: datetime | None = None,
-    date_to: datetime | None = None,
-) -> tuple[int, Decimal, list[tuple], list[tuple]]:
-    filters = []
-    if date_from is not None:
-        filters.append(Payment.created_at >= date_from)
-    if date_to is not None:
-        filters.append(Payment.created_at <= date_to)
 
-    total_stmt = select(
-        func.count(Payment.id),
-        func.coalesce(func.sum(Payment.amount), 0),
-    ).where(*filters)
-    total_result = await db.execute(total_stmt)
-    total_count, total_amount = total_result.one()
+class PaymentStats(NamedTuple):
+    total_count: int
+    total_amount: Decimal
+    by_status: list[tuple]
+    by_type: list[tuple]
+    series: list[tuple]
 
-    status_stmt = (
-        select(
-            Payment.status,
-            func.count(Payment.id),
-            func.coalesce(func.sum(Payment.amount), 0),
-        )
-        .where(*filters)
-        .group_by(Payment.status)
+
+def _grouping_sets_query(rows, period):
+    dimensions = [rows.c.status, rows.c.payment_type]
+    if period is not None:
+        dimensions.append(period)
+    set_name = case(
+        (func.grouping(rows.c.status) == 0, STATUS_SET),
+        (func.grouping(rows.c.payment_type) == 0, TYPE_SET),
+        *([(func.grouping(period) == 0, PERIOD_SET)] if period is not None else []),
+        else_=TOTAL_SET,
     )
-    status_result = await db.execute(status_stmt)
+    return select(
+        set_name,
+        rows.c.status,
+        rows.c.payment_type,
+        period if period is not None else literal(None),
+        func.sum(rows.c.payment_count),
+        func.sum(rows.c.amount),
+    ).group_by(func.grouping_sets(tuple_(), *(tuple_(item) for item in dimensions)))
+
 
-    type_stmt = (
-        select(
-            Payment.payment_type,
-            func.count(Payment.id),
-            func.coalesce(func.sum(Payment.amount), 0),
+def _union_query(rows, period):
+    status = literal(None, rows.c.status.type)
+    payment_type = literal(None, rows.c.payment_type.type)
+    no_period = literal(None, period.type) if period is not None else literal(None)
+    count = func.sum(rows.c.payment_count)
+    amount = func.sum(rows.c.amount)
+    parts = [
+        select(literal(TOTAL_SET), status, payment_type, no_period, count, amount),
+        select(literal(STATUS_SET), rows.c.status, payment_type, no_period, count, amount)
+        .group_by(rows.c.status),
+        select(literal(TYPE_SET), status, rows.c.payment_type, no_period, count, amount)
+        .group_by(rows.c.payment_type),
+    ]
+    if period is not None:
+        parts.append(
+            select(literal(PERIOD_SET), status, payment_type, period, count, amount)
+            .group_by(period)
         )
-        .where(*filters)
-        .group_by(Payment.payment_type)
-    )
-    type_result = await db.execute(type_stmt)
+    return union_all(*parts)
+
 
-    return (
-        int(total_count or 0),
-        total_amount or Decimal("0"),
-        list(status_result.all()),
-        list(type_result.all()),
+async def get_payment_stats(
+    db: AsyncSession,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    group_by: StatsGroupBy | None = None,
+) -> PaymentStats:
+    dialect_name = db.bind.dialect.name
+    rows = payment_daily_rows(dialect_name, date_from=date_from, date_to=date_to)
+    period = (
+        truncate_date(rows.c.day, group_by.value, dialect_name).label("period")
+        if group_by is not None
+        else None
     )
+    if dialect_name == "postgresql":
+        stmt = _grouping_sets_query(rows, period)
+    else:
+        stmt = _union_query(rows, period)
+    result = await db.execute(stmt)
+
+    stats = PaymentStats(0, Decimal("0"), [], [], [])
+    for set_name, status, payment_type, period_start, count, amount in result.all():
+        count, amount = int(count or 0), Decimal(amount or 0)
+        if set_name == TOTAL_SET:
+            stats = stats._replace(total_count=count, total_amount=amount)
+        elif set_name == STATUS_SET:
+            stats.by_status.append((status, count, amount))
+        elif set_name == TYPE_SET:
+            stats.by_type.append((payment_type, count, amount))
+        else:
+            stats.series.append((period_start, count, amount))
+    stats.by_status.sort(key=lambda row: row[0].value)
+    stats.by_type.sort(key=lambda row: row[0].value)
+    stats.series.sort(key=lambda row: row[0])
+    return stats
 
 
 async def get_attendance_stats(
@@ -62,26 +107,11 @@ async def get_attendance_stats(
     date_from: date | None = None,
     date_to: date | None = None,
 ) -> tuple[int, list[tuple]]:
-    filters = []
-    if date_from is not None:
-        filters.append(Menu.menu_date >= date_from)
-    if date_to is not None:
-        filters.append(Menu.menu_date <= date_to)
-
-    total_stmt = (
-        select(func.count(MealIssue.id))
-        .join(Menu, MealIssue.menu_id == Menu.id)
-        .where(*filters)
-    )
-    total_result = await db.execute(total_stmt)
-    total_count = total_result.scalar_one()
-
-    status_stmt = (
-        select(MealIssue.status, func.count(MealIssue.id))
-        .join(Menu, MealIssue.menu_id == Menu.id)
-        .where(*filters)
-        .group_by(MealIssue.status)
+    rows = attendance_daily_rows(date_from=date_from, date_to=date_to)
+    result = await db.execute(
+        select(rows.c.status, func.sum(rows.c.issue_count))
+        .group_by(rows.c.status)
+        .order_by(rows.c.status)
     )
-    status_result = await db.execute(status_stmt)
-
-    return int(total_count or 0), list(status_result.all())
+    status_rows = [(status, int(count or 0)) for status, count in result.all()]
+    return sum(count for _, count in status_rows), status_rows
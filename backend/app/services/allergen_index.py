@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import Allergy, MenuItem, dish_allergies, user_allergies
+from .pg_events import pg_events, pg_notify
+
+ALLERGENS_CHANNEL = "canteen_allergens"
+ALL_ALLERGENS = "*"
+
+
+def allergy_mask(allergy_ids: Iterable[int]) -> int:
+    mask = 0
+    for allergy_id in allergy_ids:
+        mask |= 1 << allergy_id
+    return mask
+
+
+def mask_allergy_ids(mask: int) -> list[int]:
+    allergy_ids = []
+    while mask:
+        low_bit = mask & -mask
+        allergy_ids.append(low_bit.bit_length() - 1)
+        mask ^= low_bit
+    return allergy_ids
+
+
+class AllergenIndex:
+    def __init__(self) -> None:
+        self._version = 0
+        self._loaded_version = -1
+        self._allergy_names: dict[int, str] = {}
+        self._dish_masks: dict[int, int] = {}
+        self._user_masks: dict[int, int] = {}
+        self._menu_dishes: dict[int, tuple[int, ...]] = {}
+
+    def invalidate(self) -> None:
+        self._version += 1
+
+    def invalidate_user(self, user_id: int) -> None:
+        self._user_masks.pop(user_id, None)
+
+    async def _ensure_loaded(self, db: AsyncSession) -> None:
+        if self._loaded_version == self._version:
+            return
+        version = self._version
+        names_result = await db.execute(select(Allergy.id, Allergy.name))
+        dishes_result = await db.execute(
+            select(dish_allergies.c.dish_id, dish_allergies.c.allergy_id)
+        )
+        dish_masks: dict[int, int] = {}
+        for dish_id, allergy_id in dishes_result.all():
+            dish_masks[dish_id] = dish_masks.get(dish_id, 0) | 1 << allergy_id
+        self._allergy_names = dict(names_result.all())
+        self._dish_masks = dish_masks
+        self._user_masks = {}
+        self._menu_dishes = {}
+        self._loaded_version = version
+
+    async def dish_masks(self, db: AsyncSession) -> dict[int, int]:
+        await self._ensure_loaded(db)
+        return self._dish_masks
+
+    async def user_mask(self, user_id: int, db: AsyncSession) -> int:
+        await self._ensure_loaded(db)
+        mask = self._user_masks.get(user_id)
+        if mask is None:
+            version = self._version
+            result = await db.execute(
+                select(user_allergies.c.allergy_id).where(user_allergies.c.user_id == user_id)
+            )
+            mask = allergy_mask(result.scalars().all())
+            if version == self._version:
+                self._user_masks[user_id] = mask
+        return mask
+
+    async def user_masks(self, user_ids: Iterable[int], db: AsyncSession) -> dict[int, int]:
+        await self._ensure_loaded(db)
+        masks = {user_id: self._user_masks.get(user_id) for user_id in user_ids}
+        missing = [user_id for user_id, mask in masks.items() if mask is None]
+        if missing:
+            version = self._version
+            result = await db.execute(
+                select(user_allergies.c.user_id, user_allergies.c.allergy_id).where(
+                    user_allergies.c.user_id.in_(missing)
+                )
+            )
+            loaded = dict.fromkeys(missing, 0)
+            for user_id, allergy_id in result.all():
+                loaded[user_id] |= 1 << allergy_id
+            masks.update(loaded)
+            if version == self._version:
+                self._user_masks.update(loaded)
+        return masks
+
+    async def menu_mask(self, menu_id: int, db: AsyncSession) -> int:
+        await self._ensure_loaded(db)
+        dish_ids = self._menu_dishes.get(menu_id)
+        if dish_ids is None:
+            result = await db.execute(select(MenuItem.dish_id).where(MenuItem.menu_id == menu_id))
+            dish_ids = tuple(result.scalars().all())
+            self._menu_dishes[menu_id] = dish_ids
+        mask = 0
+        for dish_id in dish_ids:
+            mask |= self._dish_masks.get(dish_id, 0)
+        return mask
+
+    def allergy_names(self, mask: int) -> list[str]:
+        return sorted(
+            self._allergy_names[allergy_id]
+            for allergy_id in mask_allergy_ids(mask)
+            if allergy_id in self._allergy_names
+        )
+
+
+allergen_index = AllergenIndex()
+
+
+def _on_allergens_event(payload: str) -> None:
+    if payload == ALL_ALLERGENS:
+        allergen_index.invalidate()
+    else:
+        allergen_index.invalidate_user(int(payload))
+
+
+pg_events.subscribe(ALLERGENS_CHANNEL, _on_allergens_event, on_resync=allergen_index.invalidate)
+
+
+async def notify_allergens_changed(db: AsyncSession, user_id: int | None = None) -> None:
+    await pg_notify(db, ALLERGENS_CHANNEL, ALL_ALLERGENS if user_id is None else str(user_id))
+
+
+def invalidate_local_allergens(user_id: int | None = None) -> None:
+    if user_id is None:
+        allergen_index.invalidate()
+    else:
+        allergen_index.invalidate_user(user_id)
+
+
+async def get_allergy_warnings(user_id: int, menu_id: int, db: AsyncSession) -> list[str]:
+    conflicts = await allergen_index.user_mask(user_id, db) & await allergen_index.menu_mask(
+        menu_id, db
+    )
+    return allergen_index.allergy_names(conflicts) if conflicts else []
@@ -6,6 +6,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from ..models import Allergy, dish_allergies, user_allergies
 from ..schemas.allergy import AllergyCreate, AllergyUpdate
 from .errors import raise_http_400, raise_http_404
+from .allergen_index import invalidate_local_allergens, notify_allergens_changed
+from .menu_cache import invalidate_local_menus, notify_menus_changed
 
 
 async def list_allergies(db: AsyncSession) -> list[Allergy]:
@@ -32,7 +34,9 @@ async def create_allergy(payload: AllergyCreate, db: AsyncSession) -> Allergy:
     description = payload.description.strip() if payload.description else None
     allergy = Allergy(name=name, description=description)
     db.add(allergy)
+    await notify_allergens_changed(db)
     await db.commit()
+    invalidate_local_allergens()
     await db.refresh(allergy)
     return allergy
 
@@ -51,7 +55,11 @@ async def update_allergy(allergy: Allergy, payload: AllergyUpdate, db: AsyncSess
     if "description" in payload.model_fields_set:
         allergy.description = payload.description.strip() if payload.description else None
 
+    await notify_menus_changed(db)
+    await notify_allergens_changed(db)
     await db.commit()
+    invalidate_local_menus()
+    invalidate_local_allergens()
     await db.refresh(allergy)
     return allergy
 
@@ -60,4 +68,8 @@ async def delete_allergy(allergy: Allergy, db: AsyncSession) -> None:
     await db.execute(delete(user_allergies).where(user_allergies.c.allergy_id == allergy.id))
     await db.execute(delete(dish_allergies).where(dish_allergies.c.allergy_id == allergy.id))
     await db.delete(allergy)
+    await notify_menus_changed(db)
+    await notify_allergens_changed(db)
     await db.commit()
+    invalidate_local_menus()
+    invalidate_local_allergens()
@@ -1,13 +1,26 @@
 from __future__ import annotations
 
+import re
+from datetime import timedelta
+
 from jose import JWTError
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..models import User, UserRole
+from ..config import settings
+from ..models import AuthSession, User, UserRole
+from ..models.utils import utcnow
 from ..schemas.auth import LoginRequest, RegisterRequest
 from .notification_service import create_notification_for_users
-from .security import create_access_token, decode_access_token, hash_password, verify_password
+from .principal_cache import Principal, principal_cache
+from .security import (
+    create_access_token,
+    decode_access_token,
+    generate_refresh_secret,
+    hash_password_async,
+    hash_refresh_secret,
+    verify_password_async,
+)
 from .errors import raise_http_400, raise_http_401
 
 
@@ -20,7 +33,7 @@ async def register_student(payload: RegisterRequest, db: AsyncSession) -> User:
     user = User(
         email=payload.email.lower(),
         full_name=payload.full_name.strip(),
-        password_hash=hash_password(payload.password),
+        password_hash=await hash_password_async(payload.password),
         role=UserRole.STUDENT,
         dietary_preferences=payload.dietary_preferences,
         is_active=True,
@@ -42,18 +55,97 @@ async def authenticate_user(payload: LoginRequest, db: AsyncSession) -> User:
     user = result.scalar_one_or_none()
     if not user or not user.is_active:
         raise_http_401("Неверный логин или пароль")
-    if not verify_password(payload.password, user.password_hash):
+    if not await verify_password_async(payload.password, user.password_hash):
         raise_http_401("Неверный логин или пароль")
     return user
 
 
-async def login_user(payload: LoginRequest, db: AsyncSession) -> tuple[User, str, int]:
+async def login_user(
+    payload: LoginRequest, db: AsyncSession
+) -> tuple[User, str, int, str, int]:
     user = await authenticate_user(payload, db)
     token, expires_in = create_access_token(subject=str(user.id), role=user.role.value)
-    return user, token, expires_in
+    refresh_token, refresh_expires_in = await create_auth_session(user.id, db)
+    return user, token, expires_in, refresh_token, refresh_expires_in
 
 
-async def get_current_user(token: str, db: AsyncSession) -> User:
+def _refresh_expires_at():
+    return utcnow() + timedelta(days=settings.refresh_token_exp_days)
+
+
+def _parse_refresh_token(refresh_token: str) -> tuple[int, str]:
+    session_id, _, secret = refresh_token.partition(".")
+    if not secret or re.fullmatch(r"[0-9]{1,18}", session_id) is None:
+        raise_http_401("Недействительный токен обновления")
+    return int(session_id), secret
+
+
+async def create_auth_session(user_id: int, db: AsyncSession) -> tuple[str, int]:
+    secret = generate_refresh_secret()
+    session = AuthSession(
+        user_id=user_id,
+        token_hash=hash_refresh_secret(secret),
+        expires_at=_refresh_expires_at(),
+    )
+    db.add(session)
+    await db.commit()
+    return f"{session.id}.{secret}", settings.refresh_token_exp_days * 24 * 60 * 60
+
+
+async def refresh_auth_session(
+    refresh_token: str, db: AsyncSession
+) -> tuple[str, int, str, int]:
+    session_id, secret = _parse_refresh_token(refresh_token)
+    new_secret = generate_refresh_secret()
+    result = await db.execute(
+        update(AuthSession)
+        .where(
+            AuthSession.id == session_id,
+            AuthSession.token_hash == hash_refresh_secret(secret),
+            AuthSession.revoked_at.is_(None),
+            AuthSession.expires_at > utcnow(),
+        )
+        .values(token_hash=hash_refresh_secret(new_secret), expires_at=_refresh_expires_at())
+        .returning(AuthSession.user_id)
+    )
+    user_id = result.scalar_one_or_none()
+    if user_id is None:
+        await db.rollback()
+        raise_http_401("Недействительный токен обновления")
+
+    principal = await _load_principal(user_id, db)
+    if principal is None or not principal.is_active:
+        await db.rollback()
+        raise_http_401("Пользователь неактивен или не найден")
+    await db.commit()
+
+    token, expires_in = create_access_token(subject=str(user_id), role=principal.role.value)
+    return (
+        token,
+        expires_in,
+        f"{session_id}.{new_secret}",
+        settings.refresh_token_exp_days * 24 * 60 * 60,
+    )
+
+
+async def revoke_auth_session(refresh_token: str, db: AsyncSession) -> None:
+    session_id, secret = _parse_refresh_token(refresh_token)
+    result = await db.execute(
+        update(AuthSession)
+        .where(
+            AuthSession.id == session_id,
+            AuthSession.token_hash == hash_refresh_secret(secret),
+            AuthSession.revoked_at.is_(None),
+        )
+        .values(revoked_at=utcnow())
+    )
+    if result.rowcount == 0:
+        await db.rollback()
+        raise_http_401("Недействительный токен обновления")
+    await db.commit()
+
+
+def _get_token_user_id(token: str) -> int:
     try:
         payload = decode_access_token(token)
     except JWTError:
@@ -64,11 +156,34 @@ async def get_current_user(token: str, db: AsyncSession) -> User:
         raise_http_401("Недействительные учетные данные")
 
     try:
-        user_id = int(subject)
+        return int(subject)
     except ValueError:
         raise_http_401("Недействительные учетные данные")
 
+
+async def get_current_user(token: str, db: AsyncSession) -> User:
+    user_id = _get_token_user_id(token)
     user = await db.get(User, user_id)
     if not user or not user.is_active:
         raise_http_401("Пользователь неактивен или не найден")
     return user
+
+
+async def _load_principal(user_id: int, db: AsyncSession) -> Principal | None:
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        result = await db.execute(
+            select(User.id, User.role, User.is_active).where(User.id == user_id)
+        )
+        row = result.one_or_none()
+        if row is not None:
+            principal = Principal(*row)
+            principal_cache.put(principal)
+    return principal
+
+
+async def get_current_principal(token: str, db: AsyncSession) -> Principal:
+    principal = await _load_principal(_get_token_user_id(token), db)
+    if principal is None or not principal.is_active:
+        raise_http_401("Пользователь неактивен или не найден")
+    return principal
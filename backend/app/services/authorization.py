@@ -6,27 +6,39 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db import get_db
 from ..models import User, UserRole
-from .auth_service import get_current_user
+from .auth_service import get_current_principal, get_current_user
 from .errors import raise_http_401, raise_http_403
+from .principal_cache import Principal
 
 bearer_scheme = HTTPBearer(auto_error=False)
 
 
+def _get_token(credentials: HTTPAuthorizationCredentials | None) -> str:
+    if credentials is None or not credentials.credentials:
+        raise_http_401("Не авторизован")
+    return credentials.credentials
+
+
 async def require_user(
     db: AsyncSession = Depends(get_db),
     credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
 ) -> User:
-    if credentials is None or not credentials.credentials:
-        raise_http_401("Не авторизован")
-    return await get_current_user(credentials.credentials, db)
+    return await get_current_user(_get_token(credentials), db)
+
+
+async def require_principal(
+    db: AsyncSession = Depends(get_db),
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+) -> Principal:
+    return await get_current_principal(_get_token(credentials), db)
 
 
 def require_roles(*roles: UserRole):
-    def dependency(user: User = Depends(require_user)) -> User:
-        if user.role == UserRole.ADMIN:
-            return user
-        if roles and user.role not in roles:
+    def dependency(principal: Principal = Depends(require_principal)) -> Principal:
+        if principal.role == UserRole.ADMIN:
+            return principal
+        if roles and principal.role not in roles:
             raise_http_403("Недостаточно прав")
-        return user
+        return principal
 
     return dependency
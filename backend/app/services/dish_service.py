@@ -7,6 +7,8 @@ from sqlalchemy.orm import selectinload
 from ..models import Allergy, Dish
 from ..schemas.dish import DishCreate, DishUpdate
 from .errors import raise_http_400, raise_http_404
+from .allergen_index import invalidate_local_allergens, notify_allergens_changed
+from .menu_cache import invalidate_local_menus, notify_menus_changed
 
 
 def _normalize_optional_text(value: str | None) -> str | None:
@@ -36,7 +38,7 @@ async def _resolve_allergies(allergy_ids: list[int], db: AsyncSession) -> list[A
 
 
 def _dish_query_with_allergies():
-    return select(Dish).options(selectinload(Dish.allergies))
+    return select(Dish).options(selectinload(Dish.allergies), selectinload(Dish.rating_stats))
 
 
 async def list_dishes(db: AsyncSession, is_active: bool | None = None) -> list[Dish]:
@@ -71,7 +73,9 @@ async def create_dish(payload: DishCreate, db: AsyncSession) -> Dish:
         dish.allergies = await _resolve_allergies(payload.allergy_ids, db)
 
     db.add(dish)
+    await notify_allergens_changed(db)
     await db.commit()
+    invalidate_local_allergens()
     return await get_dish(dish.id, db)
 
 
@@ -94,10 +98,18 @@ async def update_dish(dish: Dish, payload: DishUpdate, db: AsyncSession) -> Dish
         allergy_ids = payload.allergy_ids or []
         dish.allergies = await _resolve_allergies(allergy_ids, db)
 
+    await notify_menus_changed(db)
+    await notify_allergens_changed(db)
     await db.commit()
+    invalidate_local_menus()
+    invalidate_local_allergens()
     return await get_dish(dish.id, db)
 
 
 async def delete_dish(dish: Dish, db: AsyncSession) -> None:
     await db.delete(dish)
+    await notify_menus_changed(db)
+    await notify_allergens_changed(db)
     await db.commit()
+    invalidate_local_menus()
+    invalidate_local_allergens()
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import NamedTuple
+
+from sqlalchemy import and_, exists, select, union
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models import (
+    MealCoverage,
+    MealIssue,
+    MealIssueStatus,
+    Menu,
+    Payment,
+    PaymentStatus,
+    PaymentType,
+)
+from .errors import raise_http_404
+from .pg_events import pg_events, pg_notify
+
+ELIGIBILITY_CHANNEL = "canteen_menu_eligibility"
+ALL_MENUS = "*"
+
+
+class EligibilityEntry(NamedTuple):
+    user_id: int
+    payment_type: PaymentType | None
+    issue_status: MealIssueStatus | None
+
+
+class MenuEligibility(NamedTuple):
+    menu_id: int
+    menu_date: date
+    items: list[EligibilityEntry]
+
+
+class EligibilityCache:
+    def __init__(self, ttl_seconds: float, max_size: int) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._max_size = max_size
+        self._entries: OrderedDict[int, tuple[float, MenuEligibility]] = OrderedDict()
+
+    def get(self, menu_id: int) -> MenuEligibility | None:
+        entry = self._entries.get(menu_id)
+        if entry is None:
+            return None
+        expires_at, eligibility = entry
+        if expires_at <= time.monotonic():
+            del self._entries[menu_id]
+            return None
+        self._entries.move_to_end(menu_id)
+        return eligibility
+
+    def put(self, eligibility: MenuEligibility) -> None:
+        if self._max_size <= 0 or self._ttl_seconds <= 0:
+            return
+        self._entries[eligibility.menu_id] = (
+            time.monotonic() + self._ttl_seconds,
+            eligibility,
+        )
+        self._entries.move_to_end(eligibility.menu_id)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, menu_id: int | None) -> None:
+        if menu_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(menu_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+eligibility_cache = EligibilityCache(
+    ttl_seconds=settings.eligibility_cache_ttl_seconds,
+    max_size=settings.eligibility_cache_size,
+)
+
+
+def _on_eligibility_event(payload: str) -> None:
+    eligibility_cache.invalidate(None if payload == ALL_MENUS else int(payload))
+
+
+pg_events.subscribe(ELIGIBILITY_CHANNEL, _on_eligibility_event, on_resync=eligibility_cache.clear)
+
+
+async def notify_eligibility_changed(db: AsyncSession, menu_id: int | None) -> None:
+    await pg_notify(db, ELIGIBILITY_CHANNEL, ALL_MENUS if menu_id is None else str(menu_id))
+
+
+def invalidate_local_eligibility(menu_id: int | None) -> None:
+    eligibility_cache.invalidate(menu_id)
+
+
+async def _load_menu_eligibility(menu_id: int, db: AsyncSession) -> MenuEligibility:
+    result = await db.execute(select(Menu.menu_date).where(Menu.id == menu_id))
+    menu_date = result.scalar_one_or_none()
+    if menu_date is None:
+        raise_http_404("Меню не найдено")
+
+    one_time_paid = and_(
+        Payment.menu_id == menu_id,
+        Payment.payment_type == PaymentType.ONE_TIME,
+        Payment.status == PaymentStatus.PAID,
+    )
+    user_ids = union(
+        select(MealCoverage.user_id).where(MealCoverage.menu_date == menu_date),
+        select(Payment.user_id).where(one_time_paid),
+        select(MealIssue.user_id).where(MealIssue.menu_id == menu_id),
+    ).subquery()
+    result = await db.execute(
+        select(
+            user_ids.c.user_id,
+            MealCoverage.payment_id,
+            exists().where(Payment.user_id == user_ids.c.user_id, one_time_paid),
+            MealIssue.status,
+        )
+        .outerjoin(
+            MealCoverage,
+            and_(
+                MealCoverage.user_id == user_ids.c.user_id,
+                MealCoverage.menu_date == menu_date,
+            ),
+        )
+        .outerjoin(
+            MealIssue,
+            and_(MealIssue.user_id == user_ids.c.user_id, MealIssue.menu_id == menu_id),
+        )
+        .order_by(user_ids.c.user_id)
+    )
+    items = []
+    for user_id, coverage_payment_id, paid_once, issue_status in result.all():
+        if paid_once:
+            payment_type = PaymentType.ONE_TIME
+        elif coverage_payment_id is not None:
+            payment_type = PaymentType.SUBSCRIPTION
+        else:
+            payment_type = None
+        items.append(EligibilityEntry(user_id, payment_type, issue_status))
+    return MenuEligibility(menu_id, menu_date, items)
+
+
+async def get_menu_eligibility(menu_id: int, db: AsyncSession) -> MenuEligibility:
+    eligibility = eligibility_cache.get(menu_id)
+    if eligibility is None:
+        eligibility = await _load_menu_eligibility(menu_id, db)
+        eligibility_cache.put(eligibility)
+    return eligibility
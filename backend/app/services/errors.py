@@ -21,3 +21,7 @@ def raise_http_404(detail: str) -> None:
 
 def raise_http_403(detail: str) -> None:
     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+
+
+def raise_http_503(detail: str) -> None:
+    raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=detail)
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Any, NamedTuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.utils import utcnow
+from .meal_issue_service import list_served_meal_issues_after
+from .notification_bus import notification_bus, wait_for_wakeup
+from .notification_service import (
+    count_unread_notifications,
+    get_latest_user_notification_id,
+    list_user_notifications_after,
+)
+
+KEEPALIVE_SECONDS = 15
+EVENT_BATCH_SIZE = 100
+
+
+class EventCursor(NamedTuple):
+    notification_id: int
+    served_at: datetime
+    meal_issue_id: int
+
+    def encode(self) -> str:
+        return f"{self.notification_id}_{self.served_at.isoformat()}_{self.meal_issue_id}"
+
+    @classmethod
+    def decode(cls, value: str | None) -> EventCursor | None:
+        if not value:
+            return None
+        try:
+            notification_id, served_at, meal_issue_id = value.split("_")
+            return cls(int(notification_id), datetime.fromisoformat(served_at), int(meal_issue_id))
+        except ValueError:
+            return None
+
+
+class StreamEvent(NamedTuple):
+    name: str
+    cursor: EventCursor
+    data: Any
+
+
+async def _initial_cursor(db: AsyncSession, user_id: int) -> EventCursor:
+    latest_id = await get_latest_user_notification_id(db, user_id)
+    return EventCursor(latest_id, utcnow(), 0)
+
+
+async def _collect_events(
+    db: AsyncSession, user_id: int, cursor: EventCursor
+) -> tuple[list[StreamEvent], EventCursor]:
+    events: list[StreamEvent] = []
+    while True:
+        notifications = await list_user_notifications_after(
+            db, user_id, cursor.notification_id, limit=EVENT_BATCH_SIZE
+        )
+        for item in notifications:
+            cursor = cursor._replace(notification_id=item.id)
+            events.append(StreamEvent("notification", cursor, item))
+        if len(notifications) < EVENT_BATCH_SIZE:
+            break
+
+    while True:
+        issues = await list_served_meal_issues_after(
+            user_id, cursor.served_at, cursor.meal_issue_id, db, limit=EVENT_BATCH_SIZE
+        )
+        for issue in issues:
+            cursor = cursor._replace(served_at=issue.served_at, meal_issue_id=issue.id)
+            events.append(StreamEvent("meal_issue", cursor, issue))
+        if len(issues) < EVENT_BATCH_SIZE:
+            break
+    return events, cursor
+
+
+async def stream_user_events(
+    db: AsyncSession,
+    user_id: int,
+    cursor: EventCursor | None = None,
+    keepalive_seconds: float = KEEPALIVE_SECONDS,
+) -> AsyncIterator[StreamEvent | None]:
+    with notification_bus.subscribe(user_id) as wakeup:
+        if cursor is None:
+            cursor = await _initial_cursor(db, user_id)
+        unread_count = await count_unread_notifications(db, user_id)
+        yield StreamEvent("unread_count", cursor, {"unread_count": unread_count, "delta": 0})
+
+        while True:
+            events, cursor = await _collect_events(db, user_id, cursor)
+            for event in events:
+                yield event
+
+            count = await count_unread_notifications(db, user_id)
+            if count != unread_count:
+                delta, unread_count = count - unread_count, count
+                yield StreamEvent(
+                    "unread_count", cursor, {"unread_count": unread_count, "delta": delta}
+                )
+
+            await db.close()
+            while not await wait_for_wakeup(wakeup, keepalive_seconds):
+                yield None
+            wakeup.clear()
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from collections.abc import AsyncIterator
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+EXPORT_BATCH_SIZE = 500
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+}
+
+
+def _plain_value(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _ndjson_chunk(columns: list[str], rows) -> str:
+    return "".join(
+        json.dumps(
+            dict(zip(columns, (_plain_value(value) for value in row))),
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        + "\n"
+        for row in rows
+    )
+
+
+def _csv_chunk(rows) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["" if value is None else _plain_value(value) for value in row])
+    return buffer.getvalue()
+
+
+async def stream_export(
+    db: AsyncSession, stmt: Select, export_format: ExportFormat
+) -> AsyncIterator[str]:
+    columns = [column.key for column in stmt.selected_columns]
+    if export_format == ExportFormat.CSV:
+        yield "\ufeff" + _csv_chunk([columns])
+    result = await db.stream(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    async for rows in result.partitions():
+        if export_format == ExportFormat.CSV:
+            yield _csv_chunk(rows)
+        else:
+            yield _ndjson_chunk(columns, rows)
+
+
+def export_response(
+    db: AsyncSession, stmt: Select, export_format: ExportFormat, filename: str
+) -> StreamingResponse:
+    return StreamingResponse(
+        stream_export(db, stmt, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{export_format.value}"'
+        },
+    )
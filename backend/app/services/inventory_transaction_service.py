@@ -3,13 +3,22 @@ from __future__ import annotations
 from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import select
+from sqlalchemy import func, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
-from ..models import InventoryDirection, InventoryTransaction, Product
-from ..schemas.inventory_transaction import InventoryTransactionCreate
+from ..models import (
+    InventoryDirection,
+    InventoryTransaction,
+    Product,
+    PurchaseRequest,
+    PurchaseRequestStatus,
+)
+from ..models.utils import utcnow
+from ..schemas.inventory_transaction import InventoryReceiptCreate, InventoryTransactionCreate
 from .errors import raise_http_400, raise_http_404
-from .product_service import get_product_stock
+from .pagination import DEFAULT_PAGE_SIZE, Page, paginate
+from .product_service import apply_stock_delta, apply_stock_deltas, take_stock
 
 
 async def _get_product(product_id: int, db: AsyncSession) -> Product:
@@ -20,16 +29,13 @@ async def _get_product(product_id: int, db: AsyncSession) -> Product:
     return product
 
 
-async def list_inventory_transactions(
-    db: AsyncSession,
-    product_id: int | None = None,
-    direction: InventoryDirection | None = None,
-    date_from: datetime | None = None,
-    date_to: datetime | None = None,
-) -> list[InventoryTransaction]:
-    stmt = select(InventoryTransaction).order_by(
-        InventoryTransaction.created_at.desc(), InventoryTransaction.id.desc()
-    )
+def _filter_inventory_transactions(
+    stmt,
+    product_id: int | None,
+    direction: InventoryDirection | None,
+    date_from: datetime | None,
+    date_to: datetime | None,
+):
     if product_id is not None:
         stmt = stmt.where(InventoryTransaction.product_id == product_id)
     if direction is not None:
@@ -38,8 +44,49 @@ async def list_inventory_transactions(
         stmt = stmt.where(InventoryTransaction.created_at >= date_from)
     if date_to is not None:
         stmt = stmt.where(InventoryTransaction.created_at <= date_to)
-    result = await db.execute(stmt)
-    return list(result.scalars().all())
+    return stmt
+
+
+async def list_inventory_transactions(
+    db: AsyncSession,
+    product_id: int | None = None,
+    direction: InventoryDirection | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> Page:
+    stmt = _filter_inventory_transactions(
+        select(InventoryTransaction), product_id, direction, date_from, date_to
+    )
+    return await paginate(
+        db,
+        stmt,
+        (InventoryTransaction.created_at, InventoryTransaction.id),
+        cursor=cursor,
+        limit=limit,
+    )
+
+
+def inventory_transaction_export_query(
+    product_id: int | None = None,
+    direction: InventoryDirection | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+):
+    stmt = select(
+        InventoryTransaction.id,
+        InventoryTransaction.product_id,
+        Product.name.label("product_name"),
+        Product.unit,
+        InventoryTransaction.direction,
+        InventoryTransaction.quantity,
+        InventoryTransaction.reason,
+        InventoryTransaction.created_by_id,
+        InventoryTransaction.created_at,
+    ).join(Product, Product.id == InventoryTransaction.product_id)
+    stmt = _filter_inventory_transactions(stmt, product_id, direction, date_from, date_to)
+    return stmt.order_by(InventoryTransaction.created_at.desc(), InventoryTransaction.id.desc())
 
 
 async def create_inventory_transaction(
@@ -52,9 +99,11 @@ async def create_inventory_transaction(
         raise_http_400("Продукт неактивен")
 
     if payload.direction == InventoryDirection.OUT:
-        stock: Decimal = await get_product_stock(product.id, db)
-        if stock < payload.quantity:
+        if not await take_stock(product.id, payload.quantity, db):
+            await db.rollback()
             raise_http_400("Недостаточно остатка")
+    else:
+        await apply_stock_delta(product.id, payload.quantity, db)
 
     transaction = InventoryTransaction(
         product_id=product.id,
@@ -67,3 +116,101 @@ async def create_inventory_transaction(
     await db.commit()
     await db.refresh(transaction)
     return transaction
+
+
+async def _get_active_products(product_ids: list[int], db: AsyncSession) -> dict[int, Product]:
+    result = await db.execute(select(Product).where(Product.id.in_(product_ids)))
+    products = {product.id: product for product in result.scalars().all()}
+    missing_ids = sorted(set(product_ids) - set(products))
+    if missing_ids:
+        raise_http_400(f"Продукты не найдены: {missing_ids}")
+    inactive_ids = sorted(product.id for product in products.values() if not product.is_active)
+    if inactive_ids:
+        raise_http_400(f"Продукты неактивны: {inactive_ids}")
+    return products
+
+
+async def _lock_purchase_request_for_receipt(
+    purchase_request_id: int, db: AsyncSession
+) -> PurchaseRequest:
+    result = await db.execute(
+        select(PurchaseRequest)
+        .options(selectinload(PurchaseRequest.items))
+        .where(PurchaseRequest.id == purchase_request_id)
+        .with_for_update()
+    )
+    purchase_request = result.scalar_one_or_none()
+    if purchase_request is None:
+        raise_http_404("Заявка на закупку не найдена")
+    if purchase_request.status != PurchaseRequestStatus.APPROVED:
+        raise_http_400("Оприходовать можно только согласованную заявку")
+    if purchase_request.received_at is not None:
+        raise_http_400("Поставка по заявке уже оприходована")
+    return purchase_request
+
+
+async def _received_quantities(purchase_request_id: int, db: AsyncSession) -> dict[int, Decimal]:
+    result = await db.execute(
+        select(InventoryTransaction.product_id, func.sum(InventoryTransaction.quantity))
+        .where(
+            InventoryTransaction.purchase_request_id == purchase_request_id,
+            InventoryTransaction.direction == InventoryDirection.IN,
+        )
+        .group_by(InventoryTransaction.product_id)
+    )
+    return {product_id: Decimal(quantity) for product_id, quantity in result.all()}
+
+
+async def receive_inventory(
+    payload: InventoryReceiptCreate,
+    created_by_id: int | None,
+    db: AsyncSession,
+) -> list[InventoryTransaction]:
+    quantities = {item.product_id: item.quantity for item in payload.items}
+    reason = payload.reason
+    if payload.purchase_request_id is not None:
+        purchase_request = await _lock_purchase_request_for_receipt(
+            payload.purchase_request_id, db
+        )
+        ordered: dict[int, Decimal] = {}
+        for item in purchase_request.items:
+            ordered[item.product_id] = ordered.get(item.product_id, Decimal("0")) + item.quantity
+        received = await _received_quantities(purchase_request.id, db)
+        if not quantities:
+            quantities = {
+                product_id: quantity - received.get(product_id, Decimal("0"))
+                for product_id, quantity in ordered.items()
+                if quantity > received.get(product_id, Decimal("0"))
+            }
+        foreign_ids = sorted(set(quantities) - set(ordered))
+        if foreign_ids:
+            raise_http_400(f"Продуктов нет в заявке: {foreign_ids}")
+        if reason is None:
+            reason = f"Поставка по заявке №{purchase_request.id}"
+        if all(
+            received.get(product_id, Decimal("0")) + quantities.get(product_id, Decimal("0"))
+            >= quantity
+            for product_id, quantity in ordered.items()
+        ):
+            purchase_request.received_at = utcnow()
+
+    await _get_active_products(list(quantities), db)
+
+    result = await db.scalars(
+        insert(InventoryTransaction).returning(InventoryTransaction),
+        [
+            {
+                "product_id": product_id,
+                "quantity": quantity,
+                "direction": InventoryDirection.IN,
+                "reason": reason,
+                "created_by_id": created_by_id,
+                "purchase_request_id": payload.purchase_request_id,
+            }
+            for product_id, quantity in quantities.items()
+        ],
+    )
+    transactions = list(result.all())
+    await apply_stock_deltas(quantities, db)
+    await db.commit()
+    return transactions
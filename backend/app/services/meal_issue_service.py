@@ -2,23 +2,33 @@ from __future__ import annotations
 
 from datetime import date
 
-from sqlalchemy import select
+from sqlalchemy import and_, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from ..models import MealIssue, MealIssueStatus, Menu, User, UserRole
+from ..models import (
+    MealIssue,
+    MealIssueStatus,
+    Menu,
+    MenuItem,
+    User,
+    UserRole,
+)
 from ..models.utils import utcnow
+from .allergen_index import allergen_index, get_allergy_warnings
+from .eligibility_service import invalidate_local_eligibility, notify_eligibility_changed
 from .errors import raise_http_400, raise_http_404
-from .notification_service import create_notification_for_users
-from .payment_service import is_meal_paid
-
-
-async def _get_user(user_id: int, db: AsyncSession) -> User:
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-    if not user:
-        raise_http_404("Пользователь не найден")
-    return user
+from .pagination import DEFAULT_PAGE_SIZE, Page, paginate
+from .notification_service import stage_notification_for_users, wake_local_waiters
+from .payment_service import is_meal_paid, meal_paid_clause
+from .portion_service import (
+    SOLD_OUT_DETAIL,
+    count_tracked_items,
+    is_hot_menu,
+    portion_counters,
+    portion_transaction,
+)
+from .report_rollup_service import mark_attendance_dirty
 
 
 async def _get_menu(menu_id: int, db: AsyncSession) -> Menu:
@@ -41,22 +51,19 @@ async def _get_meal_issue(user_id: int, menu_id: int, db: AsyncSession) -> MealI
     return result.scalar_one_or_none()
 
 
-def _consume_menu_items(menu: Menu) -> None:
-    for item in menu.menu_items:
-        if item.remaining_qty is None:
-            continue
-        if item.remaining_qty <= 0:
-            raise_http_400("Недостаточно блюд в меню для выдачи")
-        item.remaining_qty -= 1
-
-
-async def list_meal_issues(user_id: int, db: AsyncSession) -> list[MealIssue]:
-    result = await db.execute(
-        select(MealIssue)
-        .where(MealIssue.user_id == user_id)
-        .order_by(MealIssue.created_at.desc())
+async def list_meal_issues(
+    user_id: int,
+    db: AsyncSession,
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> Page:
+    return await paginate(
+        db,
+        select(MealIssue).where(MealIssue.user_id == user_id),
+        (MealIssue.created_at, MealIssue.id),
+        cursor=cursor,
+        limit=limit,
     )
-    return list(result.scalars().all())
 
 
 async def list_served_meal_issues_since(
@@ -79,6 +86,30 @@ async def list_served_meal_issues_since(
     return list(result.scalars().all())
 
 
+async def list_served_meal_issues_after(
+    user_id: int,
+    served_at,
+    after_id: int,
+    db: AsyncSession,
+    limit: int = 100,
+) -> list[MealIssue]:
+    result = await db.execute(
+        select(MealIssue)
+        .where(
+            MealIssue.user_id == user_id,
+            MealIssue.status == MealIssueStatus.SERVED,
+            MealIssue.served_at.is_not(None),
+            or_(
+                MealIssue.served_at > served_at,
+                (MealIssue.served_at == served_at) & (MealIssue.id > after_id),
+            ),
+        )
+        .order_by(MealIssue.served_at.asc(), MealIssue.id.asc())
+        .limit(limit)
+    )
+    return list(result.scalars().all())
+
+
 async def issue_meal(user_id: int, menu_id: int, db: AsyncSession) -> MealIssue:
     menu = await _get_menu(menu_id, db)
     issue = await _get_meal_issue(user_id, menu_id, db)
@@ -87,27 +118,29 @@ async def issue_meal(user_id: int, menu_id: int, db: AsyncSession) -> MealIssue:
     if not await is_meal_paid(user_id, menu, db):
         raise_http_400("Питание не оплачено")
 
-    _consume_menu_items(menu)
     issue = MealIssue(
         user_id=user_id,
         menu_id=menu.id,
         status=MealIssueStatus.ISSUED,
     )
-    db.add(issue)
-    await db.commit()
+    async with portion_transaction(db, menu.id, menu.menu_date, count_tracked_items(menu)):
+        db.add(issue)
+        await mark_attendance_dirty(db, menu.menu_date)
+        await notify_eligibility_changed(db, menu.id)
+    invalidate_local_eligibility(menu.id)
     await db.refresh(issue)
     return issue
 
 
-async def list_meal_issues_for_staff(
-    db: AsyncSession,
-    status: MealIssueStatus | None = None,
-    menu_id: int | None = None,
-    user_id: int | None = None,
-    date_from: date | None = None,
-    date_to: date | None = None,
-) -> list[MealIssue]:
-    stmt = select(MealIssue).join(Menu, MealIssue.menu_id == Menu.id)
+def _filter_staff_meal_issues(
+    stmt,
+    status: MealIssueStatus | None,
+    menu_id: int | None,
+    user_id: int | None,
+    date_from: date | None,
+    date_to: date | None,
+):
+    stmt = stmt.join(Menu, MealIssue.menu_id == Menu.id)
     if status is not None:
         stmt = stmt.where(MealIssue.status == status)
     if menu_id is not None:
@@ -118,13 +151,58 @@ async def list_meal_issues_for_staff(
         stmt = stmt.where(Menu.menu_date >= date_from)
     if date_to is not None:
         stmt = stmt.where(Menu.menu_date <= date_to)
-    stmt = stmt.order_by(Menu.menu_date.desc(), MealIssue.created_at.desc(), MealIssue.id.desc())
-    result = await db.execute(stmt)
-    return list(result.scalars().all())
+    return stmt
+
+
+async def list_meal_issues_for_staff(
+    db: AsyncSession,
+    status: MealIssueStatus | None = None,
+    menu_id: int | None = None,
+    user_id: int | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> Page:
+    stmt = _filter_staff_meal_issues(
+        select(MealIssue), status, menu_id, user_id, date_from, date_to
+    )
+    return await paginate(
+        db,
+        stmt,
+        (Menu.menu_date, Menu.id, MealIssue.created_at, MealIssue.id),
+        cursor=cursor,
+        limit=limit,
+    )
+
+
+def meal_issue_export_query(
+    status: MealIssueStatus | None = None,
+    menu_id: int | None = None,
+    user_id: int | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+):
+    stmt = select(
+        MealIssue.id,
+        MealIssue.user_id,
+        MealIssue.menu_id,
+        Menu.menu_date,
+        Menu.meal_type,
+        MealIssue.status,
+        MealIssue.served_by_id,
+        MealIssue.served_at,
+        MealIssue.confirmed_at,
+        MealIssue.created_at,
+    ).select_from(MealIssue)
+    stmt = _filter_staff_meal_issues(stmt, status, menu_id, user_id, date_from, date_to)
+    return stmt.order_by(
+        Menu.menu_date.desc(), Menu.id.desc(), MealIssue.created_at.desc(), MealIssue.id.desc()
+    )
 
 
 async def confirm_meal(user_id: int, menu_id: int, db: AsyncSession) -> MealIssue:
-    await _get_menu(menu_id, db)
+    menu = await _get_menu(menu_id, db)
     issue = await _get_meal_issue(user_id, menu_id, db)
     if issue:
         if issue.status == MealIssueStatus.CONFIRMED:
@@ -132,7 +210,10 @@ async def confirm_meal(user_id: int, menu_id: int, db: AsyncSession) -> MealIssu
         if issue.status == MealIssueStatus.SERVED:
             issue.status = MealIssueStatus.CONFIRMED
             issue.confirmed_at = utcnow()
+            await mark_attendance_dirty(db, menu.menu_date)
+            await notify_eligibility_changed(db, menu_id)
             await db.commit()
+            invalidate_local_eligibility(menu_id)
             await db.refresh(issue)
             return issue
         if issue.status == MealIssueStatus.ISSUED:
@@ -142,56 +223,198 @@ async def confirm_meal(user_id: int, menu_id: int, db: AsyncSession) -> MealIssu
     raise_http_400("Выдача ещё не создана")
 
 
+SERVED_NOTIFICATION_TITLE = "Питание выдано"
+SERVED_NOTIFICATION_BODY = "Питание выдано. Подтвердите получение в личном кабинете."
+
+
+def _serve_eligibility_query(user_id: int, menu_id: int):
+    paid = meal_paid_clause(user_id, Menu.id, Menu.menu_date)
+    tracked_items = (
+        select(func.count(MenuItem.id))
+        .where(MenuItem.menu_id == Menu.id, MenuItem.remaining_qty.is_not(None))
+        .scalar_subquery()
+    )
+    available = (
+        select(func.min(MenuItem.remaining_qty))
+        .where(MenuItem.menu_id == Menu.id)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            User.role,
+            Menu.id,
+            Menu.menu_date,
+            MealIssue,
+            paid.label("paid"),
+            tracked_items.label("tracked_items"),
+            available.label("available"),
+        )
+        .select_from(User)
+        .outerjoin(Menu, Menu.id == menu_id)
+        .outerjoin(
+            MealIssue,
+            and_(MealIssue.user_id == User.id, MealIssue.menu_id == menu_id),
+        )
+        .where(User.id == user_id)
+    )
+
+
 async def serve_meal(
     user_id: int, menu_id: int, served_by_id: int, db: AsyncSession
-) -> MealIssue:
-    issue = await _get_meal_issue(user_id, menu_id, db)
+) -> tuple[MealIssue, list[str]]:
+    result = await db.execute(_serve_eligibility_query(user_id, menu_id))
+    row = result.one_or_none()
+    if row is None:
+        raise_http_404("Пользователь не найден")
+    role, found_menu_id, menu_date, issue, paid, tracked_items, available = row
+
+    portions_needed = 0
     if issue:
         if issue.status == MealIssueStatus.CONFIRMED:
             raise_http_400("Питание уже подтверждено")
         if issue.status == MealIssueStatus.SERVED:
             raise_http_400("Питание уже выдано")
-        if issue.status == MealIssueStatus.ISSUED:
-            issue.status = MealIssueStatus.SERVED
-            issue.served_by_id = served_by_id
-            issue.served_at = utcnow()
-            await db.commit()
-            await db.refresh(issue)
-            await create_notification_for_users(
-                db,
-                title="Питание выдано",
-                body="Питание выдано. Подтвердите получение в личном кабинете.",
-                recipient_ids=[user_id],
-                created_by_id=served_by_id,
-            )
-            return issue
-        raise_http_400("Некорректный статус выдачи")
+        if issue.status != MealIssueStatus.ISSUED:
+            raise_http_400("Некорректный статус выдачи")
+        issue.status = MealIssueStatus.SERVED
+        issue.served_by_id = served_by_id
+        issue.served_at = utcnow()
+    else:
+        if role != UserRole.STUDENT:
+            raise_http_400("Получать питание могут только ученики")
+        if found_menu_id is None:
+            raise_http_404("Меню не найдено")
+        if not paid:
+            raise_http_400("Питание не оплачено")
+        if available is not None and available <= 0 and not is_hot_menu(menu_date):
+            raise_http_400(SOLD_OUT_DETAIL)
 
-    user = await _get_user(user_id, db)
-    if user.role != UserRole.STUDENT:
-        raise_http_400("Получать питание могут только ученики")
-    menu = await _get_menu(menu_id, db)
-    if not await is_meal_paid(user_id, menu, db):
-        raise_http_400("Питание не оплачено")
+        issue = MealIssue(
+            user_id=user_id,
+            menu_id=menu_id,
+            status=MealIssueStatus.SERVED,
+            served_by_id=served_by_id,
+            served_at=utcnow(),
+        )
+        portions_needed = 1
 
-    _consume_menu_items(menu)
-    issue = MealIssue(
-        user_id=user_id,
-        menu_id=menu.id,
-        status=MealIssueStatus.SERVED,
-        served_by_id=served_by_id,
-        served_at=utcnow(),
+    async with portion_transaction(
+        db, menu_id, menu_date, tracked_items, count=portions_needed
+    ):
+        db.add(issue)
+        await stage_notification_for_users(
+            db,
+            title=SERVED_NOTIFICATION_TITLE,
+            body=SERVED_NOTIFICATION_BODY,
+            recipient_ids=[user_id],
+            created_by_id=served_by_id,
+        )
+        await mark_attendance_dirty(db, menu_date)
+        await notify_eligibility_changed(db, menu_id)
+        warnings = await get_allergy_warnings(user_id, menu_id, db)
+    invalidate_local_eligibility(menu_id)
+    wake_local_waiters([user_id])
+    return issue, warnings
+
+
+async def serve_meals_batch(
+    user_ids: list[int], menu_id: int, served_by_id: int, db: AsyncSession
+) -> list[tuple[int, MealIssue | None, str | None, list[str]]]:
+    menu_result = await db.execute(
+        select(
+            Menu.menu_date,
+            select(func.count(MenuItem.id))
+            .where(MenuItem.menu_id == Menu.id, MenuItem.remaining_qty.is_not(None))
+            .scalar_subquery(),
+            select(func.min(MenuItem.remaining_qty))
+            .where(MenuItem.menu_id == Menu.id)
+            .scalar_subquery(),
+        ).where(Menu.id == menu_id)
     )
-    db.add(issue)
-    await db.commit()
-    await db.refresh(issue)
-    await create_notification_for_users(
-        db,
-        title="Питание выдано",
-        body="Питание выдано. Подтвердите получение в личном кабинете.",
-        recipient_ids=[user_id],
-        created_by_id=served_by_id,
+    menu_row = menu_result.one_or_none()
+    if menu_row is None:
+        raise_http_404("Меню не найдено")
+    menu_date, tracked_items, available = menu_row
+
+    paid = meal_paid_clause(User.id, menu_id, menu_date)
+    result = await db.execute(
+        select(User.id, User.role, MealIssue, paid.label("paid"))
+        .outerjoin(
+            MealIssue,
+            and_(MealIssue.user_id == User.id, MealIssue.menu_id == menu_id),
+        )
+        .where(User.id.in_(user_ids))
     )
-    return issue
+    rows = {row[0]: row[1:] for row in result.all()}
+
+    served_at = utcnow()
+    outcomes: dict[int, tuple[MealIssue | None, str | None]] = {}
+    new_user_ids: list[int] = []
+    for user_id in user_ids:
+        if user_id not in rows:
+            outcomes[user_id] = (None, "Пользователь не найден")
+            continue
+        role, issue, is_paid = rows[user_id]
+        if issue:
+            if issue.status == MealIssueStatus.CONFIRMED:
+                outcomes[user_id] = (issue, "Питание уже подтверждено")
+            elif issue.status == MealIssueStatus.SERVED:
+                outcomes[user_id] = (issue, "Питание уже выдано")
+            else:
+                issue.status = MealIssueStatus.SERVED
+                issue.served_by_id = served_by_id
+                issue.served_at = served_at
+                outcomes[user_id] = (issue, None)
+        elif role != UserRole.STUDENT:
+            outcomes[user_id] = (None, "Получать питание могут только ученики")
+        elif not is_paid:
+            outcomes[user_id] = (None, "Питание не оплачено")
+        else:
+            new_user_ids.append(user_id)
+
+    if available is not None and new_user_ids:
+        if tracked_items and is_hot_menu(menu_date):
+            available = await portion_counters.available(menu_id, db.bind, len(new_user_ids))
+        for user_id in new_user_ids[max(available, 0) :]:
+            outcomes[user_id] = (None, SOLD_OUT_DETAIL)
+        new_user_ids = new_user_ids[: max(available, 0)]
 
+    new_issues = [
+        MealIssue(
+            user_id=user_id,
+            menu_id=menu_id,
+            status=MealIssueStatus.SERVED,
+            served_by_id=served_by_id,
+            served_at=served_at,
+        )
+        for user_id in new_user_ids
+    ]
+    for issue in new_issues:
+        outcomes[issue.user_id] = (issue, None)
 
+    recipient_ids = [user_id for user_id in user_ids if outcomes[user_id][1] is None]
+    warnings: dict[int, list[str]] = {}
+    if recipient_ids:
+        async with portion_transaction(
+            db, menu_id, menu_date, tracked_items, count=len(new_user_ids)
+        ):
+            db.add_all(new_issues)
+            await stage_notification_for_users(
+                db,
+                title=SERVED_NOTIFICATION_TITLE,
+                body=SERVED_NOTIFICATION_BODY,
+                recipient_ids=recipient_ids,
+                created_by_id=served_by_id,
+            )
+            await mark_attendance_dirty(db, menu_date)
+            await notify_eligibility_changed(db, menu_id)
+            menu_mask = await allergen_index.menu_mask(menu_id, db)
+            user_masks = await allergen_index.user_masks(recipient_ids, db)
+            warnings = {
+                user_id: allergen_index.allergy_names(mask & menu_mask)
+                for user_id, mask in user_masks.items()
+                if mask & menu_mask
+            }
+        invalidate_local_eligibility(menu_id)
+        wake_local_waiters(recipient_ids)
+    return [(user_id, *outcomes[user_id], warnings.get(user_id, [])) for user_id in user_ids]
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import NamedTuple
+
+from fastapi import Request, Response, status
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from .pg_events import pg_events, pg_notify
+
+MENU_CACHE_CHANNEL = "canteen_menu_cache"
+
+
+class CachedMenuResponse(NamedTuple):
+    version: int
+    etag: str
+    body: bytes
+
+
+class MenuResponseCache:
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._version = 0
+        self._size = 0
+        self._entries: OrderedDict[Hashable, CachedMenuResponse] = OrderedDict()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get(self, key: Hashable) -> CachedMenuResponse | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.version != self._version:
+            self._discard(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: Hashable, version: int, body: bytes) -> CachedMenuResponse:
+        entry = CachedMenuResponse(version, f'"{hashlib.sha256(body).hexdigest()}"', body)
+        if len(body) > self.max_bytes or version != self._version:
+            return entry
+        self._discard(key)
+        self._entries[key] = entry
+        self._size += len(body)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted.body)
+        return entry
+
+    def bump(self) -> None:
+        self._version += 1
+        self._entries.clear()
+        self._size = 0
+
+    def _discard(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry.body)
+
+
+menu_response_cache = MenuResponseCache(max_bytes=settings.menu_cache_max_bytes)
+
+
+def _on_menu_cache_event(_payload: str) -> None:
+    menu_response_cache.bump()
+
+
+pg_events.subscribe(MENU_CACHE_CHANNEL, _on_menu_cache_event, on_resync=menu_response_cache.bump)
+
+
+async def notify_menus_changed(db: AsyncSession) -> None:
+    await pg_notify(db, MENU_CACHE_CHANNEL, "*")
+
+
+def invalidate_local_menus() -> None:
+    menu_response_cache.bump()
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [item.strip() for item in if_none_match.split(",")]
+    return "*" in candidates or any(item.removeprefix("W/") == etag for item in candidates)
+
+
+async def cached_menu_response(
+    request: Request, key: Hashable, build: Callable[[], Awaitable[BaseModel]]
+) -> Response:
+    entry = menu_response_cache.get(key)
+    if entry is None:
+        version = menu_response_cache.version
+        payload = await build()
+        entry = menu_response_cache.put(key, version, payload.model_dump_json().encode())
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
@@ -7,8 +7,26 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from ..models import Dish, MealType, Menu, MenuItem
-from ..schemas.menu import MenuCreate, MenuItemCreate, MenuUpdate
+from ..schemas.menu import (
+    MenuCreate,
+    MenuItemCreate,
+    MenuUpdate,
+    PersonalMenuItemPublic,
+    PersonalMenuListResponse,
+    PersonalMenuPublic,
+)
+from .allergen_index import (
+    allergen_index,
+    invalidate_local_allergens,
+    mask_allergy_ids,
+    notify_allergens_changed,
+)
+from .eligibility_service import invalidate_local_eligibility, notify_eligibility_changed
 from .errors import raise_http_400, raise_http_404
+from .menu_cache import invalidate_local_menus, notify_menus_changed
+from .pagination import DEFAULT_PAGE_SIZE, Page, paginate
+from .portion_service import PortionSnapshot, notify_menu_changed, portion_counters
+from .report_rollup_service import mark_attendance_dirty
 
 
 def _normalize_optional_text(value: str | None) -> str | None:
@@ -56,12 +74,17 @@ def _build_menu_items(items: list[MenuItemCreate]) -> list[MenuItem]:
     ]
 
 
-def _menu_query_with_items():
-    return select(Menu).options(
-        selectinload(Menu.menu_items)
-        .selectinload(MenuItem.dish)
-        .selectinload(Dish.allergies)
-    )
+def _menu_query_with_items(with_ratings: bool = False):
+    items = selectinload(Menu.menu_items)
+    options = [items.selectinload(MenuItem.dish).selectinload(Dish.allergies)]
+    if with_ratings:
+        options.extend(
+            [
+                items.selectinload(MenuItem.rating_stats),
+                items.selectinload(MenuItem.dish).selectinload(Dish.rating_stats),
+            ]
+        )
+    return select(Menu).options(*options)
 
 
 async def list_menus(
@@ -69,17 +92,84 @@ async def list_menus(
     date_from: date | None = None,
     date_to: date | None = None,
     meal_type: MealType | None = None,
-) -> list[Menu]:
-    stmt = _menu_query_with_items()
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    with_ratings: bool = False,
+) -> Page:
+    stmt = _menu_query_with_items(with_ratings)
     if date_from:
         stmt = stmt.where(Menu.menu_date >= date_from)
     if date_to:
         stmt = stmt.where(Menu.menu_date <= date_to)
     if meal_type is not None:
         stmt = stmt.where(Menu.meal_type == meal_type)
-    stmt = stmt.order_by(Menu.menu_date, Menu.meal_type, Menu.id)
-    result = await db.execute(stmt)
-    return list(result.scalars().unique().all())
+    return await paginate(
+        db,
+        stmt,
+        (Menu.menu_date, Menu.meal_type, Menu.id),
+        cursor=cursor,
+        limit=limit,
+        descending=False,
+    )
+
+
+def _personal_menu_item(item: MenuItem, conflicts: int) -> PersonalMenuItemPublic:
+    return PersonalMenuItemPublic.model_validate(
+        {
+            "id": item.id,
+            "dish": item.dish,
+            "portion_size": item.portion_size,
+            "planned_qty": item.planned_qty,
+            "remaining_qty": item.remaining_qty,
+            "rating_stats": item.rating_stats,
+            "allergy_conflict": bool(conflicts),
+            "conflicting_allergy_ids": mask_allergy_ids(conflicts),
+        },
+        from_attributes=True,
+    )
+
+
+async def list_personal_menus(
+    user_id: int,
+    db: AsyncSession,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    meal_type: MealType | None = None,
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    exclude_conflicts: bool = False,
+) -> PersonalMenuListResponse:
+    page = await list_menus(
+        db,
+        date_from=date_from,
+        date_to=date_to,
+        meal_type=meal_type,
+        cursor=cursor,
+        limit=limit,
+        with_ratings=True,
+    )
+    user_mask = await allergen_index.user_mask(user_id, db)
+    dish_masks = await allergen_index.dish_masks(db)
+    menus = []
+    for menu in page.items:
+        items = []
+        for item in menu.menu_items:
+            conflicts = user_mask & dish_masks.get(item.dish_id, 0)
+            if conflicts and exclude_conflicts:
+                continue
+            items.append(_personal_menu_item(item, conflicts))
+        menus.append(
+            PersonalMenuPublic(
+                id=menu.id,
+                menu_date=menu.menu_date,
+                meal_type=menu.meal_type,
+                title=menu.title,
+                price=menu.price,
+                created_at=menu.created_at,
+                menu_items=items,
+            )
+        )
+    return PersonalMenuListResponse(items=menus, next_cursor=page.next_cursor)
 
 
 async def get_menu(menu_id: int, db: AsyncSession) -> Menu:
@@ -108,11 +198,15 @@ async def create_menu(payload: MenuCreate, db: AsyncSession) -> Menu:
         menu.menu_items = _build_menu_items(payload.items)
 
     db.add(menu)
+    await notify_menus_changed(db)
     await db.commit()
+    invalidate_local_menus()
     return await get_menu(menu.id, db)
 
 
 async def update_menu(menu: Menu, payload: MenuUpdate, db: AsyncSession) -> Menu:
+    await notify_menu_changed(menu.id, db)
+    previous_date = menu.menu_date
     if "meal_type" in payload.model_fields_set:
         if payload.meal_type is None:
             raise_http_400("Тип приёма пищи не может быть пустым")
@@ -137,10 +231,46 @@ async def update_menu(menu: Menu, payload: MenuUpdate, db: AsyncSession) -> Menu
         menu.menu_items = _build_menu_items(items)
 
     await _ensure_unique_menu(menu.menu_date, menu.meal_type, db, menu_id=menu.id)
+    await mark_attendance_dirty(db, previous_date, menu.menu_date)
+    await notify_eligibility_changed(db, menu.id)
+    await notify_menus_changed(db)
+    await notify_allergens_changed(db)
     await db.commit()
-    return await get_menu(menu.id, db)
+    menu_id = menu.id
+    invalidate_local_eligibility(menu_id)
+    invalidate_local_menus()
+    invalidate_local_allergens()
+    await portion_counters.release(menu_id, db.bind)
+    db.expire_all()
+    return await get_menu(menu_id, db)
 
 
 async def delete_menu(menu: Menu, db: AsyncSession) -> None:
+    menu_id = menu.id
+    portion_counters.forget(menu_id)
     await db.delete(menu)
+    await mark_attendance_dirty(db, menu.menu_date)
+    await notify_eligibility_changed(db, menu_id)
+    await notify_menus_changed(db)
     await db.commit()
+    invalidate_local_eligibility(menu_id)
+    invalidate_local_menus()
+
+
+async def get_menu_portions(
+    menu_id: int, db: AsyncSession
+) -> tuple[list[PortionSnapshot], bool]:
+    snapshot = portion_counters.snapshot(menu_id)
+    if snapshot is not None:
+        return snapshot, True
+    result = await db.execute(
+        select(MenuItem.id, MenuItem.dish_id, MenuItem.remaining_qty)
+        .where(MenuItem.menu_id == menu_id)
+        .order_by(MenuItem.id)
+    )
+    rows = result.all()
+    if not rows and await db.get(Menu, menu_id) is None:
+        raise_http_404("Меню не найдено")
+    return [
+        PortionSnapshot(item_id, dish_id, remaining, 0) for item_id, dish_id, remaining in rows
+    ], False
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from contextlib import contextmanager
+
+
+class NotificationBus:
+    def __init__(self) -> None:
+        self._waiters: dict[int, set[asyncio.Event]] = {}
+
+    @contextmanager
+    def subscribe(self, user_id: int) -> Iterator[asyncio.Event]:
+        event = asyncio.Event()
+        self._waiters.setdefault(user_id, set()).add(event)
+        try:
+            yield event
+        finally:
+            waiters = self._waiters.get(user_id)
+            if waiters is not None:
+                waiters.discard(event)
+                if not waiters:
+                    del self._waiters[user_id]
+
+    def publish(self, user_ids: Iterable[int]) -> None:
+        for user_id in set(user_ids):
+            for event in self._waiters.get(user_id, ()):
+                event.set()
+
+    def publish_all(self) -> None:
+        for waiters in self._waiters.values():
+            for event in waiters:
+                event.set()
+
+    def waiter_count(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+
+async def wait_for_wakeup(event: asyncio.Event, timeout: float) -> bool:
+    try:
+        await asyncio.wait_for(event.wait(), timeout=timeout)
+    except asyncio.TimeoutError:
+        return False
+    return True
+
+
+async def poll_until_items(
+    wakeup: asyncio.Event,
+    timeout: float,
+    fetch: Callable[[], Awaitable[list]],
+    before_wait: Callable[[], Awaitable[None]],
+) -> list:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    items = await fetch()
+    while not items:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        await before_wait()
+        await wait_for_wakeup(wakeup, remaining)
+        wakeup.clear()
+        items = await fetch()
+    return items
+
+
+notification_bus = NotificationBus()
@@ -7,6 +7,31 @@ from sqlalchemy.orm import selectinload
 from ..models import Notification, User, UserNotification, UserRole
 from ..models.utils import utcnow
 from .errors import raise_http_404
+from .notification_bus import notification_bus
+from .pg_events import pg_events, pg_notify
+
+NOTIFICATIONS_CHANNEL = "canteen_notifications"
+NOTIFY_CHUNK_SIZE = 500
+
+
+def _on_notifications_event(payload: str) -> None:
+    notification_bus.publish(int(item) for item in payload.split(",") if item)
+
+
+pg_events.subscribe(
+    NOTIFICATIONS_CHANNEL, _on_notifications_event, on_resync=notification_bus.publish_all
+)
+
+
+async def notify_users(db: AsyncSession, user_ids: list[int]) -> None:
+    for start in range(0, len(user_ids), NOTIFY_CHUNK_SIZE):
+        chunk = user_ids[start : start + NOTIFY_CHUNK_SIZE]
+        await pg_notify(db, NOTIFICATIONS_CHANNEL, ",".join(str(item) for item in chunk))
+
+
+def wake_local_waiters(user_ids: list[int]) -> None:
+    if not pg_events.is_running:
+        notification_bus.publish(user_ids)
 
 
 async def list_user_notifications(
@@ -51,6 +76,32 @@ async def list_user_notifications_since(
     return result.scalars().all()
 
 
+async def list_user_notifications_after(
+    db: AsyncSession,
+    user_id: int,
+    after_id: int,
+    limit: int = 100,
+) -> list[UserNotification]:
+    result = await db.execute(
+        select(UserNotification)
+        .options(selectinload(UserNotification.notification))
+        .where(
+            UserNotification.user_id == user_id,
+            UserNotification.id > after_id,
+        )
+        .order_by(UserNotification.id.asc())
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+
+async def get_latest_user_notification_id(db: AsyncSession, user_id: int) -> int:
+    result = await db.execute(
+        select(func.max(UserNotification.id)).where(UserNotification.user_id == user_id)
+    )
+    return int(result.scalar_one() or 0)
+
+
 async def count_unread_notifications(db: AsyncSession, user_id: int) -> int:
     result = await db.execute(
         select(func.count(UserNotification.id)).where(
@@ -84,8 +135,10 @@ async def mark_notification_read(
 ) -> UserNotification:
     if user_notification.read_at is None:
         user_notification.read_at = utcnow()
+        await notify_users(db, [user_notification.user_id])
         await db.commit()
         await db.refresh(user_notification)
+        wake_local_waiters([user_notification.user_id])
     return user_notification
 
 
@@ -98,18 +151,18 @@ async def mark_all_notifications_read(db: AsyncSession, user_id: int) -> None:
         )
         .values(read_at=utcnow())
     )
+    await notify_users(db, [user_id])
     await db.commit()
+    wake_local_waiters([user_id])
 
 
-async def create_notification_for_users(
+async def stage_notification_for_users(
     db: AsyncSession,
     title: str,
     body: str | None,
     recipient_ids: list[int],
     created_by_id: int | None = None,
 ) -> list[UserNotification]:
-    if not recipient_ids:
-        return []
     notification = Notification(
         title=title,
         body=body,
@@ -122,7 +175,24 @@ async def create_notification_for_users(
         for user_id in recipient_ids
     ]
     db.add_all(recipients)
+    await notify_users(db, recipient_ids)
+    return recipients
+
+
+async def create_notification_for_users(
+    db: AsyncSession,
+    title: str,
+    body: str | None,
+    recipient_ids: list[int],
+    created_by_id: int | None = None,
+) -> list[UserNotification]:
+    if not recipient_ids:
+        return []
+    recipients = await stage_notification_for_users(
+        db, title, body, recipient_ids, created_by_id=created_by_id
+    )
     await db.commit()
+    wake_local_waiters(recipient_ids)
     return recipients
 
 
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, NamedTuple
+
+from sqlalchemy import Select, literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .errors import raise_http_400
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+INVALID_CURSOR_DETAIL = "Некорректный курсор"
+
+
+class Page(NamedTuple):
+    items: list[Any]
+    next_cursor: str | None
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _decode_value(column, value: Any) -> Any:
+    python_type = column.type.python_type
+    if python_type is datetime or python_type is date:
+        return python_type.fromisoformat(value)
+    if python_type is int and not isinstance(value, int):
+        raise ValueError(value)
+    return python_type(value)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence) -> tuple[Any, ...]:
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(raw, list) or len(raw) != len(keys):
+            raise ValueError(cursor)
+        return tuple(_decode_value(key, value) for key, value in zip(keys, raw))
+    except (ValueError, TypeError, binascii.Error):
+        raise_http_400(INVALID_CURSOR_DETAIL)
+
+
+async def paginate(
+    db: AsyncSession,
+    stmt: Select,
+    keys: Sequence,
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    descending: bool = True,
+) -> Page:
+    if cursor:
+        values = decode_cursor(cursor, keys)
+        row = tuple_(*keys)
+        bound = tuple_(*(literal(value, key.type) for key, value in zip(keys, values)))
+        stmt = stmt.where(row < bound if descending else row > bound)
+    stmt = (
+        stmt.add_columns(*keys)
+        .order_by(*(key.desc() if descending else key.asc() for key in keys))
+        .limit(limit + 1)
+    )
+    result = await db.execute(stmt)
+    rows = result.all()
+    next_cursor = encode_cursor(rows[limit - 1][1:]) if len(rows) > limit else None
+    return Page([row[0] for row in rows[:limit]], next_cursor)
@@ -1,15 +1,29 @@
 from __future__ import annotations
 
-from datetime import date
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 
-from sqlalchemy import and_, or_, select
+from sqlalchemy import delete, exists, insert, or_, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from ..models import MealIssue, MealIssueStatus, Menu, Payment, PaymentStatus, PaymentType
+from ..models import (
+    MealCoverage,
+    MealIssue,
+    MealIssueStatus,
+    Menu,
+    Payment,
+    PaymentStatus,
+    PaymentType,
+)
 from ..models.utils import utcnow
+from .eligibility_service import invalidate_local_eligibility, notify_eligibility_changed
 from .errors import raise_http_400, raise_http_404
+from .pagination import DEFAULT_PAGE_SIZE, Page, paginate
+from .menu_cache import invalidate_local_menus
+from .portion_service import count_tracked_items, portion_transaction, return_portions
+from .report_rollup_service import mark_attendance_dirty, mark_payments_dirty
 
 SUBSCRIPTION_DAILY_RATE = Decimal("250.00")
 
@@ -42,15 +56,6 @@ async def _get_meal_issue(user_id: int, menu_id: int, db: AsyncSession) -> MealI
     return result.scalar_one_or_none()
 
 
-def _consume_menu_items(menu: Menu) -> None:
-    for item in menu.menu_items:
-        if item.remaining_qty is None:
-            continue
-        if item.remaining_qty <= 0:
-                raise_http_400("Недостаточно блюд в меню для выдачи")
-        item.remaining_qty -= 1
-
-
 async def _has_paid_one_time(user_id: int, menu_id: int, db: AsyncSession) -> bool:
     result = await db.execute(
         select(Payment.id).where(
@@ -67,53 +72,49 @@ async def _has_active_subscription_on_date(
     user_id: int, target_date: date, db: AsyncSession
 ) -> bool:
     result = await db.execute(
-        select(Payment.id).where(
-            Payment.user_id == user_id,
-            Payment.payment_type == PaymentType.SUBSCRIPTION,
-            Payment.status == PaymentStatus.PAID,
-            Payment.period_start <= target_date,
-            Payment.period_end >= target_date,
+        select(
+            exists().where(
+                MealCoverage.user_id == user_id,
+                MealCoverage.menu_date == target_date,
+            )
         )
     )
-    return result.scalar_one_or_none() is not None
+    return result.scalar_one()
 
 
 async def _has_overlapping_subscription(
     user_id: int, period_start: date, period_end: date, db: AsyncSession
 ) -> bool:
     result = await db.execute(
-        select(Payment.id).where(
-            Payment.user_id == user_id,
-            Payment.payment_type == PaymentType.SUBSCRIPTION,
-            Payment.status == PaymentStatus.PAID,
-            Payment.period_start <= period_end,
-            Payment.period_end >= period_start,
+        select(
+            exists().where(
+                MealCoverage.user_id == user_id,
+                MealCoverage.menu_date >= period_start,
+                MealCoverage.menu_date <= period_end,
+            )
         )
     )
-    return result.scalar_one_or_none() is not None
+    return result.scalar_one()
 
 
-async def is_meal_paid(user_id: int, menu: Menu, db: AsyncSession) -> bool:
-    result = await db.execute(
-        select(Payment.id)
-        .where(
+def meal_paid_clause(user_id, menu_id, menu_date):
+    return or_(
+        exists().where(
+            MealCoverage.user_id == user_id,
+            MealCoverage.menu_date == menu_date,
+        ),
+        exists().where(
             Payment.user_id == user_id,
+            Payment.menu_id == menu_id,
+            Payment.payment_type == PaymentType.ONE_TIME,
             Payment.status == PaymentStatus.PAID,
-            or_(
-                and_(
-                    Payment.payment_type == PaymentType.ONE_TIME,
-                    Payment.menu_id == menu.id,
-                ),
-                and_(
-                    Payment.payment_type == PaymentType.SUBSCRIPTION,
-                    Payment.period_start <= menu.menu_date,
-                    Payment.period_end >= menu.menu_date,
-                ),
-            ),
-        )
-        .limit(1)
+        ),
     )
-    return result.scalar_one_or_none() is not None
+
+
+async def is_meal_paid(user_id: int, menu: Menu, db: AsyncSession) -> bool:
+    result = await db.execute(select(meal_paid_clause(user_id, menu.id, menu.menu_date)))
+    return result.scalar_one()
 
 
 async def create_one_time_payment(
@@ -134,8 +135,8 @@ async def create_one_time_payment(
         issue = await _get_meal_issue(user_id, menu.id, db)
         if issue:
             raise_http_400("Выдача уже создана")
-        _consume_menu_items(menu)
 
+    now = utcnow()
     payment = Payment(
         user_id=user_id,
         menu_id=menu.id,
@@ -143,17 +144,23 @@ async def create_one_time_payment(
         currency="RUB",
         payment_type=PaymentType.ONE_TIME,
         status=PaymentStatus.PAID,
-        paid_at=utcnow(),
+        paid_at=now,
+        created_at=now,
     )
-    db.add(payment)
-    if auto_issue:
-        meal_issue = MealIssue(
-            user_id=user_id,
-            menu_id=menu.id,
-            status=MealIssueStatus.ISSUED,
-        )
-        db.add(meal_issue)
-    await db.commit()
+    tracked_items = count_tracked_items(menu) if auto_issue else 0
+    async with portion_transaction(db, menu.id, menu.menu_date, tracked_items):
+        db.add(payment)
+        if auto_issue:
+            meal_issue = MealIssue(
+                user_id=user_id,
+                menu_id=menu.id,
+                status=MealIssueStatus.ISSUED,
+            )
+            db.add(meal_issue)
+            await mark_attendance_dirty(db, menu.menu_date)
+        await mark_payments_dirty(db, now)
+        await notify_eligibility_changed(db, menu.id)
+    invalidate_local_eligibility(menu.id)
     await db.refresh(payment)
     return payment
 
@@ -169,29 +176,124 @@ async def create_subscription_payment(
     days = (period_end - period_start).days + 1
     amount = (SUBSCRIPTION_DAILY_RATE * days).quantize(Decimal("0.01"))
 
+    now = utcnow()
     payment = Payment(
         user_id=user_id,
         amount=amount,
         currency="RUB",
         payment_type=PaymentType.SUBSCRIPTION,
         status=PaymentStatus.PAID,
-        paid_at=utcnow(),
+        paid_at=now,
+        created_at=now,
         period_start=period_start,
         period_end=period_end,
     )
     db.add(payment)
+    await db.flush()
+    try:
+        await db.execute(
+            insert(MealCoverage),
+            [
+                {
+                    "user_id": user_id,
+                    "menu_date": period_start + timedelta(days=offset),
+                    "payment_id": payment.id,
+                }
+                for offset in range(days)
+            ],
+        )
+    except IntegrityError:
+        await db.rollback()
+        raise_http_400("Абонемент пересекается с уже существующим")
+    await mark_payments_dirty(db, now)
+    await notify_eligibility_changed(db, None)
     await db.commit()
+    invalidate_local_eligibility(None)
     await db.refresh(payment)
     return payment
 
 
-async def list_my_payments(user_id: int, db: AsyncSession) -> list[Payment]:
-    result = await db.execute(
-        select(Payment)
-        .where(Payment.user_id == user_id)
-        .order_by(Payment.created_at.desc(), Payment.id.desc())
+async def refund_payment(payment_id: int, db: AsyncSession) -> Payment:
+    result = await db.execute(select(Payment).where(Payment.id == payment_id))
+    payment = result.scalar_one_or_none()
+    if payment is None:
+        raise_http_404("Платеж не найден")
+    if payment.status != PaymentStatus.PAID:
+        raise_http_400("Вернуть можно только оплаченный платеж")
+
+    returned = False
+    if payment.payment_type == PaymentType.ONE_TIME and payment.menu_id is not None:
+        issue = await _get_meal_issue(payment.user_id, payment.menu_id, db)
+        if issue is not None:
+            if issue.status != MealIssueStatus.ISSUED:
+                raise_http_400("Питание уже выдано")
+            await db.delete(issue)
+            menu = await _get_menu_with_items(payment.menu_id, db)
+            await return_portions(menu.id, count_tracked_items(menu), db)
+            await mark_attendance_dirty(db, menu.menu_date)
+            returned = True
+        menu_id = payment.menu_id
+    else:
+        await db.execute(delete(MealCoverage).where(MealCoverage.payment_id == payment.id))
+        menu_id = None
+
+    payment.status = PaymentStatus.REFUNDED
+    await mark_payments_dirty(db, payment.created_at)
+    await notify_eligibility_changed(db, menu_id)
+    await db.commit()
+    invalidate_local_eligibility(menu_id)
+    if returned:
+        invalidate_local_menus()
+    await db.refresh(payment)
+    return payment
+
+
+async def list_my_payments(
+    user_id: int,
+    db: AsyncSession,
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> Page:
+    return await paginate(
+        db,
+        select(Payment).where(Payment.user_id == user_id),
+        (Payment.created_at, Payment.id),
+        cursor=cursor,
+        limit=limit,
+    )
+
+
+def payment_export_query(
+    user_id: int | None = None,
+    status: PaymentStatus | None = None,
+    payment_type: PaymentType | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+):
+    stmt = select(
+        Payment.id,
+        Payment.user_id,
+        Payment.menu_id,
+        Payment.payment_type,
+        Payment.status,
+        Payment.amount,
+        Payment.currency,
+        Payment.period_start,
+        Payment.period_end,
+        Payment.paid_at,
+        Payment.created_at,
     )
-    return list(result.scalars().all())
+    if user_id is not None:
+        stmt = stmt.where(Payment.user_id == user_id)
+    if status is not None:
+        stmt = stmt.where(Payment.status == status)
+    if payment_type is not None:
+        stmt = stmt.where(Payment.payment_type == payment_type)
+    if date_from is not None:
+        stmt = stmt.where(Payment.created_at >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(Payment.created_at <= date_to)
+    return stmt.order_by(Payment.created_at.desc(), Payment.id.desc())
 
 
 async def get_active_subscription(
@@ -199,13 +301,10 @@ async def get_active_subscription(
 ) -> Payment | None:
     result = await db.execute(
         select(Payment)
+        .join(MealCoverage, MealCoverage.payment_id == Payment.id)
         .where(
-            Payment.user_id == user_id,
-            Payment.payment_type == PaymentType.SUBSCRIPTION,
-            Payment.status == PaymentStatus.PAID,
-            Payment.period_start <= target_date,
-            Payment.period_end >= target_date,
+            MealCoverage.user_id == user_id,
+            MealCoverage.menu_date == target_date,
         )
-        .order_by(Payment.period_end.desc(), Payment.id.desc())
     )
-    return result.scalars().first()
+    return result.scalar_one_or_none()
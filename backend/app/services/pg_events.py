@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable
+
+import asyncpg
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_DELAY_SECONDS = 1.0
+MAX_RECONNECT_DELAY_SECONDS = 30.0
+
+
+class PgEventDispatcher:
+    def __init__(self) -> None:
+        self._handlers: dict[str, list[Callable[[str], None]]] = {}
+        self._resync_handlers: list[Callable[[], None]] = []
+        self._connection: asyncpg.Connection | None = None
+        self._dsn: str | None = None
+        self._reconnect_task: asyncio.Task | None = None
+        self._stopping = False
+
+    @property
+    def is_running(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed()
+
+    def subscribe(
+        self,
+        channel: str,
+        handler: Callable[[str], None],
+        on_resync: Callable[[], None] | None = None,
+    ) -> None:
+        self._handlers.setdefault(channel, []).append(handler)
+        if on_resync is not None:
+            self._resync_handlers.append(on_resync)
+
+    async def start(self, dsn: str) -> None:
+        self._dsn = dsn
+        self._stopping = False
+        await self._connect()
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        connection, self._connection = self._connection, None
+        if connection is not None and not connection.is_closed():
+            await connection.close()
+
+    async def _connect(self) -> None:
+        connection = await asyncpg.connect(self._dsn)
+        for channel in self._handlers:
+            await connection.add_listener(channel, self._dispatch)
+        connection.add_termination_listener(self._on_terminated)
+        self._connection = connection
+
+    def _dispatch(self, _connection, _pid: int, channel: str, payload: str) -> None:
+        for handler in self._handlers.get(channel, ()):
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception("Failed to handle pg event on channel %s", channel)
+
+    def _on_terminated(self, _connection) -> None:
+        self._connection = None
+        if not self._stopping and self._reconnect_task is None:
+            self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        delay = RECONNECT_DELAY_SECONDS
+        try:
+            while not self._stopping:
+                await asyncio.sleep(delay)
+                try:
+                    await self._connect()
+                except (OSError, asyncpg.PostgresError):
+                    logger.warning("LISTEN connection lost, retrying in %.0fs", delay)
+                    delay = min(delay * 2, MAX_RECONNECT_DELAY_SECONDS)
+                    continue
+                for handler in self._resync_handlers:
+                    handler()
+                return
+        finally:
+            self._reconnect_task = None
+
+
+async def pg_notify(db: AsyncSession, channel: str, payload: str) -> None:
+    if db.bind.dialect.name != "postgresql":
+        return
+    await db.execute(select(func.pg_notify(channel, payload)))
+
+
+pg_events = PgEventDispatcher()
@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import NamedTuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from ..config import settings
+from ..models import Menu, MenuItem
+from ..models.utils import utcnow
+from .errors import raise_http_400
+from .menu_cache import invalidate_local_menus, notify_menus_changed
+from .pg_events import pg_events, pg_notify
+
+logger = logging.getLogger(__name__)
+
+SOLD_OUT_DETAIL = "Недостаточно блюд в меню для выдачи"
+MENU_PORTIONS_CHANNEL = "canteen_menu_portions"
+MENU_PORTIONS_RECLAIM_CHANNEL = "canteen_menu_portions_reclaim"
+RECLAIM_POLL_SECONDS = 0.05
+
+
+def count_tracked_items(menu: Menu) -> int:
+    return sum(1 for item in menu.menu_items if item.remaining_qty is not None)
+
+
+def is_hot_menu(menu_date: date) -> bool:
+    return menu_date == utcnow().date()
+
+
+async def take_portions(
+    menu_id: int, tracked_items: int, db: AsyncSession, count: int = 1
+) -> None:
+    if not tracked_items or count <= 0:
+        return
+    result = await db.execute(
+        update(MenuItem)
+        .where(
+            MenuItem.menu_id == menu_id,
+            MenuItem.remaining_qty.is_not(None),
+            MenuItem.remaining_qty >= count,
+        )
+        .values(remaining_qty=MenuItem.remaining_qty - count)
+        .returning(MenuItem.id)
+        .execution_options(synchronize_session=False)
+    )
+    if len(result.all()) != tracked_items:
+        await db.rollback()
+        raise_http_400(SOLD_OUT_DETAIL)
+    await notify_menus_changed(db)
+
+
+async def return_portions(
+    menu_id: int, tracked_items: int, db: AsyncSession, count: int = 1
+) -> None:
+    if not tracked_items or count <= 0:
+        return
+    await db.execute(
+        update(MenuItem)
+        .where(MenuItem.menu_id == menu_id, MenuItem.remaining_qty.is_not(None))
+        .values(remaining_qty=MenuItem.remaining_qty + count)
+        .execution_options(synchronize_session=False)
+    )
+    await notify_menus_changed(db)
+
+
+class PortionSnapshot(NamedTuple):
+    menu_item_id: int
+    dish_id: int
+    remaining_qty: int | None
+    reserved_qty: int
+
+
+class _MenuPortions:
+    def __init__(self) -> None:
+        self.reserved = 0
+        self.items: dict[int, tuple[int, int]] = {}
+        self.item_ids: list[int] = []
+        self.reclaimed_at: float | None = None
+        self.lock = asyncio.Lock()
+
+
+class PortionCounters:
+    def __init__(
+        self, block_size: int, workers: int, reclaim_seconds: float, worker_id: str
+    ) -> None:
+        self._block_size = block_size
+        self._workers = max(workers, 1)
+        self._reclaim_seconds = reclaim_seconds
+        self.worker_id = worker_id
+        self._menus: dict[int, _MenuPortions] = {}
+        self._bind: AsyncEngine | None = None
+        self._sync_seconds = 0.0
+        self._sync_task: asyncio.Task | None = None
+
+    def reserved(self, menu_id: int) -> int:
+        portions = self._menus.get(menu_id)
+        return portions.reserved if portions else 0
+
+    def snapshot(self, menu_id: int) -> list[PortionSnapshot] | None:
+        portions = self._menus.get(menu_id)
+        if portions is None or not portions.items:
+            return None
+        return [
+            PortionSnapshot(item_id, dish_id, db_remaining, portions.reserved)
+            for item_id, (dish_id, db_remaining) in portions.items.items()
+        ]
+
+    async def take(self, menu_id: int, tracked_items: int, bind: AsyncEngine, count: int) -> None:
+        portions = self._menus.setdefault(menu_id, _MenuPortions())
+        if portions.reserved < count:
+            async with portions.lock:
+                if portions.reserved < count:
+                    await self._reserve(menu_id, portions, tracked_items, bind, count)
+        portions.reserved -= count
+
+    def give_back(self, menu_id: int, count: int) -> None:
+        portions = self._menus.get(menu_id)
+        if portions is not None:
+            portions.reserved += count
+
+    async def available(self, menu_id: int, bind: AsyncEngine, wanted: int) -> int:
+        portions = self._menus.setdefault(menu_id, _MenuPortions())
+        async with AsyncSession(bind) as db:
+            stock = await self._db_available(menu_id, db)
+            if stock + portions.reserved < wanted:
+                stock = await self._reclaim(menu_id, portions, db, wanted - portions.reserved)
+        return stock + portions.reserved
+
+    async def _reserve(
+        self,
+        menu_id: int,
+        portions: _MenuPortions,
+        tracked_items: int,
+        bind: AsyncEngine,
+        count: int,
+    ) -> None:
+        needed = count - portions.reserved
+        async with AsyncSession(bind) as db:
+            available = await self._db_available(menu_id, db)
+            if available < needed:
+                available = await self._reclaim(menu_id, portions, db, needed)
+            if available < needed:
+                raise_http_400(SOLD_OUT_DETAIL)
+            block = max(needed, min(self._block_size, available // self._workers))
+            rows = await self._take_block(menu_id, block, db)
+            if len(rows) != tracked_items and block > needed:
+                await db.rollback()
+                block = needed
+                rows = await self._take_block(menu_id, block, db)
+            if len(rows) != tracked_items:
+                await db.rollback()
+                raise_http_400(SOLD_OUT_DETAIL)
+            await notify_menus_changed(db)
+            await db.commit()
+        invalidate_local_menus()
+        portions.reserved += block
+        portions.items = {item_id: (dish_id, remaining) for item_id, dish_id, remaining in rows}
+        portions.item_ids = list(portions.items)
+
+    @staticmethod
+    async def _db_available(menu_id: int, db: AsyncSession) -> int:
+        result = await db.execute(
+            select(func.min(MenuItem.remaining_qty)).where(
+                MenuItem.menu_id == menu_id, MenuItem.remaining_qty.is_not(None)
+            )
+        )
+        return result.scalar_one() or 0
+
+    async def _reclaim(
+        self, menu_id: int, portions: _MenuPortions, db: AsyncSession, needed: int
+    ) -> int:
+        now = time.monotonic()
+        recently = portions.reclaimed_at is not None and (
+            now - portions.reclaimed_at < self._sync_seconds
+        )
+        if not pg_events.is_running or recently:
+            return await self._db_available(menu_id, db)
+        portions.reclaimed_at = now
+        await pg_notify(db, MENU_PORTIONS_RECLAIM_CHANNEL, f"{menu_id},{self.worker_id}")
+        await db.commit()
+        deadline = now + self._reclaim_seconds
+        while True:
+            available = await self._db_available(menu_id, db)
+            await db.commit()
+            if available >= needed or time.monotonic() >= deadline:
+                return available
+            await asyncio.sleep(RECLAIM_POLL_SECONDS)
+
+    @staticmethod
+    async def _take_block(menu_id: int, block: int, db: AsyncSession) -> list:
+        result = await db.execute(
+            update(MenuItem)
+            .where(
+                MenuItem.menu_id == menu_id,
+                MenuItem.remaining_qty.is_not(None),
+                MenuItem.remaining_qty >= block,
+            )
+            .values(remaining_qty=MenuItem.remaining_qty - block)
+            .returning(MenuItem.id, MenuItem.dish_id, MenuItem.remaining_qty)
+            .execution_options(synchronize_session=False)
+        )
+        return list(result.all())
+
+    async def release(self, menu_id: int, bind: AsyncEngine | None = None) -> None:
+        portions = self._menus.get(menu_id)
+        bind = bind or self._bind
+        if portions is None or bind is None:
+            return
+        async with portions.lock:
+            returned = portions.reserved
+            portions.reserved = 0
+            portions.items = {}
+            portions.reclaimed_at = None
+            if not returned or not portions.item_ids:
+                return
+            try:
+                async with AsyncSession(bind) as db:
+                    await db.execute(
+                        update(MenuItem)
+                        .where(MenuItem.id.in_(portions.item_ids))
+                        .values(remaining_qty=MenuItem.remaining_qty + returned)
+                        .execution_options(synchronize_session=False)
+                    )
+                    await notify_menus_changed(db)
+                    await db.commit()
+            except BaseException:
+                portions.reserved += returned
+                raise
+        invalidate_local_menus()
+
+    def forget(self, menu_id: int) -> None:
+        self._menus.pop(menu_id, None)
+
+    async def write_back(self, bind: AsyncEngine | None = None) -> None:
+        for menu_id in [
+            menu_id
+            for menu_id, portions in self._menus.items()
+            if portions.reserved and not portions.lock.locked()
+        ]:
+            await self.release(menu_id, bind)
+
+    async def release_all(self) -> None:
+        for menu_id in list(self._menus):
+            await self.release(menu_id)
+
+    async def start(self, bind: AsyncEngine, sync_seconds: float) -> None:
+        self._bind = bind
+        self._sync_seconds = sync_seconds
+        self._sync_task = asyncio.get_running_loop().create_task(self._sync_loop(sync_seconds))
+
+    async def stop(self) -> None:
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            self._sync_task = None
+        await self.release_all()
+
+    async def _sync_loop(self, sync_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(sync_seconds)
+            try:
+                await self.write_back()
+            except Exception:
+                logger.exception("Failed to write back reserved portions")
+
+
+portion_counters = PortionCounters(
+    block_size=settings.portion_block_size,
+    workers=settings.portion_workers,
+    reclaim_seconds=settings.portion_reclaim_seconds,
+    worker_id=uuid.uuid4().hex,
+)
+
+
+def _on_menu_portions_event(payload: str) -> None:
+    asyncio.get_running_loop().create_task(portion_counters.release(int(payload)))
+
+
+def _on_menu_portions_resync() -> None:
+    asyncio.get_running_loop().create_task(portion_counters.release_all())
+
+
+def _on_menu_portions_reclaim(payload: str) -> None:
+    menu_id, _, worker_id = payload.partition(",")
+    if worker_id != portion_counters.worker_id:
+        _on_menu_portions_event(menu_id)
+
+
+pg_events.subscribe(
+    MENU_PORTIONS_CHANNEL, _on_menu_portions_event, on_resync=_on_menu_portions_resync
+)
+pg_events.subscribe(MENU_PORTIONS_RECLAIM_CHANNEL, _on_menu_portions_reclaim)
+
+
+async def notify_menu_changed(menu_id: int, db: AsyncSession) -> None:
+    await portion_counters.release(menu_id, db.bind)
+    await pg_notify(db, MENU_PORTIONS_CHANNEL, str(menu_id))
+
+
+@asynccontextmanager
+async def portion_transaction(
+    db: AsyncSession,
+    menu_id: int,
+    menu_date: date,
+    tracked_items: int,
+    count: int = 1,
+) -> AsyncIterator[None]:
+    local = bool(tracked_items) and count > 0 and is_hot_menu(menu_date)
+    if local:
+        await db.commit()
+        await portion_counters.take(menu_id, tracked_items, db.bind, count)
+    try:
+        yield
+        taken = not local and bool(tracked_items) and count > 0
+        if taken:
+            await db.flush()
+            await take_portions(menu_id, tracked_items, db, count)
+        await db.commit()
+        if taken:
+            invalidate_local_menus()
+    except BaseException:
+        if local:
+            portion_counters.give_back(menu_id, count)
+        raise
@@ -7,6 +7,7 @@ from sqlalchemy.orm import selectinload
 from ..models import Allergy, User
 from ..schemas.allergy import AllergyPublic
 from ..schemas.preferences import PreferencesResponse, PreferencesUpdateRequest
+from .allergen_index import invalidate_local_allergens, notify_allergens_changed
 from .errors import raise_http_400
 
 
@@ -61,6 +62,8 @@ async def update_preferences(
     if "allergy_ids" in payload.model_fields_set:
         allergy_ids = payload.allergy_ids or []
         user.allergies = await _resolve_allergies(allergy_ids, db)
+        await notify_allergens_changed(db, user_id)
 
     await db.commit()
+    invalidate_local_allergens(user_id)
     return _build_preferences_response(user)
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from sqlalchemy import event, inspect
+
+from ..config import settings
+from ..models import User, UserRole
+from .pg_events import pg_events
+
+PRINCIPALS_CHANNEL = "canteen_principals"
+
+
+class Principal(NamedTuple):
+    id: int
+    role: UserRole
+    is_active: bool
+
+
+class PrincipalCache:
+    def __init__(self, ttl_seconds: float, max_size: int) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._max_size = max_size
+        self._entries: OrderedDict[int, tuple[float, Principal]] = OrderedDict()
+
+    def get(self, user_id: int) -> Principal | None:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, principal = entry
+        if expires_at <= time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return principal
+
+    def put(self, principal: Principal) -> None:
+        if self._max_size <= 0 or self._ttl_seconds <= 0:
+            return
+        self._entries[principal.id] = (time.monotonic() + self._ttl_seconds, principal)
+        self._entries.move_to_end(principal.id)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.principal_cache_ttl_seconds,
+    max_size=settings.principal_cache_size,
+)
+
+
+def _on_principals_event(payload: str) -> None:
+    principal_cache.invalidate(int(payload))
+
+
+pg_events.subscribe(PRINCIPALS_CHANNEL, _on_principals_event, on_resync=principal_cache.clear)
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_on_update(_mapper, _connection, target: User) -> None:
+    state = inspect(target)
+    if state.attrs.role.history.has_changes() or state.attrs.is_active.history.has_changes():
+        principal_cache.invalidate(target.id)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_on_delete(_mapper, _connection, target: User) -> None:
+    principal_cache.invalidate(target.id)
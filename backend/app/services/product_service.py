@@ -1,13 +1,17 @@
 from __future__ import annotations
 
 from decimal import Decimal
+from typing import NamedTuple
 
-from sqlalchemy import Numeric, case, cast, func, select
+from sqlalchemy import Numeric, case, cast, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..models import InventoryDirection, InventoryTransaction, Product
+from ..models import InventoryDirection, InventoryTransaction, Product, ProductStock
+from ..models.utils import utcnow
 from ..schemas.product import ProductCreate, ProductUpdate
+from .admin_reports_service import invalidate_local_expenses, notify_expenses_changed
 from .errors import raise_http_400, raise_http_404
+from .upsert import dialect_insert
 
 
 def _normalize_optional_text(value: str | None) -> str | None:
@@ -58,6 +62,7 @@ async def create_product(payload: ProductCreate, db: AsyncSession) -> Product:
         unit=unit,
         category=category,
         is_active=payload.is_active,
+        stock=ProductStock(quantity=Decimal("0")),
     )
     db.add(product)
     await db.commit()
@@ -66,6 +71,7 @@ async def create_product(payload: ProductCreate, db: AsyncSession) -> Product:
 
 
 async def update_product(product: Product, payload: ProductUpdate, db: AsyncSession) -> Product:
+    renamed = False
     if "name" in payload.model_fields_set:
         name = _normalize_required_text(payload.name or "", "Название продукта")
         if name != product.name:
@@ -73,6 +79,7 @@ async def update_product(product: Product, payload: ProductUpdate, db: AsyncSess
             if result.scalar_one_or_none():
                 raise_http_400("Продукт уже существует")
             product.name = name
+            renamed = True
 
     if "unit" in payload.model_fields_set:
         product.unit = _normalize_required_text(payload.unit or "", "Единица измерения")
@@ -83,7 +90,11 @@ async def update_product(product: Product, payload: ProductUpdate, db: AsyncSess
     if "is_active" in payload.model_fields_set:
         product.is_active = bool(payload.is_active)
 
+    if renamed:
+        await notify_expenses_changed(db)
     await db.commit()
+    if renamed:
+        invalidate_local_expenses()
     await db.refresh(product)
     return product
 
@@ -112,13 +123,10 @@ def _stock_subquery():
 async def list_products_with_stock(
     db: AsyncSession, is_active: bool | None = None, category: str | None = None
 ) -> list[tuple[Product, Decimal]]:
-    stock_subquery = _stock_subquery()
-    stock_col = func.coalesce(stock_subquery.c.stock, cast(0, Numeric(12, 3))).label(
-        "stock"
-    )
+    stock_col = func.coalesce(ProductStock.quantity, cast(0, Numeric(12, 3))).label("stock")
     stmt = (
         select(Product, stock_col)
-        .outerjoin(stock_subquery, stock_subquery.c.product_id == Product.id)
+        .outerjoin(ProductStock, ProductStock.product_id == Product.id)
         .order_by(Product.name)
     )
     if is_active is not None:
@@ -130,14 +138,83 @@ async def list_products_with_stock(
 
 
 async def get_product_stock(product_id: int, db: AsyncSession) -> Decimal:
-    signed_quantity = case(
-        (InventoryTransaction.direction == InventoryDirection.IN, InventoryTransaction.quantity),
-        else_=-InventoryTransaction.quantity,
+    result = await db.execute(
+        select(ProductStock.quantity).where(ProductStock.product_id == product_id)
     )
-    total_stock = func.coalesce(func.sum(signed_quantity), 0)
-    stmt = select(cast(total_stock, Numeric(12, 3))).where(
-        InventoryTransaction.product_id == product_id
-    )
-    result = await db.execute(stmt)
     stock = result.scalar_one_or_none()
     return stock if stock is not None else Decimal("0")
+
+
+async def _write_product_stock(
+    product_id: int, quantity, initial: Decimal, db: AsyncSession
+) -> None:
+    result = await db.execute(
+        update(ProductStock)
+        .where(ProductStock.product_id == product_id)
+        .values(quantity=quantity, updated_at=utcnow())
+    )
+    if result.rowcount == 0:
+        db.add(ProductStock(product_id=product_id, quantity=initial))
+        await db.flush()
+
+
+async def apply_stock_delta(product_id: int, delta: Decimal, db: AsyncSession) -> None:
+    await _write_product_stock(product_id, ProductStock.quantity + delta, delta, db)
+
+
+async def apply_stock_deltas(deltas: dict[int, Decimal], db: AsyncSession) -> None:
+    if not deltas:
+        return
+    updated_at = utcnow()
+    stmt = dialect_insert(db, ProductStock).values(
+        [
+            {"product_id": product_id, "quantity": deltas[product_id], "updated_at": updated_at}
+            for product_id in sorted(deltas)
+        ]
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[ProductStock.product_id],
+            set_={
+                "quantity": ProductStock.quantity + stmt.excluded.quantity,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+    )
+
+
+async def take_stock(product_id: int, quantity: Decimal, db: AsyncSession) -> bool:
+    result = await db.execute(
+        update(ProductStock)
+        .where(ProductStock.product_id == product_id, ProductStock.quantity >= quantity)
+        .values(quantity=ProductStock.quantity - quantity, updated_at=utcnow())
+    )
+    return result.rowcount > 0
+
+
+class StockMismatch(NamedTuple):
+    product_id: int
+    recorded: Decimal
+    ledger: Decimal
+
+
+async def reconcile_product_stock(db: AsyncSession, fix: bool = False) -> list[StockMismatch]:
+    ledger_subquery = _stock_subquery()
+    recorded = func.coalesce(ProductStock.quantity, cast(0, Numeric(12, 3)))
+    ledger = func.coalesce(ledger_subquery.c.stock, cast(0, Numeric(12, 3)))
+    result = await db.execute(
+        select(Product.id, recorded, ledger)
+        .outerjoin(ProductStock, ProductStock.product_id == Product.id)
+        .outerjoin(ledger_subquery, ledger_subquery.c.product_id == Product.id)
+        .where(recorded != ledger)
+        .order_by(Product.id)
+    )
+    mismatches = [
+        StockMismatch(product_id, Decimal(recorded_value), Decimal(ledger_value))
+        for product_id, recorded_value, ledger_value in result.all()
+    ]
+    if fix and mismatches:
+        for item in mismatches:
+            await _write_product_stock(item.product_id, item.ledger, item.ledger, db)
+        await db.commit()
+    return mismatches
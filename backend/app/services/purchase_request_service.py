@@ -11,6 +11,7 @@ from ..models.utils import utcnow
 from ..schemas.purchase_request import PurchaseRequestCreate, PurchaseRequestItemCreate
 from .errors import raise_http_400, raise_http_404
 from .notification_service import create_notification_for_users, list_admin_ids
+from .pagination import DEFAULT_PAGE_SIZE, Page, paginate
 
 
 def _normalize_optional_text(value: str | None) -> str | None:
@@ -65,7 +66,9 @@ async def list_purchase_requests(
     status: PurchaseRequestStatus | None = None,
     date_from: datetime | None = None,
     date_to: datetime | None = None,
-) -> list[PurchaseRequest]:
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> Page:
     stmt = _purchase_request_query_with_items()
     if requested_by_id is not None:
         stmt = stmt.where(PurchaseRequest.requested_by_id == requested_by_id)
@@ -76,9 +79,13 @@ async def list_purchase_requests(
     if date_to is not None:
         stmt = stmt.where(PurchaseRequest.requested_at <= date_to)
 
-    stmt = stmt.order_by(PurchaseRequest.requested_at.desc(), PurchaseRequest.id.desc())
-    result = await db.execute(stmt)
-    return list(result.scalars().unique().all())
+    return await paginate(
+        db,
+        stmt,
+        (PurchaseRequest.requested_at, PurchaseRequest.id),
+        cursor=cursor,
+        limit=limit,
+    )
 
 
 async def get_purchase_request(request_id: int, db: AsyncSession) -> PurchaseRequest:
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Iterable
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import delete, func, insert, or_, select, union_all
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from ..models import (
+    AttendanceDailyRollup,
+    MealIssue,
+    MealType,
+    Menu,
+    Payment,
+    PaymentDailyRollup,
+    ReportRollupDirtyDay,
+)
+from .time_buckets import (
+    DAY,
+    as_utc,
+    day_start,
+    day_start_expression,
+    truncate_date,
+    utc_timestamp,
+)
+
+logger = logging.getLogger(__name__)
+
+ATTENDANCE_ROLLUP = "attendance"
+PAYMENTS_ROLLUP = "payments"
+COMPACT_LOCK_KEY = 0x726F6C6C
+COMPACT_BATCH_SIZE = 5000
+
+
+def payment_day_expression(dialect_name: str):
+    return truncate_date(utc_timestamp(Payment.created_at, dialect_name), DAY, dialect_name)
+
+
+async def mark_rollup_days(db: AsyncSession, kind: str, days: Iterable[date]) -> None:
+    values = [{"kind": kind, "day": day} for day in sorted(set(days))]
+    if values:
+        await db.execute(insert(ReportRollupDirtyDay).values(values))
+
+
+async def mark_attendance_dirty(db: AsyncSession, *menu_dates: date) -> None:
+    await mark_rollup_days(db, ATTENDANCE_ROLLUP, menu_dates)
+
+
+async def mark_payments_dirty(db: AsyncSession, *created_at: datetime) -> None:
+    await mark_rollup_days(db, PAYMENTS_ROLLUP, (as_utc(value).date() for value in created_at))
+
+
+def _dirty_days(kind: str):
+    return select(ReportRollupDirtyDay.day).where(ReportRollupDirtyDay.kind == kind).distinct()
+
+
+def _raw_attendance_rows(*filters):
+    return (
+        select(
+            Menu.menu_date.label("menu_date"),
+            Menu.meal_type.label("meal_type"),
+            MealIssue.status.label("status"),
+            func.count(MealIssue.id).label("issue_count"),
+        )
+        .join(Menu, MealIssue.menu_id == Menu.id)
+        .where(*filters)
+        .group_by(Menu.menu_date, Menu.meal_type, MealIssue.status)
+    )
+
+
+def _raw_payment_rows(dialect_name: str, *filters):
+    day = payment_day_expression(dialect_name)
+    return (
+        select(
+            day.label("day"),
+            Payment.status.label("status"),
+            Payment.payment_type.label("payment_type"),
+            func.count(Payment.id).label("payment_count"),
+            func.coalesce(func.sum(Payment.amount), 0).label("amount"),
+        )
+        .where(*filters)
+        .group_by(day, Payment.status, Payment.payment_type)
+    )
+
+
+def attendance_daily_rows(
+    date_from: date | None = None,
+    date_to: date | None = None,
+    meal_type: MealType | None = None,
+):
+    rollup_filters = [AttendanceDailyRollup.menu_date.not_in(_dirty_days(ATTENDANCE_ROLLUP))]
+    raw_filters = [Menu.menu_date.in_(_dirty_days(ATTENDANCE_ROLLUP))]
+    if date_from is not None:
+        rollup_filters.append(AttendanceDailyRollup.menu_date >= date_from)
+        raw_filters.append(Menu.menu_date >= date_from)
+    if date_to is not None:
+        rollup_filters.append(AttendanceDailyRollup.menu_date <= date_to)
+        raw_filters.append(Menu.menu_date <= date_to)
+    if meal_type is not None:
+        rollup_filters.append(AttendanceDailyRollup.meal_type == meal_type)
+        raw_filters.append(Menu.meal_type == meal_type)
+    rollups = select(
+        AttendanceDailyRollup.menu_date,
+        AttendanceDailyRollup.meal_type,
+        AttendanceDailyRollup.status,
+        AttendanceDailyRollup.issue_count,
+    ).where(*rollup_filters)
+    return union_all(rollups, _raw_attendance_rows(*raw_filters)).subquery()
+
+
+def payment_daily_rows(
+    dialect_name: str,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+):
+    rollup_filters = [PaymentDailyRollup.day.not_in(_dirty_days(PAYMENTS_ROLLUP))]
+    dirty_filters = [ReportRollupDirtyDay.kind == PAYMENTS_ROLLUP]
+    raw_filters = []
+    partial_days = []
+    if date_from is not None:
+        start = as_utc(date_from)
+        first_full_day = start.date() if start.time() == time.min else start.date() + timedelta(1)
+        rollup_filters.append(PaymentDailyRollup.day >= first_full_day)
+        dirty_filters.append(ReportRollupDirtyDay.day >= first_full_day)
+        raw_filters.append(Payment.created_at >= date_from)
+        partial_days.append(Payment.created_at < day_start(first_full_day))
+    if date_to is not None:
+        end_day = as_utc(date_to).date()
+        rollup_filters.append(PaymentDailyRollup.day < end_day)
+        dirty_filters.append(ReportRollupDirtyDay.day < end_day)
+        raw_filters.append(Payment.created_at <= date_to)
+        partial_days.append(Payment.created_at >= day_start(end_day))
+    dirty = (
+        select(ReportRollupDirtyDay.day).where(*dirty_filters).distinct().subquery("dirty_days")
+    )
+    rollups = select(
+        PaymentDailyRollup.day,
+        PaymentDailyRollup.status,
+        PaymentDailyRollup.payment_type,
+        PaymentDailyRollup.payment_count,
+        PaymentDailyRollup.amount,
+    ).where(*rollup_filters)
+    dirty_raw = _raw_payment_rows(
+        dialect_name,
+        Payment.created_at >= day_start_expression(dirty.c.day, dialect_name),
+        Payment.created_at < day_start_expression(dirty.c.day, dialect_name, 1),
+    )
+    if not partial_days:
+        return union_all(rollups, dirty_raw).cte("payment_days")
+    edge_raw = _raw_payment_rows(dialect_name, *raw_filters, or_(*partial_days))
+    return union_all(rollups, dirty_raw, edge_raw).cte("payment_days")
+
+
+async def _rebuild_attendance(db: AsyncSession, days: list[date] | None) -> None:
+    stmt = delete(AttendanceDailyRollup)
+    filters = []
+    if days is not None:
+        stmt = stmt.where(AttendanceDailyRollup.menu_date.in_(days))
+        filters.append(Menu.menu_date.in_(days))
+    await db.execute(stmt)
+    await db.execute(
+        insert(AttendanceDailyRollup).from_select(
+            ["menu_date", "meal_type", "status", "issue_count"],
+            _raw_attendance_rows(*filters),
+        )
+    )
+
+
+async def _rebuild_payments(db: AsyncSession, days: list[date] | None) -> None:
+    dialect_name = db.bind.dialect.name
+    stmt = delete(PaymentDailyRollup)
+    filters = []
+    if days is not None:
+        stmt = stmt.where(PaymentDailyRollup.day.in_(days))
+        filters.extend(
+            [
+                Payment.created_at >= day_start(min(days)),
+                Payment.created_at < day_start(max(days) + timedelta(1)),
+                payment_day_expression(dialect_name).in_(days),
+            ]
+        )
+    await db.execute(stmt)
+    await db.execute(
+        insert(PaymentDailyRollup).from_select(
+            ["day", "status", "payment_type", "payment_count", "amount"],
+            _raw_payment_rows(dialect_name, *filters),
+        )
+    )
+
+
+async def _lock_rollups(db: AsyncSession, wait: bool) -> bool:
+    if db.bind.dialect.name != "postgresql":
+        return True
+    if wait:
+        await db.execute(select(func.pg_advisory_xact_lock(COMPACT_LOCK_KEY)))
+        return True
+    return bool(await db.scalar(select(func.pg_try_advisory_xact_lock(COMPACT_LOCK_KEY))))
+
+
+async def compact_report_rollups(db: AsyncSession) -> int:
+    if not await _lock_rollups(db, wait=False):
+        await db.rollback()
+        return 0
+    result = await db.execute(
+        select(ReportRollupDirtyDay.id, ReportRollupDirtyDay.kind, ReportRollupDirtyDay.day)
+        .order_by(ReportRollupDirtyDay.id)
+        .limit(COMPACT_BATCH_SIZE)
+    )
+    rows = result.all()
+    if rows:
+        await db.execute(
+            delete(ReportRollupDirtyDay).where(ReportRollupDirtyDay.id.in_([row[0] for row in rows]))
+        )
+    dirty: dict[str, set[date]] = {}
+    for _, kind, day in rows:
+        dirty.setdefault(kind, set()).add(day)
+    if ATTENDANCE_ROLLUP in dirty:
+        await _rebuild_attendance(db, sorted(dirty[ATTENDANCE_ROLLUP]))
+    if PAYMENTS_ROLLUP in dirty:
+        await _rebuild_payments(db, sorted(dirty[PAYMENTS_ROLLUP]))
+    await db.commit()
+    return sum(len(days) for days in dirty.values())
+
+
+async def rebuild_report_rollups(db: AsyncSession) -> None:
+    await _lock_rollups(db, wait=True)
+    await db.execute(delete(ReportRollupDirtyDay))
+    await _rebuild_attendance(db, None)
+    await _rebuild_payments(db, None)
+    await db.commit()
+
+
+class ReportRollupCompactor:
+    def __init__(self) -> None:
+        self._task: asyncio.Task | None = None
+
+    async def start(self, bind: AsyncEngine, interval_seconds: float) -> None:
+        self._task = asyncio.get_running_loop().create_task(
+            self._compact_loop(bind, interval_seconds)
+        )
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _compact_loop(self, bind: AsyncEngine, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                async with AsyncSession(bind) as db:
+                    await compact_report_rollups(db)
+            except Exception:
+                logger.exception("Failed to compact report rollups")
+
+
+report_rollup_compactor = ReportRollupCompactor()
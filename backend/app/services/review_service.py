@@ -1,13 +1,25 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import NamedTuple
 
-from sqlalchemy import select
+from sqlalchemy import and_, case, delete, func, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..models import Dish, Menu, MenuItem, Review
+from ..models import Dish, DishRatingStats, Menu, MenuDishRatingStats, MenuItem, Review
+from ..models.utils import utcnow
 from ..schemas.review import ReviewCreate
 from .errors import raise_http_400, raise_http_404
+from .pagination import DEFAULT_PAGE_SIZE, Page, paginate
+from .upsert import dialect_insert
+
+RATING_VALUES = range(1, 6)
+RATING_STATS_FIELDS = [
+    "rating_count",
+    "rating_sum",
+    *(f"rating_{value}" for value in RATING_VALUES),
+    "last_review_at",
+]
 
 
 def _normalize_optional_text(value: str | None) -> str | None:
@@ -46,6 +58,30 @@ async def _ensure_menu_contains_dish(menu_id: int, dish_id: int, db: AsyncSessio
         raise_http_400("Блюдо не найдено в меню")
 
 
+async def _add_rating(
+    model, keys: dict[str, int], rating: int, created_at: datetime, db: AsyncSession
+) -> None:
+    bucket = f"rating_{rating}"
+    stmt = dialect_insert(db, model).values(
+        **keys,
+        rating_count=1,
+        rating_sum=rating,
+        **{f"rating_{value}": int(value == rating) for value in RATING_VALUES},
+        last_review_at=created_at,
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[getattr(model, name) for name in keys],
+            set_={
+                "rating_count": model.rating_count + 1,
+                "rating_sum": model.rating_sum + rating,
+                bucket: getattr(model, bucket) + 1,
+                "last_review_at": stmt.excluded.last_review_at,
+            },
+        )
+    )
+
+
 async def list_reviews(
     db: AsyncSession,
     dish_id: int | None = None,
@@ -53,7 +89,9 @@ async def list_reviews(
     user_id: int | None = None,
     date_from: datetime | None = None,
     date_to: datetime | None = None,
-) -> list[Review]:
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> Page:
     stmt = select(Review)
     if dish_id is not None:
         stmt = stmt.where(Review.dish_id == dish_id)
@@ -65,9 +103,7 @@ async def list_reviews(
         stmt = stmt.where(Review.created_at >= date_from)
     if date_to is not None:
         stmt = stmt.where(Review.created_at <= date_to)
-    stmt = stmt.order_by(Review.created_at.desc(), Review.id.desc())
-    result = await db.execute(stmt)
-    return list(result.scalars().all())
+    return await paginate(db, stmt, (Review.created_at, Review.id), cursor=cursor, limit=limit)
 
 
 async def create_review(
@@ -86,8 +122,76 @@ async def create_review(
         menu_id=payload.menu_id,
         rating=payload.rating,
         comment=_normalize_optional_text(payload.comment),
+        created_at=utcnow(),
     )
     db.add(review)
+    await _add_rating(
+        DishRatingStats, {"dish_id": payload.dish_id}, payload.rating, review.created_at, db
+    )
+    if payload.menu_id is not None:
+        await _add_rating(
+            MenuDishRatingStats,
+            {"menu_id": payload.menu_id, "dish_id": payload.dish_id},
+            payload.rating,
+            review.created_at,
+            db,
+        )
     await db.commit()
     await db.refresh(review)
     return review
+
+
+def _rating_stats_columns():
+    return [
+        func.count(Review.id),
+        func.sum(Review.rating),
+        *(func.sum(case((Review.rating == value, 1), else_=0)) for value in RATING_VALUES),
+        func.max(Review.created_at),
+    ]
+
+
+async def rebuild_rating_stats(db: AsyncSession) -> tuple[int, int]:
+    await db.execute(delete(MenuDishRatingStats))
+    await db.execute(delete(DishRatingStats))
+    dishes = await db.execute(
+        insert(DishRatingStats).from_select(
+            ["dish_id", *RATING_STATS_FIELDS],
+            select(Review.dish_id, *_rating_stats_columns()).group_by(Review.dish_id),
+        )
+    )
+    menu_dishes = await db.execute(
+        insert(MenuDishRatingStats).from_select(
+            ["menu_id", "dish_id", *RATING_STATS_FIELDS],
+            select(Review.menu_id, Review.dish_id, *_rating_stats_columns())
+            .where(Review.menu_id.is_not(None))
+            .group_by(Review.menu_id, Review.dish_id),
+        )
+    )
+    await db.commit()
+    return dishes.rowcount, menu_dishes.rowcount
+
+
+class MenuDishRating(NamedTuple):
+    dish_id: int
+    rating_stats: MenuDishRatingStats | None
+    dish_rating_stats: DishRatingStats | None
+
+
+async def get_menu_ratings(menu_id: int, db: AsyncSession) -> list[MenuDishRating]:
+    result = await db.execute(
+        select(MenuItem.dish_id, MenuDishRatingStats, DishRatingStats)
+        .outerjoin(
+            MenuDishRatingStats,
+            and_(
+                MenuDishRatingStats.menu_id == MenuItem.menu_id,
+                MenuDishRatingStats.dish_id == MenuItem.dish_id,
+            ),
+        )
+        .outerjoin(DishRatingStats, DishRatingStats.dish_id == MenuItem.dish_id)
+        .where(MenuItem.menu_id == menu_id)
+        .order_by(MenuItem.id)
+    )
+    rows = result.all()
+    if not rows:
+        await _get_menu(menu_id, db)
+    return [MenuDishRating(*row) for row in rows]
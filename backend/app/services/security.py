@@ -1,11 +1,21 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from typing import TypeVar
 
 from jose import jwt
 from passlib.context import CryptContext
 
 from ..config import settings
+from .errors import raise_http_503
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -18,6 +28,94 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+T = TypeVar("T")
+
+
+class PasswordHashPool:
+    def __init__(self, max_workers: int, max_pending: int) -> None:
+        self._max_workers = max_workers
+        self._max_pending = max_pending
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds_total = 0.0
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers, thread_name_prefix="password-hash"
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        with self._lock:
+            if self._pending >= self._max_pending:
+                self._rejected += 1
+                raise_http_503("Сервер перегружен, повторите попытку позже")
+            self._pending += 1
+        submitted_at = time.perf_counter()
+
+        def call() -> T:
+            with self._lock:
+                self._wait_seconds_total += time.perf_counter() - submitted_at
+                self._running += 1
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+        def release(_: Future) -> None:
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+
+        try:
+            future = self._get_executor().submit(call)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "max_workers": self._max_workers,
+            "max_pending": self._max_pending,
+            "pending": self._pending,
+            "running": self._running,
+            "queued": max(self._pending - self._running, 0),
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "avg_wait_ms": (
+                self._wait_seconds_total / self._completed * 1000 if self._completed else 0.0
+            ),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hash_pool = PasswordHashPool(
+    max_workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+)
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_hash_pool.run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
+
 def create_access_token(subject: str, role: str) -> tuple[str, int]:
     expire = datetime.now(timezone.utc) + timedelta(minutes=settings.access_token_exp_minutes)
     payload = {"sub": subject, "role": role, "exp": expire}
@@ -27,3 +125,13 @@ def create_access_token(subject: str, role: str) -> tuple[str, int]:
 
 def decode_access_token(token: str) -> dict:
     return jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
+
+
+def generate_refresh_secret() -> str:
+    return secrets.token_urlsafe(32)
+
+
+def hash_refresh_secret(secret: str) -> str:
+    return hmac.new(
+        settings.jwt_secret.encode("utf-8"), secret.encode("utf-8"), hashlib.sha256
+    ).hexdigest()
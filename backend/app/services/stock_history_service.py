@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import date
+from decimal import Decimal
+from typing import NamedTuple
+
+from sqlalchemy import Numeric, case, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models import InventoryDirection, InventoryTransaction
+from ..models.utils import utcnow
+from ..schemas.product import StockHistoryBucket
+from .time_buckets import bucket_start, day_start, truncate_date, utc_timestamp
+
+
+class StockHistory(NamedTuple):
+    timestamps: list[date]
+    balances: list[Decimal]
+
+
+class ClosedStockHistory(NamedTuple):
+    open_start: date
+    history: StockHistory
+    balance: Decimal
+
+
+class StockHistoryCache:
+    def __init__(self, max_size: int) -> None:
+        self._max_size = max_size
+        self._entries: OrderedDict[tuple[int, StockHistoryBucket], ClosedStockHistory] = (
+            OrderedDict()
+        )
+
+    def get(
+        self, product_id: int, bucket: StockHistoryBucket, open_start: date
+    ) -> ClosedStockHistory | None:
+        key = (product_id, bucket)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.open_start != open_start:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, product_id: int, bucket: StockHistoryBucket, entry: ClosedStockHistory) -> None:
+        if self._max_size <= 0:
+            return
+        key = (product_id, bucket)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+stock_history_cache = StockHistoryCache(max_size=settings.stock_history_cache_size)
+
+
+def _signed_quantity():
+    return case(
+        (InventoryTransaction.direction == InventoryDirection.IN, InventoryTransaction.quantity),
+        else_=-InventoryTransaction.quantity,
+    )
+
+
+def _bucket_expression(bucket: StockHistoryBucket, dialect_name: str):
+    created_at = utc_timestamp(InventoryTransaction.created_at, dialect_name)
+    return truncate_date(created_at, bucket.value, dialect_name)
+
+
+async def _load_closed_history(
+    product_id: int, bucket: StockHistoryBucket, open_start: date, db: AsyncSession
+) -> ClosedStockHistory:
+    bucket_col = _bucket_expression(bucket, db.bind.dialect.name)
+    per_bucket = (
+        select(bucket_col.label("bucket"), func.sum(_signed_quantity()).label("delta"))
+        .where(
+            InventoryTransaction.product_id == product_id,
+            InventoryTransaction.created_at < day_start(open_start),
+        )
+        .group_by(bucket_col)
+        .subquery()
+    )
+    running_balance = func.sum(per_bucket.c.delta).over(order_by=per_bucket.c.bucket)
+    result = await db.execute(
+        select(per_bucket.c.bucket, cast(running_balance, Numeric(12, 3))).order_by(
+            per_bucket.c.bucket
+        )
+    )
+    rows = result.all()
+    history = StockHistory(
+        timestamps=[row[0] for row in rows], balances=[row[1] for row in rows]
+    )
+    balance = history.balances[-1] if rows else Decimal("0")
+    return ClosedStockHistory(open_start, history, balance)
+
+
+async def get_stock_history(
+    product_id: int, bucket: StockHistoryBucket, db: AsyncSession
+) -> StockHistory:
+    open_start = bucket_start(utcnow().date(), bucket.value)
+    closed = stock_history_cache.get(product_id, bucket, open_start)
+    if closed is None:
+        closed = await _load_closed_history(product_id, bucket, open_start, db)
+        stock_history_cache.put(product_id, bucket, closed)
+
+    result = await db.execute(
+        select(
+            func.count(InventoryTransaction.id),
+            cast(func.sum(_signed_quantity()), Numeric(12, 3)),
+        ).where(
+            InventoryTransaction.product_id == product_id,
+            InventoryTransaction.created_at >= day_start(open_start),
+        )
+    )
+    open_count, open_delta = result.one()
+    if not open_count:
+        return closed.history
+    return StockHistory(
+        timestamps=[*closed.history.timestamps, open_start],
+        balances=[*closed.history.balances, closed.balance + open_delta],
+    )
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import Date, DateTime, cast, func, literal_column
+
+DAY = "day"
+WEEK = "week"
+MONTH = "month"
+
+
+def utc_timestamp(column, dialect_name: str):
+    if dialect_name == "postgresql":
+        return func.timezone(literal_column("'UTC'"), column)
+    return column
+
+
+def truncate_date(value, unit: str, dialect_name: str):
+    if dialect_name == "postgresql":
+        return cast(func.date_trunc(literal_column(f"'{unit}'"), value), Date)
+    if unit == WEEK:
+        return func.date(value, "-6 days", "weekday 1", type_=Date)
+    if unit == MONTH:
+        return func.date(value, "start of month", type_=Date)
+    return func.date(value, type_=Date)
+
+
+def day_start_expression(day, dialect_name: str, offset_days: int = 0):
+    if dialect_name == "postgresql":
+        return func.timezone(
+            literal_column("'UTC'"), cast(day, DateTime) + timedelta(days=offset_days)
+        )
+    return func.datetime(day, f"+{offset_days} days")
+
+
+def bucket_start(day: date, unit: str) -> date:
+    if unit == WEEK:
+        return day - timedelta(days=day.weekday())
+    if unit == MONTH:
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket_start(day: date, unit: str) -> date:
+    start = bucket_start(day, unit)
+    if unit == WEEK:
+        return start + timedelta(days=7)
+    if unit == MONTH:
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
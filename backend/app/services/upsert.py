@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def dialect_insert(db: AsyncSession, model):
+    if db.bind.dialect.name == "postgresql":
+        return pg_insert(model)
+    return sqlite_insert(model)
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db import Base
+from app.db.deps import get_db
+from app.main import app
+from app.models import User, UserRole
+from app.services.security import create_access_token, hash_password, password_hash_pool
+
+PASSWORD = "BenchPass123!"
+
+
+def percentile(samples: list[float], value: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(value / 100 * (len(ordered) - 1))))
+    return ordered[index] * 1000
+
+
+async def main(logins: int, inline: bool) -> None:
+    if inline:
+        async def run_inline(func, *args):
+            return func(*args)
+
+        password_hash_pool.run = run_inline
+
+    db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", pool_size=20)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+
+    password_hash = hash_password(PASSWORD)
+    async with session_factory() as db:
+        users = [
+            User(
+                email=f"bench-{index}@example.com",
+                full_name="Bench",
+                password_hash=password_hash,
+                role=UserRole.STUDENT,
+            )
+            for index in range(logins + 1)
+        ]
+        db.add_all(users)
+        await db.commit()
+        reader = users[-1]
+    token, _ = create_access_token(str(reader.id), UserRole.STUDENT.value)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    login_latencies: list[float] = []
+    read_latencies: list[float] = []
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get("/notifications", headers=headers)
+
+        async def login(index: int) -> None:
+            started = time.perf_counter()
+            response = await client.post(
+                "/auth/login",
+                data={"username": f"bench-{index}@example.com", "password": PASSWORD},
+            )
+            login_latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+
+        logins_done = asyncio.Event()
+
+        async def read() -> None:
+            while not logins_done.is_set():
+                started = time.perf_counter()
+                response = await client.get("/notifications", headers=headers)
+                read_latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+                await asyncio.sleep(0.01)
+
+        async def login_storm() -> None:
+            await asyncio.gather(*(login(index) for index in range(logins)))
+            logins_done.set()
+
+        await asyncio.gather(read(), login_storm())
+
+    app.dependency_overrides.clear()
+    password_hash_pool.shutdown()
+    await engine.dispose()
+
+    print(f"mode: {'inline bcrypt' if inline else 'thread pool'}")
+    print(
+        f"login: n={len(login_latencies)} p50={percentile(login_latencies, 50):.0f} ms "
+        f"p99={percentile(login_latencies, 99):.0f} ms"
+    )
+    print(
+        f"other requests: n={len(read_latencies)} "
+        f"median={statistics.median(read_latencies) * 1000:.1f} ms "
+        f"p99={percentile(read_latencies, 99):.1f} ms"
+    )
+    print(f"pool: {password_hash_pool.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Login storm vs. other request latency")
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument(
+        "--inline", action="store_true", help="hash on the event loop, as before the pool"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.inline))
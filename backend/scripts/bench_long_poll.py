@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db import Base
+from app.db.deps import get_db
+from app.main import app
+from app.models import User, UserRole
+from app.services.notification_bus import notification_bus
+from app.services.notification_service import create_notification_for_users
+from app.services.security import create_access_token
+
+
+async def main(clients: int, idle_seconds: float) -> None:
+    db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", pool_size=clients + 5)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+
+    async with session_factory() as db:
+        users = [
+            User(
+                email=f"bench-{index}@example.com",
+                full_name="Bench",
+                password_hash="-",
+                role=UserRole.STUDENT,
+            )
+            for index in range(clients)
+        ]
+        db.add_all(users)
+        await db.commit()
+        user_ids = [user.id for user in users]
+
+    statements = 0
+
+    def count_statement(*_args) -> None:
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count_statement)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        polls = [
+            asyncio.create_task(
+                client.get(
+                    "/notifications/long-poll?timeout=60",
+                    headers={
+                        "Authorization": "Bearer "
+                        + create_access_token(str(user_id), UserRole.STUDENT.value)[0]
+                    },
+                )
+            )
+            for user_id in user_ids
+        ]
+        while notification_bus.waiter_count() < clients:
+            await asyncio.sleep(0.01)
+
+        parked = statements
+        await asyncio.sleep(idle_seconds)
+        idle = statements - parked
+
+        started = time.perf_counter()
+        async with session_factory() as db:
+            await create_notification_for_users(
+                db, title="Bench", body=None, recipient_ids=user_ids
+            )
+        await asyncio.gather(*polls)
+        delivered = time.perf_counter() - started
+
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+    print(f"clients: {clients}")
+    print(f"idle window: {idle_seconds:.1f}s")
+    print(f"statements while idle: {idle} (1-second polling: ~{int(clients * idle_seconds)})")
+    print(f"fan-out to all clients: {delivered * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Idle DB load of notification long-poll")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--idle-seconds", type=float, default=5.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.clients, args.idle_seconds))
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db import Base
+from app.db.deps import get_db
+from app.main import app
+from app.models import Allergy, Dish, MealType, Menu, MenuItem, User, UserRole
+from app.services.menu_cache import menu_response_cache
+from app.services.security import create_access_token
+
+MENU_START = date(2099, 9, 1)
+
+
+async def _measure(client: AsyncClient, url: str, headers: dict[str, str], requests: int) -> float:
+    started = time.perf_counter()
+    for _ in range(requests):
+        response = await client.get(url, headers=headers)
+        if response.status_code not in (200, 304):
+            response.raise_for_status()
+    return requests / (time.perf_counter() - started)
+
+
+async def main(days: int, dishes_per_menu: int, requests: int) -> None:
+    db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+
+    async with session_factory() as db:
+        allergies = [Allergy(name=f"Bench allergy {index}") for index in range(5)]
+        dishes = [
+            Dish(
+                name=f"Bench dish {index}",
+                description="Описание блюда для замера",
+                allergies=allergies[index % 3 : index % 3 + 2],
+            )
+            for index in range(dishes_per_menu * 2)
+        ]
+        reader = User(
+            email="bench-reader@example.com",
+            full_name="Bench",
+            password_hash="-",
+            role=UserRole.STUDENT,
+        )
+        db.add_all([reader, *allergies, *dishes])
+        await db.flush()
+        for offset in range(days):
+            for meal_type in MealType:
+                menu = Menu(
+                    menu_date=MENU_START + timedelta(days=offset),
+                    meal_type=meal_type,
+                    title=f"Bench {offset}",
+                )
+                menu.menu_items = [
+                    MenuItem(dish_id=dish.id, planned_qty=100, remaining_qty=100)
+                    for dish in dishes[(offset % 2) * dishes_per_menu :][:dishes_per_menu]
+                ]
+                db.add(menu)
+        await db.commit()
+        reader_id = reader.id
+    token, _ = create_access_token(str(reader_id), UserRole.STUDENT.value)
+    headers = {"Authorization": f"Bearer {token}"}
+    date_to = MENU_START + timedelta(days=days - 1)
+    url = f"/menus/?date_from={MENU_START.isoformat()}&date_to={date_to.isoformat()}"
+
+    max_bytes = menu_response_cache.max_bytes
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        warmup = await client.get(url, headers=headers)
+        warmup.raise_for_status()
+        body_size = len(warmup.content)
+
+        menu_response_cache.max_bytes = 0
+        menu_response_cache.bump()
+        uncached = await _measure(client, url, headers, requests)
+
+        menu_response_cache.max_bytes = max_bytes
+        etag = (await client.get(url, headers=headers)).headers["etag"]
+        cached = await _measure(client, url, headers, requests)
+        revalidated = await _measure(
+            client, url, {**headers, "If-None-Match": etag}, requests
+        )
+
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+    print(f"menus: {days * len(MealType)} x {dishes_per_menu} dishes, body {body_size} bytes")
+    print(f"no cache:        {uncached:8.0f} req/s")
+    print(f"bytes cache 200: {cached:8.0f} req/s ({cached / uncached:.1f}x)")
+    print(f"bytes cache 304: {revalidated:8.0f} req/s ({revalidated / uncached:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="GET /menus/ throughput with and without cache")
+    parser.add_argument("--days", type=int, default=10)
+    parser.add_argument("--dishes", type=int, default=6)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.days, args.dishes, args.requests))
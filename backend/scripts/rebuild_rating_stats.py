@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.db import SessionLocal
+from app.services.review_service import rebuild_rating_stats
+
+
+async def main() -> int:
+    async with SessionLocal() as db:
+        dishes, menu_dishes = await rebuild_rating_stats(db)
+    print(f"Пересчитано оценок: блюд {dishes}, позиций меню {menu_dishes}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main()))
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.db import SessionLocal
+from app.services.report_rollup_service import rebuild_report_rollups
+
+
+async def main() -> int:
+    async with SessionLocal() as db:
+        await rebuild_report_rollups(db)
+    print("Сводки для отчетов пересчитаны")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main()))
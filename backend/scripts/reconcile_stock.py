@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+
+from app.db import SessionLocal
+from app.services.product_service import reconcile_product_stock
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fix", action="store_true")
+    args = parser.parse_args()
+
+    async with SessionLocal() as db:
+        mismatches = await reconcile_product_stock(db, fix=args.fix)
+
+    for item in mismatches:
+        print(
+            f"product_id={item.product_id} product_stock={item.recorded} ledger={item.ledger}"
+        )
+    if not mismatches:
+        print("Остатки совпадают с журналом движений")
+        return 0
+    if args.fix:
+        print(f"Исправлено остатков: {len(mismatches)}")
+        return 0
+    print(f"Расхождений: {len(mismatches)} (запустите с --fix, чтобы пересчитать)")
+    return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main()))
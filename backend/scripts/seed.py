@@ -35,6 +35,7 @@ from app.models.associations import user_allergies
 from app.models.utils import utcnow
 from app.services.meal_issue_service import confirm_meal, serve_meal
 from app.services.payment_service import create_one_time_payment, create_subscription_payment
+from app.services.product_service import apply_stock_delta
 from app.services.security import hash_password
 
 
@@ -158,6 +159,7 @@ async def ensure_inventory_stock(
         created_by_id=created_by_id,
     )
     db.add(tx)
+    await apply_stock_delta(product.id, quantity, db)
     await db.commit()
 
 
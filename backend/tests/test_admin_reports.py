@@ -1,10 +1,13 @@
 import uuid
-from datetime import date
+from datetime import date, datetime, timezone
 from decimal import Decimal
 
 import pytest
+from sqlalchemy import event
 
-from app.models import User, UserRole
+from app.models import PurchaseRequest, User, UserRole
+from app.models.utils import utcnow
+from app.services.admin_reports_service import closed_expense_cache
 from app.services.security import create_access_token, hash_password
 
 
@@ -160,6 +163,76 @@ async def test_admin_expense_report(client, db_session):
     assert item["product_id"] == product["id"]
 
 
+async def _approve_purchase(client, cook_token, admin_token, product_id, quantity, price) -> int:
+    create_response = await client.post(
+        "/purchase-requests/",
+        headers=_auth_headers(cook_token),
+        json={"items": [{"product_id": product_id, "quantity": quantity, "unit_price": price}]},
+    )
+    assert create_response.status_code == 201
+    request_id = create_response.json()["id"]
+    decision_response = await client.post(
+        f"/purchase-requests/{request_id}/decision",
+        headers=_auth_headers(admin_token),
+        json={"status": "approved"},
+    )
+    assert decision_response.status_code == 200
+    return request_id
+
+
+@pytest.mark.anyio
+async def test_expense_report_by_month_reuses_closed_months(client, db_session, test_engine):
+    _, admin_token = await _create_user(db_session, UserRole.ADMIN)
+    _, cook_token = await _create_user(db_session, UserRole.COOK)
+    product = await _create_product(client, cook_token)
+
+    decided = [
+        datetime(2025, 3, 9, 12, tzinfo=timezone.utc),
+        datetime(2025, 3, 20, 12, tzinfo=timezone.utc),
+        datetime(2025, 4, 2, 8, tzinfo=timezone.utc),
+        None,
+    ]
+    for decided_at in decided:
+        request_id = await _approve_purchase(
+            client, cook_token, admin_token, product["id"], "1.000", "10.00"
+        )
+        if decided_at is not None:
+            purchase_request = await db_session.get(PurchaseRequest, request_id)
+            purchase_request.decided_at = decided_at
+    await db_session.commit()
+    closed_expense_cache.clear()
+
+    url = (
+        f"/admin/reports/expenses?product_id={product['id']}&date_from=2025-03-10"
+        f"&date_to={utcnow().date().isoformat()}&group_by=month"
+    )
+    statements: list[str] = []
+
+    def _count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", _count_statement)
+    try:
+        first = (await client.get(url, headers=_auth_headers(admin_token))).json()
+        first_statements = len(statements)
+        second = (await client.get(url, headers=_auth_headers(admin_token))).json()
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", _count_statement)
+
+    assert first == second
+    assert first_statements == 2
+    assert len(statements) - first_statements == 1
+    assert Decimal(first["total_quantity"]) == Decimal("3.000")
+    assert Decimal(first["total_amount"]) == Decimal("30.00")
+    assert [Decimal(item["total_amount"]) for item in first["items"]] == [Decimal("30.00")]
+    current_month = utcnow().date().replace(day=1).isoformat()
+    assert [(item["month"], Decimal(item["total_amount"])) for item in first["months"]] == [
+        ("2025-03-01", Decimal("10.00")),
+        ("2025-04-01", Decimal("10.00")),
+        (current_month, Decimal("10.00")),
+    ]
+
+
 @pytest.mark.anyio
 async def test_admin_reports_access_denied_for_student(client, db_session):
     _, student_token = await _create_user(db_session, UserRole.STUDENT)
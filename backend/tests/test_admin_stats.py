@@ -1,11 +1,15 @@
 import uuid
-from datetime import date, timedelta
+from datetime import date, datetime, time, timedelta, timezone
 from decimal import Decimal
 
 import pytest
+from sqlalchemy import event, select
 
-from app.models import User, UserRole
+from app.models import AttendanceDailyRollup, ReportRollupDirtyDay, User, UserRole
 from app.models.utils import utcnow
+from app.schemas.admin_stats import StatsGroupBy
+from app.services.admin_stats_service import get_payment_stats
+from app.services.report_rollup_service import compact_report_rollups, mark_attendance_dirty
 from app.services.security import create_access_token, hash_password
 
 
@@ -150,6 +154,120 @@ async def test_admin_attendance_stats(client, db_session):
     assert by_status["confirmed"]["count"] == 1
 
 
+@pytest.mark.anyio
+async def test_admin_stats_read_compacted_rollups(client, db_session):
+    _, admin_token = await _create_user(db_session, UserRole.ADMIN)
+    _, cook_token = await _create_user(db_session, UserRole.COOK)
+    student, student_token = await _create_user(db_session, UserRole.STUDENT)
+
+    dish_id = await _create_dish(client, cook_token)
+    target_date = date(2025, 6, 9)
+    menu_id = await _create_menu(client, cook_token, dish_id, target_date)
+
+    pay_response = await client.post(
+        "/payments/one-time",
+        headers=_auth_headers(student_token),
+        json={"menu_id": menu_id},
+    )
+    assert pay_response.status_code == 201
+    serve_response = await client.post(
+        "/meal-issues/serve",
+        headers=_auth_headers(cook_token),
+        json={"user_id": student.id, "menu_id": menu_id},
+    )
+    assert serve_response.status_code == 201
+
+    today = utcnow().date().isoformat()
+    payments_url = f"/admin/stats/payments?date_from={today}T00:00:00Z"
+    attendance_url = (
+        f"/admin/stats/attendance?date_from={target_date.isoformat()}"
+        f"&date_to={target_date.isoformat()}"
+    )
+    payments_before = (await client.get(payments_url, headers=_auth_headers(admin_token))).json()
+    assert payments_before["total_count"] >= 1
+
+    assert await compact_report_rollups(db_session) > 0
+    result = await db_session.execute(
+        select(AttendanceDailyRollup.status, AttendanceDailyRollup.issue_count).where(
+            AttendanceDailyRollup.menu_date == target_date
+        )
+    )
+    assert [(row[0].value, row[1]) for row in result.all()] == [("served", 1)]
+
+    payments_after = (await client.get(payments_url, headers=_auth_headers(admin_token))).json()
+    assert payments_after == payments_before
+
+    confirm_response = await client.post(
+        "/meal-issues/me",
+        headers=_auth_headers(student_token),
+        json={"menu_id": menu_id},
+    )
+    assert confirm_response.status_code == 200
+    await mark_attendance_dirty(db_session, target_date)
+    await db_session.commit()
+    result = await db_session.execute(
+        select(ReportRollupDirtyDay.id).where(
+            ReportRollupDirtyDay.kind == "attendance", ReportRollupDirtyDay.day == target_date
+        )
+    )
+    dirty_ids = result.scalars().all()
+    assert len(dirty_ids) == 2
+
+    stats_response = await client.get(attendance_url, headers=_auth_headers(admin_token))
+    by_status = {item["status"]: item["count"] for item in stats_response.json()["by_status"]}
+    assert by_status == {"confirmed": 1}
+
+    await compact_report_rollups(db_session)
+    stats_response = await client.get(attendance_url, headers=_auth_headers(admin_token))
+    assert stats_response.json()["total_count"] == 1
+    assert stats_response.json()["by_status"][0]["status"] == "confirmed"
+
+
+@pytest.mark.anyio
+async def test_payment_stats_single_query_with_series(client, db_session, test_engine):
+    _, admin_token = await _create_user(db_session, UserRole.ADMIN)
+    _, student_token = await _create_user(db_session, UserRole.STUDENT)
+
+    subscription_response = await client.post(
+        "/payments/subscription",
+        headers=_auth_headers(student_token),
+        json={"period_start": "2025-06-16", "period_end": "2025-06-17"},
+    )
+    assert subscription_response.status_code == 201
+
+    month_start = utcnow().date().replace(day=1)
+    statements: list[str] = []
+
+    def _count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", _count_statement)
+    try:
+        stats = await get_payment_stats(
+            db_session,
+            date_from=datetime.combine(month_start, time.min, tzinfo=timezone.utc),
+            group_by=StatsGroupBy.MONTH,
+        )
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", _count_statement)
+
+    assert len(statements) == 1
+    assert stats.total_count >= 1
+    assert [row[0] for row in stats.series] == [month_start]
+    assert stats.series[0][1:] == (stats.total_count, stats.total_amount)
+    assert sum(row[1] for row in stats.by_status) == stats.total_count
+    assert sum(row[2] for row in stats.by_type) == stats.total_amount
+
+    response = await client.get(
+        f"/admin/stats/payments?date_from={month_start.isoformat()}T00:00:00Z&group_by=day",
+        headers=_auth_headers(admin_token),
+    )
+    assert response.status_code == 200
+    payload = response.json()
+    assert sum(item["count"] for item in payload["series"]) == payload["total_count"]
+    assert payload["series"][-1]["period_start"] == utcnow().date().isoformat()
+
+
 @pytest.mark.anyio
 async def test_admin_stats_access_denied_for_student(client, db_session):
     _, student_token = await _create_user(db_session, UserRole.STUDENT)
@@ -124,3 +124,96 @@ async def test_cook_forbidden_from_preferences(client, db_session):
 
     response = await client.get("/preferences/me", headers=_auth_headers(token))
     assert response.status_code == 403
+
+
+@pytest.mark.anyio
+async def test_personal_menu_flags_allergens_and_serve_warns(client, db_session):
+    _, cook_token = await _create_user(db_session, UserRole.COOK)
+    student, student_token = await _create_user(db_session, UserRole.STUDENT)
+
+    allergy_names = [f"Allergy {uuid.uuid4()}", f"Allergy {uuid.uuid4()}"]
+    allergy_ids = []
+    for name in allergy_names:
+        response = await client.post(
+            "/allergies/", headers=_auth_headers(cook_token), json={"name": name}
+        )
+        allergy_ids.append(response.json()["id"])
+    dish_ids = []
+    for dish_allergy_ids in ([allergy_ids[0]], [allergy_ids[1]]):
+        response = await client.post(
+            "/dishes/",
+            headers=_auth_headers(cook_token),
+            json={"name": f"Dish {uuid.uuid4()}", "allergy_ids": dish_allergy_ids},
+        )
+        dish_ids.append(response.json()["id"])
+    menu_response = await client.post(
+        "/menus/",
+        headers=_auth_headers(cook_token),
+        json={
+            "menu_date": "2025-05-12",
+            "meal_type": "lunch",
+            "items": [{"dish_id": dish_id} for dish_id in dish_ids],
+        },
+    )
+    menu_id = menu_response.json()["id"]
+
+    await client.put(
+        "/preferences/me",
+        headers=_auth_headers(student_token),
+        json={"allergy_ids": [allergy_ids[0]]},
+    )
+
+    personal_response = await client.get(
+        "/menus/me?date_from=2025-05-12&date_to=2025-05-12",
+        headers=_auth_headers(student_token),
+    )
+    assert personal_response.status_code == 200
+    items = personal_response.json()["items"][0]["menu_items"]
+    flags = {item["dish"]["id"]: item["conflicting_allergy_ids"] for item in items}
+    assert flags == {dish_ids[0]: [allergy_ids[0]], dish_ids[1]: []}
+
+    excluded_response = await client.get(
+        "/menus/me?date_from=2025-05-12&date_to=2025-05-12&exclude_conflicts=true",
+        headers=_auth_headers(student_token),
+    )
+    items = excluded_response.json()["items"][0]["menu_items"]
+    assert [item["dish"]["id"] for item in items] == [dish_ids[1]]
+
+    await client.put(
+        "/preferences/me",
+        headers=_auth_headers(student_token),
+        json={"allergy_ids": allergy_ids},
+    )
+    await client.post(
+        "/payments/subscription",
+        headers=_auth_headers(student_token),
+        json={"period_start": "2025-05-12", "period_end": "2025-05-12"},
+    )
+    serve_response = await client.post(
+        "/meal-issues/serve",
+        headers=_auth_headers(cook_token),
+        json={"user_id": student.id, "menu_id": menu_id},
+    )
+    assert serve_response.status_code == 201
+    assert serve_response.json()["allergy_warnings"] == sorted(allergy_names)
+
+    classmate, classmate_token = await _create_user(db_session, UserRole.STUDENT)
+    await client.put(
+        "/preferences/me",
+        headers=_auth_headers(classmate_token),
+        json={"allergy_ids": [allergy_ids[1]]},
+    )
+    await client.post(
+        "/payments/subscription",
+        headers=_auth_headers(classmate_token),
+        json={"period_start": "2025-05-12", "period_end": "2025-05-12"},
+    )
+    batch_response = await client.post(
+        "/meal-issues/serve/batch",
+        headers=_auth_headers(cook_token),
+        json={"menu_id": menu_id, "user_ids": [student.id, classmate.id]},
+    )
+    results = {item["user_id"]: item for item in batch_response.json()["items"]}
+    assert results[student.id]["allergy_warnings"] == []
+    assert results[classmate.id]["served"] is True
+    assert results[classmate.id]["allergy_warnings"] == [allergy_names[1]]
@@ -1,6 +1,18 @@
+import asyncio
+import threading
 import uuid
 
 import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from app.models import User, UserRole
+from app.services.security import (
+    PasswordHashPool,
+    create_access_token,
+    hash_password,
+    password_hash_pool,
+)
 
 
 @pytest.mark.anyio
@@ -39,3 +51,147 @@ async def test_register_login_me(client):
     assert me_response.status_code == 200
     me = me_response.json()
     assert me["email"] == email
+
+
+async def _create_user(db_session, role: UserRole) -> tuple[User, str]:
+    email = f"{role.value}-{uuid.uuid4()}@example.com"
+    user = User(
+        email=email,
+        full_name="Test User",
+        password_hash=hash_password("TestPass123!"),
+        role=role,
+        is_active=True,
+    )
+    db_session.add(user)
+    await db_session.commit()
+    await db_session.refresh(user)
+    token, _ = create_access_token(subject=str(user.id), role=user.role.value)
+    return user, token
+
+
+@pytest.mark.anyio
+async def test_principal_cache_skips_users_lookup_and_invalidates(client, db_session, test_engine):
+    student, student_token = await _create_user(db_session, UserRole.STUDENT)
+    headers = {"Authorization": f"Bearer {student_token}"}
+
+    response = await client.get("/notifications", headers=headers)
+    assert response.status_code == 200
+
+    statements: list[str] = []
+
+    def _count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", _count_statement)
+    try:
+        response = await client.get("/notifications", headers=headers)
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", _count_statement)
+    assert response.status_code == 200
+    assert not any("FROM users" in statement for statement in statements)
+
+    student.role = UserRole.COOK
+    await db_session.commit()
+    response = await client.get("/meal-issues/me", headers=headers)
+    assert response.status_code == 403
+
+    student.is_active = False
+    await db_session.commit()
+    response = await client.get("/notifications", headers=headers)
+    assert response.status_code == 401
+
+
+@pytest.mark.anyio
+async def test_password_hash_pool_runs_off_loop_and_rejects_overflow():
+    pool = PasswordHashPool(max_workers=1, max_pending=1)
+    release = threading.Event()
+    try:
+        blocked = asyncio.ensure_future(pool.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        assert pool.stats()["running"] == 1
+
+        with pytest.raises(HTTPException) as exc_info:
+            await pool.run(release.wait, 5)
+        assert exc_info.value.status_code == 503
+
+        release.set()
+        assert await blocked is True
+        stats = pool.stats()
+        assert stats["completed"] == 1
+        assert stats["rejected"] == 1
+        assert stats["pending"] == 0
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+@pytest.mark.anyio
+async def test_password_hash_pool_holds_slot_until_cancelled_hash_finishes():
+    pool = PasswordHashPool(max_workers=1, max_pending=1)
+    release = threading.Event()
+    try:
+        blocked = asyncio.ensure_future(pool.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        blocked.cancel()
+        await asyncio.sleep(0.05)
+        assert pool.stats()["pending"] == 1
+
+        with pytest.raises(HTTPException) as exc_info:
+            await pool.run(release.wait, 5)
+        assert exc_info.value.status_code == 503
+
+        release.set()
+        for _ in range(50):
+            if pool.stats()["pending"] == 0:
+                break
+            await asyncio.sleep(0.02)
+        assert pool.stats()["pending"] == 0
+        assert await pool.run(release.wait, 5) is True
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+@pytest.mark.anyio
+async def test_refresh_rotates_token_without_password_check(client, db_session):
+    student, _ = await _create_user(db_session, UserRole.STUDENT)
+    login_response = await client.post(
+        "/auth/login",
+        data={"username": student.email, "password": "TestPass123!"},
+    )
+    assert login_response.status_code == 200
+    refresh_token = login_response.json()["refresh_token"]
+
+    hashes_before = password_hash_pool.stats()["completed"]
+    refresh_response = await client.post("/auth/refresh", json={"refresh_token": refresh_token})
+    assert refresh_response.status_code == 200
+    refreshed = refresh_response.json()
+    assert password_hash_pool.stats()["completed"] == hashes_before
+    assert refreshed["refresh_token"] != refresh_token
+
+    me_response = await client.get(
+        "/auth/me", headers={"Authorization": f"Bearer {refreshed['access_token']}"}
+    )
+    assert me_response.status_code == 200
+    assert me_response.json()["id"] == student.id
+
+    reused = await client.post("/auth/refresh", json={"refresh_token": refresh_token})
+    assert reused.status_code == 401
+
+    logout_response = await client.post(
+        "/auth/logout", json={"refresh_token": refreshed["refresh_token"]}
+    )
+    assert logout_response.status_code == 200
+    revoked = await client.post(
+        "/auth/refresh", json={"refresh_token": refreshed["refresh_token"]}
+    )
+    assert revoked.status_code == 401
+
+    repeated_logout = await client.post(
+        "/auth/logout", json={"refresh_token": refreshed["refresh_token"]}
+    )
+    assert repeated_logout.status_code == 401
+
+    for malformed in ("١٢٣.secret", "9" * 40 + ".secret", "²." + "secret"):
+        response = await client.post("/auth/refresh", json={"refresh_token": malformed})
+        assert response.status_code == 401
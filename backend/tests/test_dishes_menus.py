@@ -2,8 +2,10 @@ import uuid
 from datetime import date
 
 import pytest
+from sqlalchemy import event
 
 from app.models import User, UserRole
+from app.services.menu_cache import MenuResponseCache
 from app.services.security import create_access_token, hash_password
 
 
@@ -142,3 +144,80 @@ async def test_menu_flow_with_dishes(client, db_session):
         },
     )
     assert forbidden_response.status_code == 403
+
+
+@pytest.mark.anyio
+async def test_menu_etag_revalidation_skips_database(client, db_session, test_engine):
+    _, cook_token = await _create_user(db_session, UserRole.COOK)
+    _, student_token = await _create_user(db_session, UserRole.STUDENT)
+
+    dish_response = await client.post(
+        "/dishes/",
+        headers=_auth_headers(cook_token),
+        json={"name": f"Dish {uuid.uuid4()}"},
+    )
+    dish_id = dish_response.json()["id"]
+    menu_response = await client.post(
+        "/menus/",
+        headers=_auth_headers(cook_token),
+        json={
+            "menu_date": date(2025, 1, 20).isoformat(),
+            "meal_type": "lunch",
+            "title": "Обед",
+            "items": [{"dish_id": dish_id, "remaining_qty": 10}],
+        },
+    )
+    menu_id = menu_response.json()["id"]
+
+    first_response = await client.get(f"/menus/{menu_id}", headers=_auth_headers(student_token))
+    assert first_response.status_code == 200
+    etag = first_response.headers["etag"]
+
+    statements: list[str] = []
+
+    def _count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", _count_statement)
+    try:
+        cached_response = await client.get(
+            f"/menus/{menu_id}",
+            headers={**_auth_headers(student_token), "If-None-Match": etag},
+        )
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", _count_statement)
+    assert cached_response.status_code == 304
+    assert cached_response.headers["etag"] == etag
+    assert statements == []
+
+    dish_update = await client.put(
+        f"/dishes/{dish_id}",
+        headers=_auth_headers(cook_token),
+        json={"description": "Новое описание"},
+    )
+    assert dish_update.status_code == 200
+
+    fresh_response = await client.get(
+        f"/menus/{menu_id}",
+        headers={**_auth_headers(student_token), "If-None-Match": etag},
+    )
+    assert fresh_response.status_code == 200
+    assert fresh_response.headers["etag"] != etag
+    assert fresh_response.json()["menu_items"][0]["dish"]["description"] == "Новое описание"
+
+
+def test_menu_cache_evicts_by_size():
+    cache = MenuResponseCache(max_bytes=10)
+    cache.put("a", cache.version, b"123456")
+    cache.put("b", cache.version, b"1234")
+    assert cache.size == 10
+    cache.get("a")
+    cache.put("c", cache.version, b"12")
+    assert cache.get("b") is None
+    assert cache.get("a").body == b"123456"
+    assert cache.size == 8
+    cache.put("d", cache.version, b"12345678901")
+    assert cache.get("d") is None
+    cache.bump()
+    assert cache.get("a") is None
+    assert cache.size == 0
@@ -0,0 +1,96 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import User, UserRole
+from app.routers.events import format_sse
+from app.services.event_stream_service import EventCursor, stream_user_events
+from app.services.notification_service import (
+    create_notification_for_users,
+    get_user_notification,
+    mark_notification_read,
+)
+from app.services.security import hash_password
+
+
+async def _create_user(db_session, role: UserRole) -> User:
+    user = User(
+        email=f"{role.value}-{uuid.uuid4()}@example.com",
+        full_name="Test User",
+        password_hash=hash_password("TestPass123!"),
+        role=role,
+        is_active=True,
+    )
+    db_session.add(user)
+    await db_session.commit()
+    await db_session.refresh(user)
+    return user
+
+
+async def _next_event(stream):
+    while True:
+        event = await asyncio.wait_for(anext(stream), timeout=5)
+        if event is not None:
+            return event
+
+
+@pytest.mark.anyio
+async def test_event_stream_multiplexes_notifications_and_unread_count(db_session, test_engine):
+    student = await _create_user(db_session, UserRole.STUDENT)
+
+    async with AsyncSession(test_engine, expire_on_commit=False) as stream_db:
+        stream = stream_user_events(stream_db, student.id, keepalive_seconds=10)
+        try:
+            first = await _next_event(stream)
+            assert first.name == "unread_count"
+            assert first.data == {"unread_count": 0, "delta": 0}
+
+            pending = asyncio.ensure_future(_next_event(stream))
+            await asyncio.sleep(0.1)
+            recipients = await create_notification_for_users(
+                db_session, title="Тест", body=None, recipient_ids=[student.id]
+            )
+            notification = await pending
+            assert notification.name == "notification"
+            assert notification.data.id == recipients[0].id
+            assert f"id: {notification.cursor.encode()}" in format_sse(notification)
+
+            unread = await _next_event(stream)
+            assert unread.data == {"unread_count": 1, "delta": 1}
+
+            pending = asyncio.ensure_future(_next_event(stream))
+            await asyncio.sleep(0.1)
+            user_notification = await get_user_notification(recipients[0].id, student.id, db_session)
+            await mark_notification_read(user_notification, db_session)
+            unread = await pending
+            assert unread.data == {"unread_count": 0, "delta": -1}
+        finally:
+            await stream.aclose()
+
+
+@pytest.mark.anyio
+async def test_event_stream_resumes_from_last_event_id(db_session, test_engine):
+    student = await _create_user(db_session, UserRole.STUDENT)
+
+    async with AsyncSession(test_engine, expire_on_commit=False) as stream_db:
+        stream = stream_user_events(stream_db, student.id, keepalive_seconds=10)
+        last_event_id = (await _next_event(stream)).cursor.encode()
+        await stream.aclose()
+
+    await create_notification_for_users(
+        db_session, title="Пропущено", body=None, recipient_ids=[student.id]
+    )
+
+    async with AsyncSession(test_engine, expire_on_commit=False) as stream_db:
+        stream = stream_user_events(
+            stream_db, student.id, EventCursor.decode(last_event_id), keepalive_seconds=10
+        )
+        try:
+            assert (await _next_event(stream)).name == "unread_count"
+            replayed = await _next_event(stream)
+            assert replayed.name == "notification"
+            assert replayed.data.notification.title == "Пропущено"
+        finally:
+            await stream.aclose()
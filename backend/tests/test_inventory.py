@@ -1,10 +1,21 @@
+import asyncio
 import uuid
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 
 import pytest
+from fastapi import HTTPException
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
-from app.models import User, UserRole
+from app.models import InventoryDirection, InventoryTransaction, ProductStock, User, UserRole
+from app.models.utils import utcnow
+from app.schemas.inventory_transaction import InventoryTransactionCreate
+from app.schemas.product import StockHistoryBucket
+from app.services.inventory_transaction_service import create_inventory_transaction
+from app.services.product_service import get_product_stock, reconcile_product_stock
 from app.services.security import create_access_token, hash_password
+from app.services.stock_history_service import stock_history_cache
 
 
 def _auth_headers(token: str) -> dict[str, str]:
@@ -99,6 +110,132 @@ async def test_product_stock_flow(client, db_session):
     assert len(tx_items) == 2
 
 
+@pytest.mark.anyio
+async def test_reconcile_product_stock_restores_ledger_balance(client, db_session):
+    _, cook_token = await _create_user(db_session, UserRole.COOK)
+    product = await _create_product(client, cook_token, name="Flour")
+
+    in_response = await client.post(
+        "/inventory-transactions/",
+        headers=_auth_headers(cook_token),
+        json={"product_id": product["id"], "quantity": "4.500", "direction": "in"},
+    )
+    assert in_response.status_code == 201
+
+    mismatches = await reconcile_product_stock(db_session)
+    assert product["id"] not in {item.product_id for item in mismatches}
+
+    await db_session.execute(
+        update(ProductStock)
+        .where(ProductStock.product_id == product["id"])
+        .values(quantity=Decimal("1.000"))
+    )
+    await db_session.commit()
+
+    mismatches = await reconcile_product_stock(db_session, fix=True)
+    mismatch = next(item for item in mismatches if item.product_id == product["id"])
+    assert mismatch.recorded == Decimal("1.000")
+    assert mismatch.ledger == Decimal("4.500")
+
+    stock_response = await client.get("/products/stock", headers=_auth_headers(cook_token))
+    stock_item = _find_stock_item(stock_response.json()["items"], product["id"])
+    assert Decimal(stock_item["stock"]) == Decimal("4.500")
+
+
+@pytest.mark.anyio
+async def test_concurrent_write_offs_never_drive_stock_negative(client, db_session, test_engine):
+    cook, cook_token = await _create_user(db_session, UserRole.COOK)
+    product = await _create_product(client, cook_token, name="Buckwheat")
+    in_response = await client.post(
+        "/inventory-transactions/",
+        headers=_auth_headers(cook_token),
+        json={"product_id": product["id"], "quantity": "20.000", "direction": "in"},
+    )
+    assert in_response.status_code == 201
+
+    session_factory = async_sessionmaker(bind=test_engine, expire_on_commit=False)
+    payload = InventoryTransactionCreate(
+        product_id=product["id"], quantity=Decimal("1.000"), direction=InventoryDirection.OUT
+    )
+
+    async def write_off() -> str | None:
+        async with session_factory() as db:
+            try:
+                await create_inventory_transaction(payload, cook.id, db)
+            except HTTPException as exc:
+                return exc.detail
+        return None
+
+    results = await asyncio.gather(*(write_off() for _ in range(50)))
+    assert results.count(None) == 20
+    assert results.count("Недостаточно остатка") == 30
+    assert await get_product_stock(product["id"], db_session) == Decimal("0")
+    mismatches = await reconcile_product_stock(db_session)
+    assert product["id"] not in {item.product_id for item in mismatches}
+
+
+@pytest.mark.anyio
+async def test_product_stock_history_buckets_running_balance(client, db_session):
+    cook, cook_token = await _create_user(db_session, UserRole.COOK)
+    product = await _create_product(client, cook_token, name="Oats")
+    ledger = [
+        (datetime(2026, 1, 5, 8, tzinfo=timezone.utc), InventoryDirection.IN, "10.000"),
+        (datetime(2026, 1, 7, 12, tzinfo=timezone.utc), InventoryDirection.OUT, "3.000"),
+        (datetime(2026, 1, 14, 9, tzinfo=timezone.utc), InventoryDirection.IN, "2.000"),
+    ]
+    db_session.add_all(
+        InventoryTransaction(
+            product_id=product["id"],
+            quantity=Decimal(quantity),
+            direction=direction,
+            created_by_id=cook.id,
+            created_at=created_at,
+        )
+        for created_at, direction, quantity in ledger
+    )
+    await db_session.commit()
+    in_response = await client.post(
+        "/inventory-transactions/",
+        headers=_auth_headers(cook_token),
+        json={"product_id": product["id"], "quantity": "1.000", "direction": "in"},
+    )
+    assert in_response.status_code == 201
+
+    today = utcnow().date()
+    day_response = await client.get(
+        f"/products/{product['id']}/stock-history", headers=_auth_headers(cook_token)
+    )
+    assert day_response.status_code == 200
+    day_history = day_response.json()
+    assert day_history["bucket"] == "day"
+    assert day_history["timestamps"] == [
+        "2026-01-05",
+        "2026-01-07",
+        "2026-01-14",
+        today.isoformat(),
+    ]
+    assert [Decimal(item) for item in day_history["balances"]] == [
+        Decimal("10"),
+        Decimal("7"),
+        Decimal("9"),
+        Decimal("10"),
+    ]
+
+    week_response = await client.get(
+        f"/products/{product['id']}/stock-history?bucket=week",
+        headers=_auth_headers(cook_token),
+    )
+    week_history = week_response.json()
+    week_start = today - timedelta(days=today.weekday())
+    assert week_history["timestamps"] == ["2026-01-05", "2026-01-12", week_start.isoformat()]
+    assert [Decimal(item) for item in week_history["balances"]] == [
+        Decimal("7"),
+        Decimal("9"),
+        Decimal("10"),
+    ]
+    assert stock_history_cache.get(product["id"], StockHistoryBucket.WEEK, week_start)
+
+
 @pytest.mark.anyio
 async def test_inventory_transaction_rejects_overdraft(client, db_session):
     _, cook_token = await _create_user(db_session, UserRole.COOK)
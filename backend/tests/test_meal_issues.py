@@ -1,9 +1,33 @@
+import asyncio
+import csv
+import io
+import json
 import uuid
 from datetime import date
+from decimal import Decimal
 
 import pytest
-
-from app.models import User, UserRole
+from fastapi import HTTPException
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.models import (
+    MealCoverage,
+    MealIssue,
+    MealIssueStatus,
+    Payment,
+    PaymentStatus,
+    PaymentType,
+    User,
+    UserRole,
+)
+from app.config import settings
+from app.models.utils import utcnow
+from app.services.allergen_index import get_allergy_warnings
+from app.services.meal_issue_service import serve_meal
+from app.services import portion_service
+from app.services.pg_events import PgEventDispatcher
+from app.services.portion_service import PortionCounters, portion_counters
 from app.services.security import create_access_token, hash_password
 
 
@@ -27,7 +51,9 @@ async def _create_user(db_session, role: UserRole) -> tuple[User, str]:
     return user, token
 
 
-async def _create_menu(client, cook_token: str, menu_date: date, remaining_qty: int) -> int:
+async def _create_menu(
+    client, cook_token: str, menu_date: date, remaining_qty: int, meal_type: str = "breakfast"
+) -> int:
     dish_response = await client.post(
         "/dishes/",
         headers=_auth_headers(cook_token),
@@ -41,7 +67,7 @@ async def _create_menu(client, cook_token: str, menu_date: date, remaining_qty:
         headers=_auth_headers(cook_token),
         json={
             "menu_date": menu_date.isoformat(),
-            "meal_type": "breakfast",
+            "meal_type": meal_type,
             "title": "Breakfast",
             "price": "120.00",
             "items": [
@@ -208,3 +234,355 @@ async def test_student_cannot_confirm_before_served(client, db_session):
     )
     assert response.status_code == 400
     assert response.json()["detail"] == "Питание ещё не выдано"
+
+
+@pytest.mark.anyio
+async def test_serve_resolves_eligibility_in_one_query(client, db_session, test_engine):
+    cook, cook_token = await _create_user(db_session, UserRole.COOK)
+    student, student_token = await _create_user(db_session, UserRole.STUDENT)
+
+    subscription_response = await client.post(
+        "/payments/subscription",
+        headers=_auth_headers(student_token),
+        json={"period_start": "2025-03-03", "period_end": "2025-03-03"},
+    )
+    assert subscription_response.status_code == 201
+    menu_id = await _create_menu(client, cook_token, date(2025, 3, 3), remaining_qty=2)
+
+    await get_allergy_warnings(student.id, menu_id, db_session)
+    statements: list[str] = []
+
+    def _count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", _count_statement)
+    try:
+        issue, warnings = await serve_meal(student.id, menu_id, cook.id, db_session)
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", _count_statement)
+
+    assert issue.status == MealIssueStatus.SERVED
+    assert warnings == []
+    assert [s for s in statements if s.lstrip().upper().startswith("SELECT")] == statements[:1]
+
+    menu_response = await client.get(f"/menus/{menu_id}", headers=_auth_headers(cook_token))
+    assert menu_response.json()["menu_items"][0]["remaining_qty"] == 1
+    notifications_response = await client.get(
+        "/notifications", headers=_auth_headers(student_token)
+    )
+    assert [item["title"] for item in notifications_response.json()["items"]] == [
+        "Питание выдано"
+    ]
+
+    repeat_response = await client.post(
+        "/meal-issues/serve",
+        headers=_auth_headers(cook_token),
+        json={"user_id": student.id, "menu_id": menu_id},
+    )
+    assert repeat_response.status_code == 400
+    assert repeat_response.json()["detail"] == "Питание уже выдано"
+
+
+@pytest.mark.anyio
+async def test_batch_serve_reports_per_student_results(client, db_session):
+    _, cook_token = await _create_user(db_session, UserRole.COOK)
+    subscriber, subscriber_token = await _create_user(db_session, UserRole.STUDENT)
+    payer, payer_token = await _create_user(db_session, UserRole.STUDENT)
+    unpaid, _ = await _create_user(db_session, UserRole.STUDENT)
+
+    menu_id = await _create_menu(client, cook_token, date(2025, 3, 4), remaining_qty=5)
+    subscription_response = await client.post(
+        "/payments/subscription",
+        headers=_auth_headers(subscriber_token),
+        json={"period_start": "2025-03-04", "period_end": "2025-03-04"},
+    )
+    assert subscription_response.status_code == 201
+    payment_response = await client.post(
+        "/payments/one-time",
+        headers=_auth_headers(payer_token),
+        json={"menu_id": menu_id},
+    )
+    assert payment_response.status_code == 201
+
+    batch_response = await client.post(
+        "/meal-issues/serve/batch",
+        headers=_auth_headers(cook_token),
+        json={
+            "menu_id": menu_id,
+            "user_ids": [subscriber.id, payer.id, unpaid.id, 999999, subscriber.id],
+        },
+    )
+    assert batch_response.status_code == 200
+    payload = batch_response.json()
+    assert payload["served_count"] == 2
+    results = {item["user_id"]: item for item in payload["items"]}
+    assert len(payload["items"]) == 4
+    assert results[subscriber.id]["served"] is True
+    assert results[subscriber.id]["issue"]["status"] == "served"
+    assert results[payer.id]["served"] is True
+    assert results[unpaid.id]["detail"] == "Питание не оплачено"
+    assert results[999999]["detail"] == "Пользователь не найден"
+
+    menu_response = await client.get(f"/menus/{menu_id}", headers=_auth_headers(cook_token))
+    assert menu_response.json()["menu_items"][0]["remaining_qty"] == 3
+
+    repeat_response = await client.post(
+        "/meal-issues/serve/batch",
+        headers=_auth_headers(cook_token),
+        json={"menu_id": menu_id, "user_ids": [subscriber.id]},
+    )
+    assert repeat_response.json()["items"][0]["detail"] == "Питание уже выдано"
+
+
+@pytest.mark.anyio
+async def test_parallel_serves_never_oversell(client, db_session, test_engine):
+    cook, cook_token = await _create_user(db_session, UserRole.COOK)
+    menu_id = await _create_menu(client, cook_token, date(2025, 3, 5), remaining_qty=150)
+
+    students = [
+        User(
+            email=f"student-{uuid.uuid4()}@example.com",
+            full_name="Test User",
+            password_hash="-",
+            role=UserRole.STUDENT,
+        )
+        for _ in range(200)
+    ]
+    db_session.add_all(students)
+    await db_session.flush()
+    db_session.add_all(
+        Payment(
+            user_id=student.id,
+            amount=Decimal("250.00"),
+            payment_type=PaymentType.SUBSCRIPTION,
+            status=PaymentStatus.PAID,
+            period_start=date(2025, 3, 5),
+            period_end=date(2025, 3, 5),
+            coverage=[MealCoverage(user_id=student.id, menu_date=date(2025, 3, 5))],
+        )
+        for student in students
+    )
+    await db_session.commit()
+
+    session_factory = async_sessionmaker(bind=test_engine, expire_on_commit=False)
+
+    async def serve(student_id: int) -> str | None:
+        async with session_factory() as db:
+            try:
+                await serve_meal(student_id, menu_id, cook.id, db)
+            except HTTPException as exc:
+                return exc.detail
+        return None
+
+    results = await asyncio.gather(*(serve(student.id) for student in students))
+
+    assert results.count(None) == 150
+    assert results.count("Недостаточно блюд в меню для выдачи") == 50
+    menu_response = await client.get(f"/menus/{menu_id}", headers=_auth_headers(cook_token))
+    assert menu_response.json()["menu_items"][0]["remaining_qty"] == 0
+    served = await db_session.scalar(
+        select(func.count(MealIssue.id)).where(MealIssue.menu_id == menu_id)
+    )
+    assert served == 150
+
+
+@pytest.mark.anyio
+async def test_todays_menu_serves_from_reserved_portion_block(client, db_session, test_engine):
+    cook, cook_token = await _create_user(db_session, UserRole.COOK)
+    today = utcnow().date()
+    menu_id = await _create_menu(client, cook_token, today, remaining_qty=50, meal_type="lunch")
+
+    students = [
+        User(
+            email=f"student-{uuid.uuid4()}@example.com",
+            full_name="Test User",
+            password_hash="-",
+            role=UserRole.STUDENT,
+        )
+        for _ in range(60)
+    ]
+    db_session.add_all(students)
+    await db_session.flush()
+    db_session.add_all(
+        Payment(
+            user_id=student.id,
+            amount=Decimal("250.00"),
+            payment_type=PaymentType.SUBSCRIPTION,
+            status=PaymentStatus.PAID,
+            period_start=today,
+            period_end=today,
+            coverage=[MealCoverage(user_id=student.id, menu_date=today)],
+        )
+        for student in students
+    )
+    await db_session.commit()
+
+    for student in students[:3]:
+        response = await client.post(
+            "/meal-issues/serve",
+            headers=_auth_headers(cook_token),
+            json={"user_id": student.id, "menu_id": menu_id},
+        )
+        assert response.status_code == 201
+
+    block = min(settings.portion_block_size, 50 // settings.portion_workers)
+    portions_response = await client.get(
+        f"/menus/{menu_id}/portions", headers=_auth_headers(cook_token)
+    )
+    portions = portions_response.json()
+    assert portions["live"] is True
+    assert portions["items"][0]["remaining_qty"] == 50 - block
+    assert portions["items"][0]["reserved_qty"] == block - 3
+    menu_response = await client.get(f"/menus/{menu_id}", headers=_auth_headers(cook_token))
+    assert menu_response.json()["menu_items"][0]["remaining_qty"] == 50 - block
+
+    await portion_counters.write_back(test_engine)
+    menu_response = await client.get(f"/menus/{menu_id}", headers=_auth_headers(cook_token))
+    assert menu_response.json()["menu_items"][0]["remaining_qty"] == 47
+
+    update_response = await client.put(
+        f"/menus/{menu_id}", headers=_auth_headers(cook_token), json={"title": "Обед"}
+    )
+    assert update_response.status_code == 200
+    assert update_response.json()["menu_items"][0]["remaining_qty"] == 47
+
+    session_factory = async_sessionmaker(bind=test_engine, expire_on_commit=False)
+
+    async def serve(student_id: int) -> str | None:
+        async with session_factory() as db:
+            try:
+                await serve_meal(student_id, menu_id, cook.id, db)
+            except HTTPException as exc:
+                return exc.detail
+        return None
+
+    results = await asyncio.gather(*(serve(student.id) for student in students[3:]))
+    assert results.count(None) == 47
+    await portion_counters.release(menu_id, test_engine)
+    menu_response = await client.get(f"/menus/{menu_id}", headers=_auth_headers(cook_token))
+    assert menu_response.json()["menu_items"][0]["remaining_qty"] == 0
+
+
+@pytest.mark.anyio
+async def test_portion_blocks_shrink_and_peers_hand_back_on_sell_out(
+    client, db_session, test_engine, monkeypatch
+):
+    _, cook_token = await _create_user(db_session, UserRole.COOK)
+    menu_id = await _create_menu(client, cook_token, date(2025, 7, 7), remaining_qty=12)
+    first = PortionCounters(block_size=20, workers=2, reclaim_seconds=0.2, worker_id="first")
+    second = PortionCounters(block_size=20, workers=2, reclaim_seconds=0.2, worker_id="second")
+    workers = {"first": first, "second": second}
+
+    async def fake_notify(_db, _channel, payload):
+        target, _, sender = payload.partition(",")
+        for worker_id, worker in workers.items():
+            if worker_id != sender:
+                asyncio.get_running_loop().create_task(worker.release(int(target), test_engine))
+
+    monkeypatch.setattr(PgEventDispatcher, "is_running", property(lambda _self: True))
+    monkeypatch.setattr(portion_service, "pg_notify", fake_notify)
+
+    await first.take(menu_id, 1, test_engine, 1)
+    assert first.reserved(menu_id) == 5
+    await second.take(menu_id, 1, test_engine, 1)
+    assert second.reserved(menu_id) == 2
+
+    served = 1
+    for _ in range(12):
+        try:
+            await second.take(menu_id, 1, test_engine, 1)
+        except HTTPException as exc:
+            assert exc.detail == "Недостаточно блюд в меню для выдачи"
+            break
+        served += 1
+    assert served == 11
+    assert first.reserved(menu_id) == 0
+    await second.release(menu_id, test_engine)
+    assert await second.available(menu_id, test_engine, 1) == 0
+
+
+@pytest.mark.anyio
+async def test_menu_eligibility_roster_follows_payments_and_serves(client, db_session):
+    _, cook_token = await _create_user(db_session, UserRole.COOK)
+    one_time, one_time_token = await _create_user(db_session, UserRole.STUDENT)
+    subscriber, subscriber_token = await _create_user(db_session, UserRole.STUDENT)
+    late, late_token = await _create_user(db_session, UserRole.STUDENT)
+    menu_id = await _create_menu(client, cook_token, date(2025, 4, 14), remaining_qty=5)
+
+    response = await client.post(
+        "/payments/one-time",
+        headers=_auth_headers(one_time_token),
+        json={"menu_id": menu_id},
+    )
+    assert response.status_code == 201
+    response = await client.post(
+        "/payments/subscription",
+        headers=_auth_headers(subscriber_token),
+        json={"period_start": "2025-04-14", "period_end": "2025-04-18"},
+    )
+    assert response.status_code == 201
+
+    async def roster() -> dict[int, tuple[str | None, str | None]]:
+        response = await client.get(
+            f"/menus/{menu_id}/eligibility", headers=_auth_headers(cook_token)
+        )
+        assert response.status_code == 200
+        return {
+            item["user_id"]: (item["payment_type"], item["issue_status"])
+            for item in response.json()["items"]
+        }
+
+    assert await roster() == {
+        one_time.id: ("one_time", "issued"),
+        subscriber.id: ("subscription", None),
+    }
+
+    response = await client.post(
+        "/meal-issues/serve",
+        headers=_auth_headers(cook_token),
+        json={"user_id": subscriber.id, "menu_id": menu_id},
+    )
+    assert response.status_code == 201
+    response = await client.post(
+        "/payments/subscription",
+        headers=_auth_headers(late_token),
+        json={"period_start": "2025-04-14", "period_end": "2025-04-14"},
+    )
+    assert response.status_code == 201
+
+    assert await roster() == {
+        one_time.id: ("one_time", "issued"),
+        subscriber.id: ("subscription", "served"),
+        late.id: ("subscription", None),
+    }
+
+
+@pytest.mark.anyio
+async def test_meal_issue_export_streams_ndjson_and_csv(client, db_session):
+    _, cook_token = await _create_user(db_session, UserRole.COOK)
+    student_tokens = [await _create_user(db_session, UserRole.STUDENT) for _ in range(3)]
+    menu_id = await _create_menu(client, cook_token, date(2025, 4, 21), remaining_qty=5)
+    for _, token in student_tokens:
+        response = await client.post(
+            "/payments/one-time", headers=_auth_headers(token), json={"menu_id": menu_id}
+        )
+        assert response.status_code == 201
+
+    response = await client.get(
+        f"/meal-issues/export?menu_id={menu_id}", headers=_auth_headers(cook_token)
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(row["user_id"] for row in rows) == sorted(user.id for user, _ in student_tokens)
+    assert {row["status"] for row in rows} == {"issued"}
+    assert {row["menu_date"] for row in rows} == {"2025-04-21"}
+
+    response = await client.get(
+        f"/meal-issues/export?menu_id={menu_id}&format=csv", headers=_auth_headers(cook_token)
+    )
+    assert response.status_code == 200
+    assert 'filename="meal-issues.csv"' in response.headers["content-disposition"]
+    lines = list(csv.reader(io.StringIO(response.text.lstrip("\ufeff"))))
+    assert lines[0][:4] == ["id", "user_id", "menu_id", "menu_date"]
+    assert len(lines) == 4
@@ -0,0 +1,94 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import event
+
+from app.models import User, UserRole
+from app.services.notification_bus import notification_bus
+from app.services.notification_service import (
+    NOTIFICATIONS_CHANNEL,
+    create_notification_for_users,
+)
+from app.services.pg_events import pg_events
+from app.services.security import create_access_token, hash_password
+
+
+def _auth_headers(token: str) -> dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def _create_user(db_session, role: UserRole) -> tuple[User, str]:
+    email = f"{role.value}-{uuid.uuid4()}@example.com"
+    user = User(
+        email=email,
+        full_name="Test User",
+        password_hash=hash_password("TestPass123!"),
+        role=role,
+        is_active=True,
+    )
+    db_session.add(user)
+    await db_session.commit()
+    await db_session.refresh(user)
+    token, _ = create_access_token(subject=str(user.id), role=user.role.value)
+    return user, token
+
+
+async def _wait_for_waiters(count: int) -> None:
+    for _ in range(100):
+        if notification_bus.waiter_count() >= count:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("Long-poll request did not subscribe")
+
+
+@pytest.mark.anyio
+async def test_long_poll_is_idle_until_notification_published(client, db_session, test_engine):
+    student, student_token = await _create_user(db_session, UserRole.STUDENT)
+
+    statements: list[str] = []
+
+    def _count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", _count_statement)
+    try:
+        poll_task = asyncio.create_task(
+            client.get(
+                "/notifications/long-poll?timeout=10",
+                headers=_auth_headers(student_token),
+            )
+        )
+        await _wait_for_waiters(1)
+        parked_statements = len(statements)
+        await asyncio.sleep(1.5)
+        assert len(statements) == parked_statements
+
+        notification_bus.publish([student.id])
+        await asyncio.sleep(0.5)
+        assert not poll_task.done()
+
+        await create_notification_for_users(
+            db_session,
+            title="Тест",
+            body="Новое уведомление",
+            recipient_ids=[student.id],
+        )
+        response = await asyncio.wait_for(poll_task, timeout=5)
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", _count_statement)
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert [item["title"] for item in payload["items"]] == ["Тест"]
+    assert payload["unread_count"] >= 1
+    assert notification_bus.waiter_count() == 0
+
+
+
+@pytest.mark.anyio
+async def test_pg_notification_event_wakes_only_listed_users():
+    with notification_bus.subscribe(101) as first, notification_bus.subscribe(202) as second:
+        pg_events._dispatch(None, 0, NOTIFICATIONS_CHANNEL, "101,303")
+        assert first.is_set()
+        assert not second.is_set()
@@ -171,3 +171,112 @@ async def test_subscription_covers_meal_issue(client, db_session):
         json={"user_id": student.id, "menu_id": menu_id},
     )
     assert serve_response.status_code == 201
+
+
+@pytest.mark.anyio
+async def test_refund_one_time_payment_returns_portion(client, db_session):
+    _, admin_token = await _create_user(db_session, UserRole.ADMIN)
+    _, cook_token = await _create_user(db_session, UserRole.COOK)
+    _, student_token = await _create_user(db_session, UserRole.STUDENT)
+    menu_id = await _create_menu(client, cook_token, date(2025, 4, 7), remaining_qty=1)
+
+    payment_response = await client.post(
+        "/payments/one-time",
+        headers=_auth_headers(student_token),
+        json={"menu_id": menu_id},
+    )
+    assert payment_response.status_code == 201
+    payment_id = payment_response.json()["id"]
+
+    refund_response = await client.post(
+        f"/payments/{payment_id}/refund", headers=_auth_headers(admin_token)
+    )
+    assert refund_response.status_code == 200
+    assert refund_response.json()["status"] == "refunded"
+
+    menu_response = await client.get(f"/menus/{menu_id}", headers=_auth_headers(cook_token))
+    assert menu_response.json()["menu_items"][0]["remaining_qty"] == 1
+
+    issues_response = await client.get("/meal-issues/me", headers=_auth_headers(student_token))
+    assert all(item["menu_id"] != menu_id for item in issues_response.json()["items"])
+
+    repeat_response = await client.post(
+        f"/payments/{payment_id}/refund", headers=_auth_headers(admin_token)
+    )
+    assert repeat_response.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_refunded_subscription_no_longer_covers_days(client, db_session):
+    _, admin_token = await _create_user(db_session, UserRole.ADMIN)
+    _, cook_token = await _create_user(db_session, UserRole.COOK)
+    student, student_token = await _create_user(db_session, UserRole.STUDENT)
+    menu_id = await _create_menu(client, cook_token, date(2025, 4, 9), remaining_qty=5)
+
+    subscription = {"period_start": "2025-04-08", "period_end": "2025-04-10"}
+    sub_response = await client.post(
+        "/payments/subscription", headers=_auth_headers(student_token), json=subscription
+    )
+    assert sub_response.status_code == 201
+
+    refund_response = await client.post(
+        f"/payments/{sub_response.json()['id']}/refund", headers=_auth_headers(admin_token)
+    )
+    assert refund_response.status_code == 200
+
+    serve_response = await client.post(
+        "/meal-issues/serve",
+        headers=_auth_headers(cook_token),
+        json={"user_id": student.id, "menu_id": menu_id},
+    )
+    assert serve_response.status_code == 400
+    assert serve_response.json()["detail"] == "Питание не оплачено"
+
+    again_response = await client.post(
+        "/payments/subscription", headers=_auth_headers(student_token), json=subscription
+    )
+    assert again_response.status_code == 201
+
+
+@pytest.mark.anyio
+async def test_my_payments_are_paginated_with_cursor(client, db_session):
+    _, student_token = await _create_user(db_session, UserRole.STUDENT)
+    created_ids = []
+    for week in range(5):
+        start = date(2026, 1, 5) + timedelta(weeks=week)
+        response = await client.post(
+            "/payments/subscription",
+            headers=_auth_headers(student_token),
+            json={
+                "period_start": start.isoformat(),
+                "period_end": (start + timedelta(days=4)).isoformat(),
+            },
+        )
+        assert response.status_code == 201
+        created_ids.append(response.json()["id"])
+
+    seen_ids = []
+    cursor = None
+    pages = 0
+    while True:
+        suffix = f"&cursor={cursor}" if cursor else ""
+        response = await client.get(
+            f"/payments/me?limit=2{suffix}", headers=_auth_headers(student_token)
+        )
+        assert response.status_code == 200
+        payload = response.json()
+        assert len(payload["items"]) <= 2
+        seen_ids.extend(item["id"] for item in payload["items"])
+        pages += 1
+        cursor = payload["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert seen_ids == list(reversed(created_ids))
+
+    bad_response = await client.get(
+        "/payments/me?cursor=not-a-cursor", headers=_auth_headers(student_token)
+    )
+    assert bad_response.status_code == 400
+    assert bad_response.json()["detail"] == "Некорректный курсор"
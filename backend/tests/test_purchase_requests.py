@@ -122,6 +122,112 @@ async def test_admin_can_approve_purchase_request(client, db_session):
     assert repeat_response.json()["detail"] == "Заявка уже рассмотрена"
 
 
+@pytest.mark.anyio
+async def test_approved_purchase_request_received_in_one_call(client, db_session):
+    cook, cook_token = await _create_user(db_session, UserRole.COOK)
+    _, admin_token = await _create_user(db_session, UserRole.ADMIN)
+    flour = await _create_product(client, cook_token, name="Flour")
+    milk = await _create_product(client, cook_token, name="Milk")
+    sugar = await _create_product(client, cook_token, name="Sugar")
+
+    create_response = await client.post(
+        "/purchase-requests/",
+        headers=_auth_headers(cook_token),
+        json={
+            "items": [
+                {"product_id": flour["id"], "quantity": "10.000"},
+                {"product_id": milk["id"], "quantity": "4.500"},
+            ]
+        },
+    )
+    request_id = create_response.json()["id"]
+
+    early_response = await client.post(
+        "/inventory-transactions/receipts",
+        headers=_auth_headers(cook_token),
+        json={"purchase_request_id": request_id},
+    )
+    assert early_response.status_code == 400
+    assert early_response.json()["detail"] == "Оприходовать можно только согласованную заявку"
+
+    decision_response = await client.post(
+        f"/purchase-requests/{request_id}/decision",
+        headers=_auth_headers(admin_token),
+        json={"status": "approved"},
+    )
+    assert decision_response.status_code == 200
+
+    foreign_response = await client.post(
+        "/inventory-transactions/receipts",
+        headers=_auth_headers(cook_token),
+        json={
+            "purchase_request_id": request_id,
+            "items": [{"product_id": sugar["id"], "quantity": "1.000"}],
+        },
+    )
+    assert foreign_response.status_code == 400
+    assert foreign_response.json()["detail"] == f"Продуктов нет в заявке: [{sugar['id']}]"
+
+    partial_response = await client.post(
+        "/inventory-transactions/receipts",
+        headers=_auth_headers(cook_token),
+        json={
+            "purchase_request_id": request_id,
+            "items": [{"product_id": flour["id"], "quantity": "4.000"}],
+        },
+    )
+    assert partial_response.status_code == 201
+    request_response = await client.get(
+        f"/purchase-requests/{request_id}", headers=_auth_headers(cook_token)
+    )
+    assert request_response.json()["received_at"] is None
+
+    receipt_response = await client.post(
+        "/inventory-transactions/receipts",
+        headers=_auth_headers(cook_token),
+        json={"purchase_request_id": request_id},
+    )
+    assert receipt_response.status_code == 201
+    receipt = receipt_response.json()
+    assert {item["product_id"]: Decimal(item["quantity"]) for item in receipt["items"]} == {
+        flour["id"]: Decimal("6.000"),
+        milk["id"]: Decimal("4.500"),
+    }
+    assert all(item["purchase_request_id"] == request_id for item in receipt["items"])
+    assert all(item["created_by_id"] == cook.id for item in receipt["items"])
+
+    stock_response = await client.get("/products/stock", headers=_auth_headers(cook_token))
+    stock = {item["id"]: Decimal(item["stock"]) for item in stock_response.json()["items"]}
+    assert stock[flour["id"]] == Decimal("10.000")
+    assert stock[milk["id"]] == Decimal("4.500")
+
+    request_response = await client.get(
+        f"/purchase-requests/{request_id}", headers=_auth_headers(cook_token)
+    )
+    assert request_response.json()["received_at"] is not None
+
+    repeat_response = await client.post(
+        "/inventory-transactions/receipts",
+        headers=_auth_headers(cook_token),
+        json={"purchase_request_id": request_id},
+    )
+    assert repeat_response.status_code == 400
+    assert repeat_response.json()["detail"] == "Поставка по заявке уже оприходована"
+
+    missing_response = await client.post(
+        "/inventory-transactions/receipts",
+        headers=_auth_headers(cook_token),
+        json={
+            "items": [
+                {"product_id": flour["id"], "quantity": "1.000"},
+                {"product_id": 999999, "quantity": "1.000"},
+            ]
+        },
+    )
+    assert missing_response.status_code == 400
+    assert missing_response.json()["detail"] == "Продукты не найдены: [999999]"
+
+
 @pytest.mark.anyio
 async def test_purchase_request_access_denied_for_student(client, db_session):
     _, student_token = await _create_user(db_session, UserRole.STUDENT)
@@ -1,9 +1,14 @@
+import asyncio
 import uuid
 from datetime import date
 
 import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
-from app.models import User, UserRole
+from app.models import DishRatingStats, MenuDishRatingStats, User, UserRole
+from app.schemas.review import ReviewCreate
+from app.services.menu_cache import menu_response_cache
+from app.services.review_service import create_review, rebuild_rating_stats
 from app.services.security import create_access_token, hash_password
 
 
@@ -37,12 +42,14 @@ async def _create_dish(client, token: str) -> int:
     return response.json()["id"]
 
 
-async def _create_menu(client, token: str, dish_id: int) -> int:
+async def _create_menu(
+    client, token: str, dish_id: int, menu_date: date = date(2025, 2, 7)
+) -> int:
     response = await client.post(
         "/menus/",
         headers=_auth_headers(token),
         json={
-            "menu_date": date(2025, 2, 7).isoformat(),
+            "menu_date": menu_date.isoformat(),
             "meal_type": "lunch",
             "title": "Lunch",
             "price": "150.00",
@@ -105,3 +112,89 @@ async def test_cook_cannot_create_review(client, db_session):
         json={"dish_id": dish_id, "rating": 4},
     )
     assert response.status_code == 403
+
+
+@pytest.mark.anyio
+async def test_reviews_update_rating_stats(client, db_session):
+    _, cook_token = await _create_user(db_session, UserRole.COOK)
+    _, student_token = await _create_user(db_session, UserRole.STUDENT)
+
+    dish_id = await _create_dish(client, cook_token)
+    menu_id = await _create_menu(client, cook_token, dish_id, menu_date=date(2025, 6, 2))
+
+    dish_response = await client.get(f"/dishes/{dish_id}", headers=_auth_headers(cook_token))
+    assert dish_response.json()["rating_stats"] is None
+
+    cache_version = menu_response_cache.version
+    for rating, with_menu in ((5, True), (3, True), (4, False)):
+        payload = {"dish_id": dish_id, "rating": rating}
+        if with_menu:
+            payload["menu_id"] = menu_id
+        response = await client.post(
+            "/reviews/", headers=_auth_headers(student_token), json=payload
+        )
+        assert response.status_code == 201
+
+    dish_response = await client.get(f"/dishes/{dish_id}", headers=_auth_headers(cook_token))
+    stats = dish_response.json()["rating_stats"]
+    assert stats["rating_count"] == 3
+    assert stats["rating_sum"] == 12
+    assert [stats[f"rating_{value}"] for value in range(1, 6)] == [0, 0, 1, 1, 1]
+    assert stats["average_rating"] == 4.0
+    assert stats["last_review_at"] is not None
+
+    assert menu_response_cache.version == cache_version
+
+    ratings_response = await client.get(
+        f"/menus/{menu_id}/ratings", headers=_auth_headers(student_token)
+    )
+    item = ratings_response.json()["items"][0]
+    assert item["dish_id"] == dish_id
+    assert item["rating_stats"]["rating_count"] == 2
+    assert item["rating_stats"]["average_rating"] == 4.0
+    assert item["dish_rating_stats"]["rating_count"] == 3
+
+    personal_response = await client.get(
+        "/menus/me?date_from=2025-06-02&date_to=2025-06-02",
+        headers=_auth_headers(student_token),
+    )
+    personal_item = personal_response.json()["items"][0]["menu_items"][0]
+    assert personal_item["rating_stats"]["rating_count"] == 2
+    assert personal_item["dish"]["rating_stats"]["rating_count"] == 3
+
+    stats_row = await db_session.get(DishRatingStats, dish_id)
+    stats_row.rating_count = 100
+    await db_session.commit()
+
+    await rebuild_rating_stats(db_session)
+    rebuilt = await db_session.get(DishRatingStats, dish_id)
+    assert rebuilt.rating_count == 3
+    assert rebuilt.rating_sum == 12
+
+
+@pytest.mark.anyio
+async def test_concurrent_first_reviews_share_one_stats_row(client, db_session, test_engine):
+    _, cook_token = await _create_user(db_session, UserRole.COOK)
+    students = [(await _create_user(db_session, UserRole.STUDENT))[0] for _ in range(8)]
+    dish_id = await _create_dish(client, cook_token)
+    menu_id = await _create_menu(client, cook_token, dish_id, menu_date=date(2025, 7, 8))
+
+    session_factory = async_sessionmaker(bind=test_engine, expire_on_commit=False)
+
+    async def review(student_id: int, rating: int) -> None:
+        async with session_factory() as db:
+            await create_review(
+                ReviewCreate(dish_id=dish_id, menu_id=menu_id, rating=rating), student_id, db
+            )
+
+    await asyncio.gather(
+        *(review(student.id, index % 5 + 1) for index, student in enumerate(students))
+    )
+
+    db_session.expire_all()
+    dish_stats = await db_session.get(DishRatingStats, dish_id)
+    menu_stats = await db_session.get(MenuDishRatingStats, (menu_id, dish_id))
+    for stats in (dish_stats, menu_stats):
+        assert stats.rating_count == 8
+        assert stats.rating_sum == 1 + 2 + 3 + 4 + 5 + 1 + 2 + 3
+        assert [getattr(stats, f"rating_{value}") for value in range(1, 6)] == [2, 2, 2, 1, 1]
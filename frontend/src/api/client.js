@@ -34,8 +34,14 @@ const triggerUnauthorized = () => {
   window.dispatchEvent(new CustomEvent("auth:logout", { detail: { reason: "unauthorized" } }));
 };
 
+let refreshHandler = null;
+
+export const setRefreshHandler = (handler) => {
+  refreshHandler = handler;
+};
+
 export async function apiRequest(path, options = {}) {
-  const { method = "GET", token, body, isForm = false, headers } = options;
+  const { method = "GET", token, body, isForm = false, headers, retried = false } = options;
   const requestHeaders = new Headers(headers || {});
 
   if (token) {
@@ -66,6 +72,12 @@ export async function apiRequest(path, options = {}) {
 
   if (!response.ok) {
     if (response.status === 401 && token) {
+      if (refreshHandler && !retried) {
+        const freshToken = await refreshHandler();
+        if (freshToken) {
+          return apiRequest(path, { ...options, token: freshToken, retried: true });
+        }
+      }
       triggerUnauthorized();
       throw new Error("Сессия истекла. Войдите снова.");
     }
@@ -74,3 +86,25 @@ export async function apiRequest(path, options = {}) {
 
   return data;
 }
+
+const PAGE_LIMIT = 200;
+
+const withCursor = (path, cursor, limit = PAGE_LIMIT) => {
+  const separator = path.includes("?") ? "&" : "?";
+  const query = new URLSearchParams({ limit: String(limit) });
+  if (cursor) {
+    query.set("cursor", cursor);
+  }
+  return `${path}${separator}${query}`;
+};
+
+export async function apiRequestAll(path, options = {}) {
+  const items = [];
+  let cursor = null;
+  do {
+    const page = await apiRequest(withCursor(path, cursor), options);
+    items.push(...(page.items || []));
+    cursor = page.next_cursor;
+  } while (cursor);
+  return { items };
+}
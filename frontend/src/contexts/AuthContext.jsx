@@ -1,10 +1,11 @@
 import React, { createContext, useContext, useEffect, useMemo, useState } from "react";
-import { apiRequest } from "../api/client.js";
+import { apiRequest, setRefreshHandler } from "../api/client.js";
 
 const AuthContext = createContext(null);
 
 const TOKEN_KEY = "canteen_token";
 const USER_KEY = "canteen_user";
+const REFRESH_TOKEN_KEY = "canteen_refresh_token";
 
 const decodeJwtPayload = (token) => {
   if (!token) {
@@ -35,13 +36,20 @@ const isTokenExpired = (token) => {
   return Date.now() >= payload.exp * 1000;
 };
 
+const loadStoredRefreshToken = () => {
+  if (typeof window === "undefined") {
+    return null;
+  }
+  return window.localStorage.getItem(REFRESH_TOKEN_KEY);
+};
+
 const loadStoredUser = () => {
   if (typeof window === "undefined") {
     return null;
   }
   try {
     const token = window.localStorage.getItem(TOKEN_KEY);
-    if (token && isTokenExpired(token)) {
+    if (token && isTokenExpired(token) && !loadStoredRefreshToken()) {
       window.localStorage.removeItem(USER_KEY);
       window.localStorage.removeItem(TOKEN_KEY);
       return null;
@@ -58,7 +66,7 @@ const loadStoredToken = () => {
     return null;
   }
   const token = window.localStorage.getItem(TOKEN_KEY);
-  if (token && isTokenExpired(token)) {
+  if (token && isTokenExpired(token) && !loadStoredRefreshToken()) {
     window.localStorage.removeItem(USER_KEY);
     window.localStorage.removeItem(TOKEN_KEY);
     return null;
@@ -66,7 +74,7 @@ const loadStoredToken = () => {
   return token;
 };
 
-const persistSession = (user, token) => {
+const persistSession = (user, token, refreshToken) => {
   if (typeof window === "undefined") {
     return;
   }
@@ -76,6 +84,9 @@ const persistSession = (user, token) => {
   if (token) {
     window.localStorage.setItem(TOKEN_KEY, token);
   }
+  if (refreshToken) {
+    window.localStorage.setItem(REFRESH_TOKEN_KEY, refreshToken);
+  }
 };
 
 const clearSession = () => {
@@ -84,6 +95,31 @@ const clearSession = () => {
   }
   window.localStorage.removeItem(USER_KEY);
   window.localStorage.removeItem(TOKEN_KEY);
+  window.localStorage.removeItem(REFRESH_TOKEN_KEY);
+};
+
+let pendingRefresh = null;
+
+const refreshSession = () => {
+  const refreshToken = loadStoredRefreshToken();
+  if (!refreshToken) {
+    return Promise.resolve(null);
+  }
+  if (!pendingRefresh) {
+    pendingRefresh = apiRequest("/auth/refresh", {
+      method: "POST",
+      body: { refresh_token: refreshToken },
+    })
+      .then((data) => {
+        persistSession(null, data.access_token, data.refresh_token);
+        return data.access_token;
+      })
+      .catch(() => null)
+      .finally(() => {
+        pendingRefresh = null;
+      });
+  }
+  return pendingRefresh;
 };
 
 export function AuthProvider({ children }) {
@@ -106,7 +142,7 @@ export function AuthProvider({ children }) {
 
       setUser(data.user);
       setToken(data.access_token);
-      persistSession(data.user, data.access_token);
+      persistSession(data.user, data.access_token, data.refresh_token);
       return { ok: true, user: data.user };
     } catch (error) {
       return { ok: false, message: error.message };
@@ -139,17 +175,41 @@ export function AuthProvider({ children }) {
   };
 
   const logout = () => {
+    const refreshToken = loadStoredRefreshToken();
+    if (refreshToken) {
+      apiRequest("/auth/logout", {
+        method: "POST",
+        body: { refresh_token: refreshToken },
+      }).catch(() => {});
+    }
     setUser(null);
     setToken(null);
     clearSession();
   };
 
+  const renewToken = async () => {
+    const freshToken = await refreshSession();
+    if (freshToken) {
+      setToken(freshToken);
+    }
+    return freshToken;
+  };
+
+  useEffect(() => {
+    setRefreshHandler(renewToken);
+    return () => setRefreshHandler(null);
+  }, []);
+
   useEffect(() => {
     if (!token) {
       return;
     }
     if (isTokenExpired(token)) {
-      logout();
+      renewToken().then((freshToken) => {
+        if (!freshToken) {
+          logout();
+        }
+      });
     }
   }, [token]);
 
@@ -83,6 +83,7 @@ export default function AdminReports() {
     from: "",
     to: "",
     productId: "",
+    groupBy: "",
   });
   const [nutritionReport, setNutritionReport] = useState(null);
   const [expenseReport, setExpenseReport] = useState(null);
@@ -131,6 +132,7 @@ export default function AdminReports() {
         date_from: filters.from,
         date_to: filters.to,
         product_id: filters.productId,
+        group_by: filters.groupBy,
       });
       const response = await apiRequest(`/admin/reports/expenses${query}`, { token });
       setExpenseReport(response);
@@ -234,7 +236,7 @@ export default function AdminReports() {
   };
 
   const resetExpense = () => {
-    const next = { from: "", to: "", productId: "" };
+    const next = { from: "", to: "", productId: "", groupBy: "" };
     setExpenseFilters(next);
     loadExpenseReport(next);
   };
@@ -495,6 +497,17 @@ export default function AdminReports() {
               <span className="form-hint">Загружаем список продуктов...</span>
             )}
 </label>
+          <label className="form-field">
+            Итоги по месяцам
+            <select
+              name="groupBy"
+              value={expenseFilters.groupBy}
+              onChange={handleExpenseChange}
+            >
+              <option value="">Не показывать</option>
+              <option value="month">Показать</option>
+            </select>
+          </label>
         </div>
 
         <div className="button-row">
@@ -532,6 +545,23 @@ export default function AdminReports() {
             </div>
           </div>
 
+          {expenseReport.months?.length > 0 && (
+            <div className="option-grid" style={{ marginTop: "1rem" }}>
+              {expenseReport.months.map((item) => (
+                <div key={item.month} className="option-card">
+                  <strong>
+                    {new Date(item.month).toLocaleDateString("ru-RU", {
+                      month: "long",
+                      year: "numeric",
+                    })}
+                  </strong>
+                  <span>Количество: {item.total_quantity}</span>
+                  <span>Сумма: {formatMoney(item.total_amount)}</span>
+                </div>
+              ))}
+            </div>
+          )}
+
           <div className="menu-grid" style={{ marginTop: "1.5rem" }}>
             {expenseReport.items.length === 0 && (
               <div className="summary">Данных за выбранный период нет.</div>
@@ -71,7 +71,13 @@ const formatDateTimeParam = (value) => {
   return parsed.toISOString();
 };
 
-const buildQuery = ({ dateFrom, dateTo }) => {
+const GROUP_BY_LABELS = {
+  day: "По дням",
+  week: "По неделям",
+  month: "По месяцам",
+};
+
+const buildQuery = ({ dateFrom, dateTo, groupBy }) => {
   const params = new URLSearchParams();
   if (dateFrom) {
     params.set("date_from", dateFrom);
@@ -79,6 +85,9 @@ const buildQuery = ({ dateFrom, dateTo }) => {
   if (dateTo) {
     params.set("date_to", dateTo);
   }
+  if (groupBy) {
+    params.set("group_by", groupBy);
+  }
   const query = params.toString();
   return query ? `?${query}` : "";
 };
@@ -98,7 +107,7 @@ const buildPeriodLabel = (from, to, format) => {
 
 export default function AdminStats() {
   const { token, user } = useAuth();
-  const [paymentFilters, setPaymentFilters] = useState({ from: "", to: "" });
+  const [paymentFilters, setPaymentFilters] = useState({ from: "", to: "", groupBy: "" });
   const [attendanceFilters, setAttendanceFilters] = useState({
     from: "",
     to: "",
@@ -121,6 +130,7 @@ export default function AdminStats() {
       const query = buildQuery({
         dateFrom: formatDateTimeParam(filters.from),
         dateTo: formatDateTimeParam(filters.to),
+        groupBy: filters.groupBy,
       });
       const response = await apiRequest(`/admin/stats/payments${query}`, { token });
       setPaymentStats(response);
@@ -213,7 +223,7 @@ export default function AdminStats() {
   };
 
   const resetPayments = () => {
-    const next = { from: "", to: "" };
+    const next = { from: "", to: "", groupBy: "" };
     setPaymentFilters(next);
     loadPaymentStats(next);
   };
@@ -226,6 +236,7 @@ export default function AdminStats() {
 
   const paymentStatusItems = paymentStats?.by_status || [];
   const paymentTypeItems = paymentStats?.by_type || [];
+  const paymentSeriesItems = paymentStats?.series || [];
   const attendanceItems = attendanceStats?.by_status || [];
 
   return (
@@ -269,6 +280,21 @@ export default function AdminStats() {
               onChange={handlePaymentChange}
             />
           </label>
+          <label className="form-field">
+            Динамика
+            <select
+              name="groupBy"
+              value={paymentFilters.groupBy}
+              onChange={handlePaymentChange}
+            >
+              <option value="">Не показывать</option>
+              {Object.entries(GROUP_BY_LABELS).map(([value, label]) => (
+                <option key={value} value={value}>
+                  {label}
+                </option>
+              ))}
+            </select>
+          </label>
         </div>
 
         <div className="button-row">
@@ -336,6 +362,21 @@ export default function AdminStats() {
               </div>
             )}
           </div>
+
+          {paymentSeriesItems.length > 0 && (
+            <div className="form-group" style={{ marginTop: "1.5rem" }}>
+              <h3>Динамика оплат</h3>
+              <div className="option-grid">
+                {paymentSeriesItems.map((item) => (
+                  <div key={item.period_start} className="option-card">
+                    <strong>{formatDate(item.period_start)}</strong>
+                    <span>Количество: {item.count}</span>
+                    <span>Сумма: {formatMoney(item.amount)}</span>
+                  </div>
+                ))}
+              </div>
+            </div>
+          )}
         </>
       )}
 
@@ -1,7 +1,7 @@
 import { useEffect, useMemo, useState } from "react";
 import { Navigate } from "react-router-dom";
 import CookNav from "../components/CookNav.jsx";
-import { apiRequest } from "../api/client.js";
+import { apiRequest, apiRequestAll } from "../api/client.js";
 import { useAuth } from "../contexts/AuthContext.jsx";
 import { useToast } from "../contexts/ToastContext.jsx";
 
@@ -56,6 +56,8 @@ const buildServeForm = () => ({
   menuId: "",
 });
 
+const ISSUES_PAGE_SIZE = 50;
+
 const formatDate = (value) => {
   if (!value) {
     return "";
@@ -70,6 +72,8 @@ const formatDate = (value) => {
 export default function CookMeals() {
   const { token } = useAuth();
   const [issues, setIssues] = useState([]);
+  const [issuesCursor, setIssuesCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [menusById, setMenusById] = useState(new Map());
   const [filters, setFilters] = useState(buildFilters);
   const [serveForm, setServeForm] = useState(buildServeForm);
@@ -82,6 +86,7 @@ export default function CookMeals() {
   const [preferencesLoading, setPreferencesLoading] = useState(false);
   const [usersById, setUsersById] = useState({});
   const [usersLoading, setUsersLoading] = useState(false);
+  const [roster, setRoster] = useState(null);
   const toast = useToast();
 
   const issueStats = useMemo(() => {
@@ -111,7 +116,7 @@ export default function CookMeals() {
     }
     const loadMenus = async () => {
       try {
-        const response = await apiRequest("/menus/", { token });
+        const response = await apiRequestAll("/menus/", { token });
         const map = new Map((response.items || []).map((menu) => [menu.id, menu]));
         setMenusById(map);
       } catch {
@@ -121,6 +126,32 @@ export default function CookMeals() {
     loadMenus();
   }, [token]);
 
+  useEffect(() => {
+    const menuId = Number(serveForm.menuId);
+    if (!token || !menuId) {
+      setRoster(null);
+      return;
+    }
+    let cancelled = false;
+    apiRequest(`/menus/${menuId}/eligibility`, { token })
+      .then((response) => {
+        if (!cancelled) {
+          setRoster({
+            menuId,
+            byUser: new Map((response.items || []).map((item) => [item.user_id, item])),
+          });
+        }
+      })
+      .catch(() => {
+        if (!cancelled) {
+          setRoster(null);
+        }
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [token, serveForm.menuId]);
+
   useEffect(() => {
     if (loadError) {
       toast.error(loadError);
@@ -136,11 +167,15 @@ export default function CookMeals() {
     }
   }, [actionError, actionSuccess, loadError, toast]);
 
-  const loadIssues = async (nextFilters = filters) => {
-    setLoading(true);
+  const loadIssues = async (nextFilters = filters, cursor = null) => {
+    if (cursor) {
+      setLoadingMore(true);
+    } else {
+      setLoading(true);
+    }
     setLoadError("");
     try {
-      const query = new URLSearchParams();
+      const query = new URLSearchParams({ limit: String(ISSUES_PAGE_SIZE) });
       if (nextFilters.status) {
         query.set("status", nextFilters.status);
       }
@@ -150,13 +185,18 @@ export default function CookMeals() {
       if (nextFilters.to) {
         query.set("date_to", nextFilters.to);
       }
-      const suffix = query.toString() ? `?${query}` : "";
-      const response = await apiRequest(`/meal-issues/${suffix}`, { token });
-      setIssues(response.items || []);
+      if (cursor) {
+        query.set("cursor", cursor);
+      }
+      const response = await apiRequest(`/meal-issues/?${query}`, { token });
+      const items = response.items || [];
+      setIssues((prev) => (cursor ? [...prev, ...items] : items));
+      setIssuesCursor(response.next_cursor || null);
     } catch (err) {
       setLoadError(err.message);
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
@@ -256,6 +296,17 @@ export default function CookMeals() {
       setActionError("Укажите ID ученика и ID меню.");
       return;
     }
+    if (roster?.menuId === menuId) {
+      const entry = roster.byUser.get(userId);
+      if (!entry) {
+        setActionError("Питание не оплачено");
+        return;
+      }
+      if (entry.issue_status === "served" || entry.issue_status === "confirmed") {
+        setActionError("Питание уже выдано");
+        return;
+      }
+    }
     setActionError("");
     setActionSuccess("");
     setServingIssueId(`manual-${userId}-${menuId}`);
@@ -265,6 +316,14 @@ export default function CookMeals() {
         token,
         body: { user_id: userId, menu_id: menuId },
       });
+      setRoster((prev) => {
+        if (prev?.menuId !== menuId) {
+          return prev;
+        }
+        const byUser = new Map(prev.byUser);
+        byUser.set(userId, { ...byUser.get(userId), issue_status: "served" });
+        return { ...prev, byUser };
+      });
       setActionSuccess("Выдача отмечена.");
       setServeForm(buildServeForm());
       await loadIssues(filters);
@@ -424,7 +483,7 @@ export default function CookMeals() {
       </form>
 
       <div className="summary" style={{ marginTop: "1rem" }}>
-        Всего: {issueStats.total}. Ожидают: {issueStats.issued}. Выдано:{" "}
+        {issuesCursor ? "Загружено" : "Всего"}: {issueStats.total}. Ожидают: {issueStats.issued}. Выдано:{" "}
         {issueStats.served}. Получено: {issueStats.confirmed}.
       </div>
 
@@ -433,6 +492,7 @@ export default function CookMeals() {
           <h3>Быстрая выдача</h3>
           <p className="form-hint">
             Введите идентификаторы ученика и меню, чтобы сразу отметить выдачу.
+            {roster && ` Допущено к меню #${roster.menuId}: ${roster.byUser.size}.`}
           </p>
           <div className="option-grid">
             <label className="form-field">
@@ -485,6 +545,18 @@ export default function CookMeals() {
             {issues.map(renderIssueCard)}
           </div>
         )}
+        {!loading && issuesCursor && (
+          <div className="button-row">
+            <button
+              type="button"
+              className="secondary-button"
+              onClick={() => loadIssues(filters, issuesCursor)}
+              disabled={loadingMore}
+            >
+              {loadingMore ? "Загружаем..." : "Показать ещё"}
+            </button>
+          </div>
+        )}
       </div>
     </section>
   );
@@ -1,7 +1,7 @@
 import { useEffect, useMemo, useState } from "react";
 import { Navigate } from "react-router-dom";
 import CookNav from "../components/CookNav.jsx";
-import { apiRequest } from "../api/client.js";
+import { apiRequest, apiRequestAll } from "../api/client.js";
 import { useAuth } from "../contexts/AuthContext.jsx";
 import { useToast } from "../contexts/ToastContext.jsx";
 
@@ -113,7 +113,7 @@ export default function CookMenus() {
     try {
       const [dishesResponse, menusResponse, allergiesResponse] = await Promise.all([
         apiRequest("/dishes/", { token }),
-        apiRequest("/menus/", { token }),
+        apiRequestAll("/menus/", { token }),
         apiRequest("/allergies/", { token }),
       ]);
       setDishes(dishesResponse.items || []);
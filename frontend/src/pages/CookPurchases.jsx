@@ -1,7 +1,7 @@
 import { useEffect, useMemo, useState } from "react";
 import { Navigate } from "react-router-dom";
 import CookNav from "../components/CookNav.jsx";
-import { apiRequest } from "../api/client.js";
+import { apiRequest, apiRequestAll } from "../api/client.js";
 import { useAuth } from "../contexts/AuthContext.jsx";
 import { useToast } from "../contexts/ToastContext.jsx";
 
@@ -38,6 +38,7 @@ export default function CookPurchases() {
   const [formError, setFormError] = useState("");
   const [formSuccess, setFormSuccess] = useState("");
   const [submitting, setSubmitting] = useState(false);
+  const [receivingId, setReceivingId] = useState(null);
   const toast = useToast();
 
   const productMap = useMemo(() => {
@@ -50,7 +51,7 @@ export default function CookPurchases() {
     try {
       const [productsResponse, requestsResponse] = await Promise.all([
         apiRequest("/products/", { token }),
-        apiRequest("/purchase-requests/", { token }),
+        apiRequestAll("/purchase-requests/", { token }),
       ]);
       setProducts(productsResponse.items || []);
       setRequests(requestsResponse.items || []);
@@ -167,6 +168,25 @@ export default function CookPurchases() {
     }
   };
 
+  const handleReceive = async (requestId) => {
+    setReceivingId(requestId);
+    setFormError("");
+    setFormSuccess("");
+    try {
+      await apiRequest("/inventory-transactions/receipts", {
+        method: "POST",
+        token,
+        body: { purchase_request_id: requestId },
+      });
+      setFormSuccess(`Поставка по заявке #${requestId} оприходована.`);
+      await loadData();
+    } catch (err) {
+      setFormError(err.message);
+    } finally {
+      setReceivingId(null);
+    }
+  };
+
   return (
     <section className="page">
       <header className="auth-header">
@@ -312,6 +332,23 @@ export default function CookPurchases() {
                     </div>
                   ))}
                 </div>
+                {request.status === "approved" &&
+                  (request.received_at ? (
+                    <div className="form-hint">
+                      Оприходована: {formatDateTime(request.received_at)}
+                    </div>
+                  ) : (
+                    <div className="button-row">
+                      <button
+                        type="button"
+                        className="primary-button"
+                        disabled={receivingId === request.id}
+                        onClick={() => handleReceive(request.id)}
+                      >
+                        {receivingId === request.id ? "Приходуем..." : "Оприходовать"}
+                      </button>
+                    </div>
+                  ))}
               </div>
             ))}
           </div>
@@ -1,7 +1,7 @@
 import { useEffect, useMemo, useState } from "react";
 import { Navigate } from "react-router-dom";
 import CookNav from "../components/CookNav.jsx";
-import { apiRequest } from "../api/client.js";
+import { apiRequest, apiRequestAll } from "../api/client.js";
 import { useAuth } from "../contexts/AuthContext.jsx";
 import { useToast } from "../contexts/ToastContext.jsx";
 
@@ -65,7 +65,7 @@ export default function CookStock() {
       const [productsResponse, stockResponse, transactionsResponse] = await Promise.all([
         apiRequest("/products/", { token }),
         apiRequest("/products/stock", { token }),
-        apiRequest("/inventory-transactions/", { token }),
+        apiRequestAll("/inventory-transactions/", { token }),
       ]);
       setProducts(productsResponse.items || []);
       setStockItems(stockResponse.items || []);
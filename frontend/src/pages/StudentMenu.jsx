@@ -1,6 +1,6 @@
 import { useEffect, useMemo, useRef, useState } from "react";
 import { Link, Navigate } from "react-router-dom";
-import { apiRequest } from "../api/client.js";
+import { apiRequest, apiRequestAll } from "../api/client.js";
 import { useAuth } from "../contexts/AuthContext.jsx";
 import { useToast } from "../contexts/ToastContext.jsx";
 import { playNotificationSound } from "../utils/notificationSound.js";
@@ -192,7 +192,6 @@ export default function StudentMenu() {
   const [menus, setMenus] = useState([]);
   const [payments, setPayments] = useState([]);
   const [issues, setIssues] = useState([]);
-  const [preferences, setPreferences] = useState(null);
   const [myReviews, setMyReviews] = useState([]);
   const [loading, setLoading] = useState(true);
   const [loadError, setLoadError] = useState("");
@@ -239,10 +238,6 @@ export default function StudentMenu() {
     return new Map(issues.map((issue) => [issue.menu_id, issue]));
   }, [issues]);
 
-  const allergyIdSet = useMemo(() => {
-    return new Set((preferences?.allergies || []).map((item) => item.id));
-  }, [preferences]);
-
   const myReviewMap = useMemo(() => {
     return new Map(
       myReviews.map((review) => [`${review.menu_id || "none"}-${review.dish_id}`, review])
@@ -363,20 +358,14 @@ export default function StudentMenu() {
       setLoading(true);
       setLoadError("");
       const tasks = [
-        { key: "menus", promise: apiRequest("/menus/", { token }) },
-        { key: "payments", promise: apiRequest("/payments/me", { token }) },
-        { key: "issues", promise: apiRequest("/meal-issues/me", { token }) },
+        { key: "menus", promise: apiRequestAll("/menus/me", { token }) },
+        { key: "payments", promise: apiRequestAll("/payments/me", { token }) },
+        { key: "issues", promise: apiRequestAll("/meal-issues/me", { token }) },
       ];
-      if (user?.role === "student") {
-        tasks.push({
-          key: "preferences",
-          promise: apiRequest("/preferences/me", { token }),
-        });
-      }
       if (user?.id) {
         tasks.push({
           key: "reviews",
-          promise: apiRequest(`/reviews/?user_id=${user.id}`, { token }),
+          promise: apiRequestAll(`/reviews/?user_id=${user.id}`, { token }),
         });
       }
 
@@ -388,7 +377,6 @@ export default function StudentMenu() {
       const menusResult = resultByKey.get("menus");
       const paymentsResult = resultByKey.get("payments");
       const issuesResult = resultByKey.get("issues");
-      const preferencesResult = resultByKey.get("preferences");
       const reviewsResult = resultByKey.get("reviews");
       const errors = [];
 
@@ -417,15 +405,6 @@ export default function StudentMenu() {
         );
       }
 
-      if (preferencesResult?.status === "fulfilled") {
-        setPreferences(preferencesResult.value);
-      } else if (preferencesResult) {
-        errors.push(
-          preferencesResult.reason?.message ||
-            "Не удалось загрузить предпочтения питания."
-        );
-      }
-
       if (reviewsResult?.status === "fulfilled") {
         setMyReviews(reviewsResult.value.items || []);
       } else if (reviewsResult) {
@@ -541,8 +520,8 @@ export default function StudentMenu() {
   const refreshPaymentsAndIssues = async () => {
     try {
       const [paymentsResponse, issuesResponse] = await Promise.all([
-        apiRequest("/payments/me", { token }),
-        apiRequest("/meal-issues/me", { token }),
+        apiRequestAll("/payments/me", { token }),
+        apiRequestAll("/meal-issues/me", { token }),
       ]);
       setPayments(paymentsResponse.items || []);
       setIssues(issuesResponse.items || []);
@@ -784,7 +763,7 @@ export default function StudentMenu() {
     setReviewsLoading(true);
     try {
       const results = await Promise.allSettled(
-        dishIds.map((dishId) => apiRequest(`/reviews/?dish_id=${dishId}`, { token }))
+        dishIds.map((dishId) => apiRequestAll(`/reviews/?dish_id=${dishId}`, { token }))
       );
       const nextMap = new Map();
       results.forEach((result, index) => {
@@ -922,8 +901,9 @@ export default function StudentMenu() {
           {(menu.menu_items || []).map((item) => {
             const dishId = item.dish?.id;
             const dishAllergies = item.dish?.allergies || [];
+            const conflictIds = new Set(item.conflicting_allergy_ids || []);
             const conflictNames = dishAllergies
-              .filter((allergy) => allergyIdSet.has(allergy.id))
+              .filter((allergy) => conflictIds.has(allergy.id))
               .map((allergy) => allergy.name)
               .filter(Boolean);
             const hasConflict = conflictNames.length > 0;
@@ -950,6 +930,12 @@ export default function StudentMenu() {
                 <div className="menu-meta">
                   {hasConflict && <span className="allergy-badge">Аллерген</span>}
                   {item.portion_size != null && <span>Порция: {item.portion_size}</span>}
+                  {item.dish?.rating_stats?.average_rating != null && (
+                    <span>
+                      Оценка: {item.dish.rating_stats.average_rating}/5 (
+                      {item.dish.rating_stats.rating_count})
+                    </span>
+                  )}
                   {item.planned_qty != null && <span>План: {item.planned_qty}</span>}
                   {item.remaining_qty != null && (
                     <span>Осталось: {item.remaining_qty}</span>
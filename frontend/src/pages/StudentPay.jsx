@@ -1,6 +1,6 @@
 import { useEffect, useMemo, useState } from "react";
 import { Link, Navigate } from "react-router-dom";
-import { apiRequest } from "../api/client.js";
+import { apiRequest, apiRequestAll } from "../api/client.js";
 import { useAuth } from "../contexts/AuthContext.jsx";
 import { useToast } from "../contexts/ToastContext.jsx";
 
@@ -198,14 +198,14 @@ export default function StudentPay() {
       let errorMessage = "";
 
       try {
-        const menusResponse = await apiRequest("/menus/", { token });
+        const menusResponse = await apiRequestAll("/menus/", { token });
         menuItems = menusResponse.items || [];
       } catch (err) {
         errorMessage = err.message;
       }
 
       try {
-        const paymentsResponse = await apiRequest("/payments/me", { token });
+        const paymentsResponse = await apiRequestAll("/payments/me", { token });
         paymentItems = paymentsResponse.items || [];
       } catch (err) {
         errorMessage = errorMessage
@@ -261,7 +261,7 @@ export default function StudentPay() {
 
   const refreshPayments = async () => {
     try {
-      const paymentsResponse = await apiRequest("/payments/me", { token });
+      const paymentsResponse = await apiRequestAll("/payments/me", { token });
       setPayments(paymentsResponse.items || []);
     } catch (err) {
       setLoadError(err.message);